@@ -1,30 +1,80 @@
 import os
-from openai import OpenAI
-from flask import Flask, request, jsonify, render_template
+from flask import (
+    Blueprint,
+    Flask,
+    after_this_request,
+    current_app,
+    request,
+    jsonify,
+    render_template,
+    send_from_directory,
+    stream_with_context,
+    g,
+    has_request_context,
+    session,
+)
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.engine import Engine
+from sqlalchemy import func, case, event, insert, literal, select, text, tuple_
 from dotenv import load_dotenv
 import logging
 import json
 import time
+import hashlib
+import gzip
+import csv
+import hmac
+import importlib.util
+import io
+import mimetypes
 import re
+import secrets
+import functools
+import contextvars
+import math
+import random
+import threading
+from contextlib import contextmanager
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timedelta
 from werkzeug.security import (
     generate_password_hash,
     check_password_hash,
 )  # For password hashing
+import build_assets
+import puzzle_providers
+import puzzle_similarity
+import metrics
+import log_pipeline
+import request_profiler
+import traffic_capture
 
 # --- Configuration & Setup ---
 # Point to the correct directories for static files and template
 load_dotenv()
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
-)
-app = Flask(__name__, template_folder="templates", static_folder="static")
-CORS(app)
+
+
+# Queue-backed logging (see log_pipeline.py). LOG_LEVELS sets subsystem levels, e.g.
+# "enigma.llm=DEBUG,werkzeug=WARNING"; LOG_DEBUG_SAMPLE_RATE traces that share of
+# requests at DEBUG. Called again in each forked server worker (see gunicorn.conf.py),
+# which doesn't inherit the writer thread
+def configure_app_logging():
+    log_pipeline.configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        levels=log_pipeline.parse_levels(os.getenv("LOG_LEVELS")),
+        json_format=os.getenv("LOG_FORMAT", "json").lower() == "json",
+        debug_sample_rate=float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1")),
+    )
+
+
+configure_app_logging()
+llm_logger = logging.getLogger("enigma.llm")
+puzzle_logger = logging.getLogger("enigma.puzzles")
+validation_logger = logging.getLogger("enigma.validation")
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Every route and request hook lives on this blueprint; create_app() registers it
+bp = Blueprint("enigma", __name__)
 
 # --- Constants ---
 MAX_RETRIES = 3
@@ -36,9 +86,27 @@ DB_NAME = "enigma_progress.db"
 VALID_DOMAINS = ["Frontend", "Backend", "Database", "AI Engineering"]
 VALID_DIFFICULTIES = ["Easy", "Medium", "Hard"]
 HINT_REQUEST_THRESHOLD = 3
+ASSET_CACHE_MAX_AGE = 31536000  # One year; hashed asset names change with content
+JSON_COMPRESSION_MIN_BYTES = 1024
+LLM_MAX_CONCURRENCY = 8  # OpenAI calls in flight at once, across all requests
+LLM_TOKENS_PER_MINUTE = 200000  # Keep in line with the account's TPM limit
+LLM_MAX_QUEUE_DEPTH = 32  # Callers allowed to wait for a slot before rejecting
+LLM_QUEUE_TIMEOUT = 15  # Seconds a caller waits for a slot
+PUZZLE_TOKEN_ESTIMATE = 2500  # Reserved per puzzle call, corrected from usage
+HINT_TOKEN_ESTIMATE = 800
+PUZZLE_REQUEST_DEADLINE = 45  # Seconds one /generate_puzzle may spend on OpenAI
+HINT_REQUEST_DEADLINE = 10  # Hints are optional; give up quickly
+RETRY_BACKOFF_BASE = 1.5
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failed or slow calls before opening
+BREAKER_SLOW_CALL_SECONDS = 20  # Successful calls slower than this count as failures
+BREAKER_RESET_TIMEOUT = 30  # Seconds open before a single probe call is let through
+PREFETCH_RESERVATION_TTL = (
+    1800  # Seconds a prefetched puzzle stays reserved for its player
+)
 FINDABLE_ACCOUNTS = [
     "guest",
     "architect",
+    "architect_node",  # The architect account's login name
     "lpetrova",
     "athorne",
     "master_student",
@@ -47,29 +115,117 @@ FINDABLE_ACCOUNTS = [
 
 
 # --- Database Configuration ---
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_NAME}"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+db = SQLAlchemy()
 
 # --- AI Setup (OpenAI) ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ai_client = None
-if not OPENAI_API_KEY:
-    logging.error("CRITICAL: OPENAI_API_KEY not found in environment variables.")
-else:
+# Transport tuning; the pool defaults to one kept-alive connection per limiter slot
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", LLM_MAX_CONCURRENCY))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "false").lower() == "true"
+OPENAI_WARMUP = os.getenv("OPENAI_WARMUP", "true").lower() == "true"
+# "openai", "fake" (offline, configurable latency), "record" or "replay"; see puzzle_providers.py
+PUZZLE_PROVIDER = os.getenv("PUZZLE_PROVIDER", "openai")
+# Prepare each player's next AI puzzle in the background once one is served
+PUZZLE_PREFETCH = os.getenv("PUZZLE_PREFETCH", "true").lower() == "true"
+# Hours between runs of the retention/compaction job in the server process; 0 disables
+COMPACTION_INTERVAL_HOURS = float(os.getenv("COMPACTION_INTERVAL_HOURS", "24"))
+
+
+# Builds the pooled, keep-alive HTTP client shared by every OpenAI call
+def build_openai_http_client():
+    import httpx
+    from openai import DefaultHttpxClient
+
+    http2 = OPENAI_HTTP2
+    if http2:
+        # HTTP/2 for the OpenAI connection pool is optional (pip install httpx[http2])
+        if importlib.util.find_spec("h2") is None:
+            llm_logger.warning(
+                "OPENAI_HTTP2 is set but 'h2' is not installed; using HTTP/1.1."
+            )
+            http2 = False
+    return DefaultHttpxClient(
+        timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+    )
+
+
+# Builds the OpenAI client, or returns None without an API key. The SDK is only
+# imported here: it takes about as long to import as the rest of the app
+def build_ai_client():
+    if not OPENAI_API_KEY:
+        logging.error("CRITICAL: OPENAI_API_KEY not found in environment variables.")
+        return None
     try:
-        ai_client = OpenAI(api_key=OPENAI_API_KEY)
+        import httpx
+        from openai import OpenAI
+
+        # Retries go through llm_limiter, so the client itself must not retry
+        ai_client = OpenAI(
+            api_key=OPENAI_API_KEY,
+            max_retries=0,
+            timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+            http_client=build_openai_http_client(),
+        )
         logging.info(
             f"OpenAI client configured successfully for model: {OPENAI_MODEL_NAME}"
         )
-    except NameError as ne:
-        logging.exception(
-            f"CRITICAL: NameError configuring OpenAI client - 'OpenAI' class likely not imported. Error: {ne}"
-        )
+        return ai_client
     except Exception as e:
         logging.exception(
             f"CRITICAL: Error configuring OpenAI client with model {OPENAI_MODEL_NAME}"
         )
+        return None
+
+
+# Puzzles and hints come from the configured provider, built on first use (or by
+# the startup warm-up) so that importing the app stays cheap
+puzzle_provider = None
+puzzle_provider_built = False
+puzzle_provider_lock = threading.Lock()
+
+
+# Returns the puzzle provider; None means the AI service is unavailable
+def get_puzzle_provider():
+    global puzzle_provider, puzzle_provider_built
+    if not puzzle_provider_built:
+        with puzzle_provider_lock:
+            if not puzzle_provider_built:
+                ai_client = (
+                    build_ai_client()
+                    if PUZZLE_PROVIDER.lower() in ("openai", "record")
+                    else None
+                )
+                try:
+                    puzzle_provider = puzzle_providers.build_provider(
+                        PUZZLE_PROVIDER,
+                        ai_client,
+                        OPENAI_MODEL_NAME,
+                        OPENAI_CONNECT_TIMEOUT,
+                    )
+                except (ValueError, OSError):
+                    # A bad name or an unreadable recording disables the provider
+                    # once, like a missing API key, rather than failing every call
+                    logging.exception(
+                        f"CRITICAL: Error building puzzle provider {PUZZLE_PROVIDER}"
+                    )
+                    puzzle_provider = None
+                if puzzle_provider is not None and traffic_recorder is not None:
+                    puzzle_provider = traffic_capture.CapturingProvider(
+                        puzzle_provider, traffic_recorder
+                    )
+                if puzzle_provider is not None:
+                    logging.info(f"Puzzle provider: {puzzle_provider.name}")
+                puzzle_provider_built = True
+    return puzzle_provider
 
 
 # --- Database Models ---
@@ -79,7 +235,7 @@ class Player(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     terminal_access_level = db.Column(db.String(50), nullable=True, default="unit734")
 
     progress = db.relationship(
@@ -138,7 +294,7 @@ class PlayerProgress(db.Model):
     status = db.Column(db.String(20), nullable=False, default="attempted")
     attempts = db.Column(db.Integer, default=0)
     last_attempted_at = db.Column(
-        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
     solved_at = db.Column(db.DateTime, nullable=True)
     hint_text = db.Column(db.Text, nullable=True)
@@ -170,12 +326,40 @@ class FoundCredential(db.Model):
         db.Integer, db.ForeignKey("Players.player_id"), nullable=False, index=True
     )
     found_username = db.Column(db.String(80), nullable=False)
-    found_at = db.Column(db.DateTime, default=datetime.utcnow)
+    found_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     __table_args__ = (
         db.UniqueConstraint("player_id", "found_username", name="_player_found_uc"),
     )
 
 
+# Compact copy of the progress entries the compaction job moves out of PlayerProgress
+class ArchivedProgress(db.Model):
+    __tablename__ = "ArchivedProgress"
+    id = db.Column(db.Integer, primary_key=True)
+    progress_id = db.Column(db.Integer, nullable=False)
+    player_id = db.Column(db.Integer, nullable=False, index=True)
+    puzzle_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    attempts = db.Column(db.Integer, default=0)
+    last_attempted_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+# Held by the worker process generating a player's puzzle (see acquire_puzzle_generation)
+class PuzzleGenerationClaim(db.Model):
+    __tablename__ = "PuzzleGenerationClaims"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, nullable=False)
+    domain = db.Column(db.String(50), nullable=False)
+    difficulty = db.Column(db.String(50), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint(
+            "player_id", "domain", "difficulty", name="_generation_claim_uc"
+        ),
+    )
+
+
 # --- Helper Functions ---
 
 
@@ -191,17 +375,74 @@ def parse_openai_response_content(response_content: str, context="puzzle"):
             cleaned_text = cleaned_text[: -len("```")].strip()
         return json.loads(cleaned_text)
     except json.JSONDecodeError as e:
-        logging.warning(
-            f"JSONDecodeError parsing OpenAI {context} response content: {e}. Text: '{response_content[:300]}...'"
+        llm_logger.warning(
+            "JSONDecodeError parsing OpenAI %s response content: %s. Text: '%s...'",
+            context,
+            e,
+            response_content[:300],
         )
         return None
     except Exception as e:
-        logging.exception(
-            f"Unexpected error parsing OpenAI {context} response content: {e}"
+        llm_logger.exception(
+            "Unexpected error parsing OpenAI %s response content: %s", context, e
         )
         return None
 
 
+# Incrementally decodes one top-level string field (e.g. "puzzle_description") out
+# of a JSON object that is still being streamed. feed() takes the next raw chunk and
+# returns the newly decoded part of the field's value.
+class JsonStringFieldStream:
+    def __init__(self, field):
+        self._key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self.state = "seeking"  # -> "reading" -> "done"
+
+    @property
+    def started(self):
+        return self.state != "seeking"
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if self.state == "seeking":
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._buffer = self._buffer[match.end() :]
+            self.state = "reading"
+        if self.state != "reading":
+            return ""
+        buffer, i, closed = self._buffer, 0, False
+        while i < len(buffer):
+            if buffer[i] == '"':
+                closed = True
+                break
+            if buffer[i] != "\\":
+                i += 1
+                continue
+            # Only decode complete escapes; keep surrogate pairs together
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] != "u":
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            if buffer[i + 2 : i + 4].lower() in ("d8", "d9", "da", "db") and (
+                i + 12 > len(buffer)
+            ):
+                break
+            i += 6
+        segment = buffer[:i]
+        self._buffer = "" if closed else buffer[i:]
+        if closed:
+            self.state = "done"
+        try:
+            return json.loads(f'"{segment}"', strict=False)
+        except json.JSONDecodeError:
+            return segment
+
+
 # Validates user answers against structured validation criteria
 def validate_structured_criteria(criteria_obj, user_answer):
     validation_type = criteria_obj.get("type", "").lower()
@@ -226,8 +467,10 @@ def validate_structured_criteria(criteria_obj, user_answer):
                 f"Correct! Answer included required keywords: {', '.join(keywords)}.",
             )
         return False, f"Incorrect. Answer was missing keywords: {', '.join(missing)}."
-    logging.warning(
-        f"Unsupported structured validation: {validation_type} or malformed: {criteria_obj}"
+    validation_logger.warning(
+        "Unsupported structured validation: %s or malformed: %s",
+        validation_type,
+        criteria_obj,
     )
     return None, "Unsupported structured validation criteria."
 
@@ -250,151 +493,116 @@ def validate_legacy_criteria(criteria_text, user_answer):
         if user_answer.strip() == expected:
             return True, "Correct! Exact match found."
         return False, f"Incorrect. Expected exact match: '{expected}'."
-    logging.warning(
-        f"No specific legacy validation pattern matched: '{criteria_text[:100]}...'"
+    validation_logger.warning(
+        "No specific legacy validation pattern matched: '%s...'", criteria_text[:100]
     )
     return False, "Could not determine validation method from criteria text."
 
 
-# Restructures code puzzle descriptions to separate task, skeleton, and examples
+# Precompiled patterns for restructure_code_puzzle_description_if_needed
+CODE_FENCE_PATTERN = re.compile(r"```([a-zA-Z0-9_.-]*)\n[\s\S]*?\n```")
+LOOSE_CODE_BLOCK_PATTERN = re.compile(r"```(?:[a-zA-Z0-9_.-]*\n)?([\s\S]*?)\n```")
+FENCE_PAIR_PATTERN = re.compile(r"(```[\s\S]*?```)")
+PLACEHOLDER_PATTERN = re.compile(
+    r"# Your code here|// Your code here|/\* Your code here \*/|# Implement .* here",
+    re.IGNORECASE,
+)
+EXAMPLE_KEYWORD_PATTERN = re.compile(
+    r"\n###?\s*(?:Example Usage|Examples?|Test Cases?)\s*:|Example Usage:",
+    re.IGNORECASE,
+)
+
+
+# Restructures code puzzle descriptions to separate task, skeleton, and examples.
+# Output matches the previous implementation (kept as the reference in
+# benchmark_restructure.py) except where a closing fence is glued straight onto
+# the next opening one (``````): the old index walk lost its place there and could
+# drop or misfile blocks, while this pass treats a glued block like any other.
 def restructure_code_puzzle_description_if_needed(description: str) -> str:
-    placeholder_patterns = [
-        r"# Your code here",
-        r"// Your code here",
-        r"/\* Your code here \*/",
-        r"# Implement .* here",
-    ]
-    code_block_regex = r"```(?:[a-zA-Z0-9_.-]*\n)?([\s\S]*?)\n```"
-    all_code_in_description = "".join(re.findall(code_block_regex, description))
-    has_placeholder = any(
-        re.search(pattern, all_code_in_description, re.IGNORECASE)
-        for pattern in placeholder_patterns
-    )
-    elements_for_keyword_check = re.split(r"(```[\s\S]*?```)", description)
-    text_segments_for_keyword_check = [
-        el for el in elements_for_keyword_check if not el.startswith("```")
-    ]
-    has_example_usage_keyword = any(
-        re.search(
-            r"\n###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
-            segment,
-            re.IGNORECASE | re.MULTILINE,
-        )
-        for segment in text_segments_for_keyword_check
-    ) or any(
-        re.search(r"Example Usage:", segment, re.IGNORECASE | re.MULTILINE)
-        for segment in text_segments_for_keyword_check
-    )
+    # Single pass over the fenced blocks, tracking the text between them
+    main_task_description_parts, example_blocks = [], []
+    main_code_skeleton_block = None
+    has_example_usage_keyword = False
+    fence_count, pos = 0, 0
+    for match in CODE_FENCE_PATTERN.finditer(description):
+        text, block = description[pos : match.start()], match.group(0)
+        fence_count, pos = fence_count + 2, match.end()
+        if not has_example_usage_keyword and EXAMPLE_KEYWORD_PATTERN.search(text):
+            has_example_usage_keyword = True
+        if main_code_skeleton_block is not None:
+            # Only the code blocks after the skeleton are kept as examples
+            example_blocks.append(block)
+        elif PLACEHOLDER_PATTERN.search(block):
+            main_task_description_parts.append(text)
+            main_code_skeleton_block = block
+        else:
+            # Context blocks before the skeleton keep their language tag echoed
+            main_task_description_parts += (text, block, match.group(1))
+    if not has_example_usage_keyword and EXAMPLE_KEYWORD_PATTERN.search(
+        description[pos:]
+    ):
+        has_example_usage_keyword = True
+    has_placeholder = main_code_skeleton_block is not None
+
+    if description.count("```") != fence_count:
+        # Stray fences (e.g. ```c++) pair up differently for each check
+        has_placeholder = bool(
+            PLACEHOLDER_PATTERN.search(
+                "".join(LOOSE_CODE_BLOCK_PATTERN.findall(description))
+            )
+        )
+        has_example_usage_keyword = any(
+            EXAMPLE_KEYWORD_PATTERN.search(segment)
+            for segment in FENCE_PAIR_PATTERN.split(description)
+            if not segment.startswith("```")
+        )
     if not has_placeholder:
-        logging.debug("No placeholder found, not restructuring.")
+        puzzle_logger.debug("No placeholder found, not restructuring.")
         return description
     if not has_example_usage_keyword:
-        logging.debug(
+        puzzle_logger.debug(
             "No 'Example Usage' keyword found, not restructuring complex cases."
         )
         return description  # Keep original if no clear example heading
-    logging.info(
+    puzzle_logger.info(
         "Potential candidate for restructuring based on placeholder and 'Example Usage' keyword."
     )
-    split_pattern = r"(```([a-zA-Z0-9_.-]*)\n[\s\S]*?\n```)"
-    elements = re.split(split_pattern, description)
-    main_task_description_parts, main_code_skeleton_block, example_parts = [], None, []
-    found_main_skeleton, found_example_heading = False, False
-    idx = 0
-    while idx < len(elements):
-        element = elements[idx]
-        if not element:
-            idx += 1
-            continue
-        is_code_block_match = (
-            element.startswith("```")
-            and element.endswith("```")
-            and (idx + 1 < len(elements))
-        )
-        if not found_main_skeleton:
-            if is_code_block_match and any(
-                re.search(pattern, element, re.IGNORECASE)
-                for pattern in placeholder_patterns
-            ):
-                main_code_skeleton_block, found_main_skeleton = element, True
-                idx += 2
-            else:
-                main_task_description_parts.append(element)
-        else:
-            if not is_code_block_match and re.search(
-                r"###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
-                element,
-                re.IGNORECASE | re.MULTILINE,
-            ):
-                found_example_heading = True
-                standardized_heading = "\n### Example Usage:\n"
-                cleaned_element_text = re.sub(
-                    r"###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
-                    "",
-                    element.strip(),
-                    flags=re.IGNORECASE,
-                ).strip()
-                example_parts.append(standardized_heading)
-                if cleaned_element_text:
-                    example_parts.append(cleaned_element_text + "\n")
-            elif found_example_heading:
-                example_parts.append(element)
-                idx += 2 if is_code_block_match else 0
-            elif is_code_block_match:
-                if not found_example_heading:
-                    example_parts.append("\n### Example Usage:\n")
-                    found_example_heading = True
-                example_parts.append(element)
-                idx += 2
-            else:
-                # Heuristic: if it's text followed by a code block, assume it's part of examples
-                if (
-                    idx + 1 < len(elements) and elements[idx + 1].startswith("```")
-                ) or (
-                    idx + 3 < len(elements) and elements[idx + 3].startswith("```")
-                ):  # Check further ahead for code blocks
-                    if not found_example_heading:
-                        example_parts.append("\n### Example Usage:\n")
-                        found_example_heading = True
-                    example_parts.append(element)
-                else:  # Otherwise, probably still part of the main description
-                    main_task_description_parts.append(element)
-        idx += 1
-    if not main_code_skeleton_block:
-        logging.debug("Main32 skeleton not identified, returning original.")
+    if main_code_skeleton_block is None:
+        puzzle_logger.debug("Main32 skeleton not identified, returning original.")
         return description
     final_desc = (
         "".join(main_task_description_parts).strip()
         + "\n\n"
         + main_code_skeleton_block.strip()
     )
-    if example_parts:
-        final_desc += "\n" + "".join(example_parts).strip()
-    if len(final_desc) > len(description) * 0.8 or found_example_heading:
-        logging.info("Puzzle description restructured.")
+    if example_blocks:
+        final_desc += "\n### Example Usage:\n" + "".join(example_blocks).strip()
+    if len(final_desc) > len(description) * 0.8 or example_blocks:
+        puzzle_logger.info("Puzzle description restructured.")
         return final_desc.strip()
-    logging.info("Restructuring not significant or failed, returning original.")
+    puzzle_logger.info("Restructuring not significant or failed, returning original.")
     return description
 
 
-# Generates a prompt for OpenAI to create a puzzle based on domain and difficulty
-def get_puzzle_generation_prompt(domain, difficulty):
-    common_instructions = f"""
+# Invariant puzzle instructions; kept first in every prompt so the upstream can
+# reuse its cached prefix across domains and difficulties
+PUZZLE_PROMPT_INSTRUCTIONS = """
+    You are an expert puzzle creator. Your primary goal is to generate **diverse, novel, and impeccably formatted** puzzles.
     **Output Format (Strictly Adhere):**
     Return ONLY a single, valid JSON object (no ```json markdown tags around the final JSON object itself) with these exact keys:
     - "puzzle_description": (string) The concise, well-formatted, and novel puzzle. Use Markdown for all text formatting (bold, italics, lists, code blocks). Ensure any emphasis like **bold text** is correctly and consistently applied using Markdown.
-    - "domain": (string) '{domain}'.
-    - "difficulty": (string) '{difficulty}'.
+    - "domain": (string) The requested domain.
+    - "difficulty": (string) The requested difficulty.
     - "validation_criteria": (string) EITHER a JSON string representing structured criteria OR clear free-text criteria.
 
     **Validation Criteria (Crucial):**
     Provide clear, specific validation criteria.
     * **Preference for Structured Criteria:** Whenever possible, return `validation_criteria` as a JSON **string**. This JSON string should contain an object with a `type` field and other relevant fields.
         * Examples:
-            * Multiple Choice: `{{"type": "multiple_choice", "correct_option": "C", "options": ["Option A text", "Option B text", "Option C text", "Option D text"]}}`
-            * Exact Match: `{{"type": "exact_match", "expected": "The precise expected string"}}`
-            * Keyword Match: `{{"type": "keyword_match", "keywords": ["keyword1", "concept_A"], "match_all": true}}`
-            * Code Check: `{{"type": "code_contains", "substrings": ["specific_function_call("], "must_not_contain": ["forbidden_pattern"]}}`
+            * Multiple Choice: `{"type": "multiple_choice", "correct_option": "C", "options": ["Option A text", "Option B text", "Option C text", "Option D text"]}`
+            * Exact Match: `{"type": "exact_match", "expected": "The precise expected string"}`
+            * Keyword Match: `{"type": "keyword_match", "keywords": ["keyword1", "concept_A"], "match_all": true}`
+            * Code Check: `{"type": "code_contains", "substrings": ["specific_function_call("], "must_not_contain": ["forbidden_pattern"]}`
     * **Free-Text Criteria (Fallback):** If structured criteria are not suitable, provide clear, actionable free-text criteria.
 
     **General Puzzle Requirements:**
@@ -411,6 +619,12 @@ def get_puzzle_generation_prompt(domain, difficulty):
         * For multiple-choice questions, clearly label options: A), B), C), D). Each option on a new line.
     * **Minimalism:** Any provided code (skeletons, context) must be minimal and essential.
     """
+
+
+# Builds the puzzle prompt once per (domain, difficulty): invariant instructions first,
+# then the domain/difficulty guidance, then the request itself
+@functools.lru_cache(maxsize=None)
+def get_puzzle_generation_prompt(domain, difficulty):
     difficulty_guidance_map = {
         "easy": "Focus on a single, fundamental concept or a very simple task. Solvable with a short answer or a few lines of code.",
         "medium": "Present a well-defined, small-to-medium task applying a core concept or common pattern. Solvable in a few minutes. Description must be concise.",
@@ -445,10 +659,9 @@ def get_puzzle_generation_prompt(domain, difficulty):
         * **Formatting Note:** Clear terminology. Pseudo-code in ```plaintext.
         """
     prompt = f"""
-    You are an expert puzzle creator. Your primary goal is to generate **diverse, novel, and impeccably formatted** puzzles.
-    **Request:** Generate a **single, unique, and self-contained** puzzle for domain '{domain}' at '{difficulty}' difficulty.
+    {PUZZLE_PROMPT_INSTRUCTIONS.strip()}
     {domain_specific_content}
-    {common_instructions}
+    **Request:** Generate a **single, unique, and self-contained** puzzle for domain '{domain}' at '{difficulty}' difficulty.
     """
     return prompt.strip()
 
@@ -456,95 +669,1001 @@ def get_puzzle_generation_prompt(domain, difficulty):
 # --- API Endpoints ---
 
 
-@app.route("/status")  # Changed from / to avoid conflict with index route
+@bp.route("/status")  # Changed from / to avoid conflict with index route
 def home():
     return jsonify({"status": "Backend server is running!"}), 200
 
 
-# Route for the landing page
-@app.route("/")
-def landing_page():
-    """Serves the animated landing page."""
-    return render_template("landing.html")
+# --- Static Assets ---
+# Fingerprinted builds from build_assets.py: source path -> hashed path under static/dist
+asset_manifest = {}  # Loaded by create_app()
+
+
+# Returns the URL of the fingerprinted build of a static asset, or of the plain file
+@bp.app_template_global()
+def asset_url(filename):
+    hashed_filename = asset_manifest.get(filename)
+    if hashed_filename:
+        return f"{current_app.static_url_path}/{build_assets.DIST_DIRNAME}/{hashed_filename}"
+    return f"{current_app.static_url_path}/{filename}"
+
+
+# Serves a fingerprinted asset, preferring the pre-compressed variant the client accepts
+@bp.route("/static/dist/<path:filename>")
+def hashed_static(filename):
+    dist_folder = os.path.join(current_app.static_folder, build_assets.DIST_DIRNAME)
+    mimetype = mimetypes.guess_type(filename)[0]
+    response = None
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[encoding] and os.path.isfile(
+            os.path.join(dist_folder, filename + suffix)
+        ):
+            response = send_from_directory(
+                dist_folder,
+                filename + suffix,
+                mimetype=mimetype,
+                max_age=ASSET_CACHE_MAX_AGE,
+            )
+            response.content_encoding = encoding
+            break
+    if response is None:
+        response = send_from_directory(
+            dist_folder, filename, max_age=ASSET_CACHE_MAX_AGE
+        )
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+# Gzips large JSON API payloads for clients that accept it. Cached bodies arrive
+# already gzipped (see cached_json_response) and are left alone
+@bp.after_app_request
+def compress_json_response(response):
+    if (
+        response.mimetype != "application/json"
+        or response.direct_passthrough
+        or response.content_encoding
+        or not request.accept_encodings["gzip"]
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < JSON_COMPRESSION_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.content_encoding = "gzip"
+    response.vary.add("Accept-Encoding")
+    # The gzip variant is a different representation, so it needs its own ETag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-gzip", weak)
+    return response
+
+
+# --- Request IDs ---
+# Every request gets an ID (the caller's X-Request-ID, or a new one) that is stamped
+# on each log record it produces, including OpenAI calls and background work it
+# starts, and echoed in the response so a client report can be matched to the logs.
+@bp.before_app_request
+def start_request_id():
+    g.request_id_token = log_pipeline.start_request(request.headers.get("X-Request-ID"))
+
+
+@bp.after_app_request
+def add_request_id_header(response):
+    response.headers["X-Request-ID"] = log_pipeline.get_request_id()
+    return response
+
+
+@bp.teardown_app_request
+def end_request_id(exc):
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        log_pipeline.end_request(token)
+
+
+# stream_with_context for bodies that log: a streamed body runs after the view's
+# teardown has cleared the request ID, so it is set again around the stream
+def stream_with_request_id(generator):
+    request_id = log_pipeline.get_request_id()
+    # The request's bulkhead slot is held until the stream is done, not just until
+    # the view returns
+    held_slot = g.pop("bulkhead_slot", None)
+    if held_slot is not None:
+
+        @after_this_request
+        def release_slot_after_stream(response):
+            response.call_on_close(lambda: leave_bulkhead(held_slot))
+            return response
+
+    def restore_request_id():
+        token = log_pipeline.start_request(request_id)
+        try:
+            yield from generator
+        finally:
+            log_pipeline.end_request(token)
+
+    return stream_with_context(restore_request_id())
+
+
+# --- Metrics ---
+# Prometheus metrics at /metrics (see metrics.py): latency and status per route,
+# database queries per request, OpenAI calls, and answer validation outcomes.
+metrics_registry = metrics.MetricsRegistry()
+http_requests = metrics_registry.counter(
+    "enigma_http_requests_total",
+    "HTTP requests by route, method and status code.",
+    ["route", "method", "status"],
+)
+http_request_duration = metrics_registry.histogram(
+    "enigma_http_request_duration_seconds",
+    "Time to build the response (streamed bodies excluded).",
+    ["route", "method"],
+)
+db_queries_per_request = metrics_registry.histogram(
+    "enigma_db_queries_per_request",
+    "Database queries run while building a response.",
+    ["route"],
+    buckets=metrics.COUNT_BUCKETS,
+)
+db_seconds_per_request = metrics_registry.histogram(
+    "enigma_db_seconds_per_request",
+    "Time spent in database queries while building a response.",
+    ["route"],
+)
+db_query_duration = metrics_registry.histogram(
+    "enigma_db_query_duration_seconds",
+    "Duration of single database queries (route 'background' outside requests).",
+    ["route"],
+)
+llm_calls = metrics_registry.counter(
+    "enigma_llm_calls_total",
+    "OpenAI calls by kind (puzzle/hint) and outcome.",
+    ["kind", "outcome"],
+)
+llm_call_duration = metrics_registry.histogram(
+    "enigma_llm_call_duration_seconds",
+    "Duration of OpenAI calls that reached the provider.",
+    ["kind", "outcome"],
+    buckets=metrics.LLM_LATENCY_BUCKETS,
+)
+llm_retries = metrics_registry.counter(
+    "enigma_llm_retries_total",
+    "OpenAI calls retried after a failed or unusable attempt.",
+    ["kind"],
+)
+llm_finish_reasons = metrics_registry.counter(
+    "enigma_llm_finish_reasons_total",
+    "Finish reasons of completed OpenAI calls.",
+    ["kind", "finish_reason"],
+)
+llm_tokens = metrics_registry.counter(
+    "enigma_llm_tokens_total",
+    "Tokens used by OpenAI calls, by type (prompt, cached, completion).",
+    ["kind", "type"],
+)
+answer_validations = metrics_registry.counter(
+    "enigma_answer_validations_total",
+    "Answers checked by /validate_answer, by criteria format and outcome.",
+    ["criteria", "outcome"],
+)
+
+
+# Route label of the current request: its URL rule, so ids in paths don't add series
+def get_metrics_route():
+    if not has_request_context():
+        return "background"
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+@bp.before_app_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+    route = get_metrics_route()
+    http_request_duration.observe(time.perf_counter() - started, route, request.method)
+    http_requests.inc(route, request.method, str(response.status_code))
+    db_queries_per_request.observe(g.db_queries, route)
+    db_seconds_per_request.observe(g.db_seconds, route)
+    return response
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_started"] = time.perf_counter()
+
+
+def record_query_metrics(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("metrics_query_started")
+    db_query_duration.observe(elapsed, get_metrics_route())
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+
+
+# Every engine, including the one Flask-SQLAlchemy creates on first use
+event.listen(Engine, "before_cursor_execute", start_query_timer)
+event.listen(Engine, "after_cursor_execute", record_query_metrics)
+
+
+# Counts one OpenAI call; started is None for calls that never reached the provider
+def record_llm_call(kind, outcome, started=None):
+    llm_calls.inc(kind, outcome)
+    if started is not None:
+        llm_call_duration.observe(time.monotonic() - started, kind, outcome)
+
+
+# Serves every metric in the Prometheus text format
+@bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    return current_app.response_class(
+        metrics_registry.render(), content_type=metrics.CONTENT_TYPE
+    )
+
+
+# --- Bulkheads ---
+# Requests are classified by endpoint and every class gets its own concurrency limit
+# and short wait queue, so a burst of slow /generate_puzzle calls waiting on OpenAI
+# can't take every server thread from answers, logins and pages. Requests that find
+# their class's queue full (or wait too long) are shed with 503 and a Retry-After
+# estimated from the queue depth and how long the class's requests have been taking.
+BULKHEADS_ENABLED = os.getenv("BULKHEADS", "true").lower() == "true"
+# Per class: (concurrent requests, requests allowed to wait, seconds they may wait).
+# LLM-bound requests get fewer slots than a worker has threads (GUNICORN_THREADS,
+# default 8) and almost no queue, which keeps threads free for the other classes.
+BULKHEAD_LIMITS = {
+    "llm": (
+        int(os.getenv("BULKHEAD_LLM_CONCURRENCY", "3")),
+        int(os.getenv("BULKHEAD_LLM_QUEUE", "1")),
+        2,
+    ),
+    "write": (6, 16, 5),
+    "read": (6, 32, 5),
+    "static": (8, 64, 5),
+}
+BULKHEAD_SECONDS_WEIGHT = 0.2  # Weight of the latest request in the average hold time
+LLM_ENDPOINTS = {"enigma.generate_puzzle", "enigma.generate_puzzle_stream"}
+STATIC_ENDPOINTS = {
+    "static",
+    "enigma.hashed_static",
+    "enigma.get_riddle_index",
+    "enigma.get_riddle_chunk",
+    "enigma.get_terminal_fs_node",
+    "enigma.home",
+}
+
+
+class Bulkhead:
+    def __init__(self, name, max_concurrency, max_queue_depth, timeout):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._avg_seconds = 1.0  # Moving average of how long requests hold a slot
+        self.stats = {
+            "admitted": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+            "max_queue_depth": 0,
+        }
+
+    # Seconds until the queue ahead of a newcomer has likely drained
+    def _retry_after(self):
+        return max(
+            1,
+            math.ceil((self._waiting + 1) * self._avg_seconds / self.max_concurrency),
+        )
+
+    # Takes a slot, waiting up to the class's timeout; returns None once admitted, or
+    # the Retry-After seconds when the request is shed
+    def enter(self):
+        with self._cond:
+            if self._active >= self.max_concurrency:
+                if self._waiting >= self.max_queue_depth:
+                    self.stats["shed_queue_full"] += 1
+                    return self._retry_after()
+                self._waiting += 1
+                self.stats["max_queue_depth"] = max(
+                    self.stats["max_queue_depth"], self._waiting
+                )
+                deadline = time.monotonic() + self.timeout
+                try:
+                    while self._active >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats["shed_timeout"] += 1
+                            return self._retry_after()
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self.stats["admitted"] += 1
+            return None
+
+    def leave(self, held_seconds):
+        with self._cond:
+            self._active -= 1
+            self._avg_seconds += BULKHEAD_SECONDS_WEIGHT * (
+                held_seconds - self._avg_seconds
+            )
+            self._cond.notify()
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "active": self._active,
+                "queue_depth": self._waiting,
+                "max_concurrency": self.max_concurrency,
+                "max_waiting": self.max_queue_depth,
+                "avg_request_seconds": round(self._avg_seconds, 4),
+                **self.stats,
+            }
+
+
+bulkheads = {name: Bulkhead(name, *limits) for name, limits in BULKHEAD_LIMITS.items()}
+bulkhead_shed = metrics_registry.counter(
+    "enigma_bulkhead_shed_total",
+    "Requests shed with 503 because their class was at capacity.",
+    ["request_class"],
+)
+
+
+# Bulkhead class of the current request, or None for requests no route matched
+def get_request_class():
+    endpoint = request.endpoint
+    if endpoint is None:
+        return None
+    if endpoint in LLM_ENDPOINTS:
+        return "llm"
+    if (
+        endpoint in STATIC_ENDPOINTS
+        or endpoint.removeprefix(f"{bp.name}.") in STATIC_PAGES
+    ):
+        return "static"
+    return "read" if request.method in ("GET", "HEAD", "OPTIONS") else "write"
+
+
+@bp.before_app_request
+def enter_bulkhead():
+    if not BULKHEADS_ENABLED:
+        return None
+    request_class = get_request_class()
+    if request_class is None:
+        return None
+    retry_after = bulkheads[request_class].enter()
+    if retry_after is not None:
+        bulkhead_shed.inc(request_class)
+        return (
+            jsonify({"error": "Server is busy. Please try again shortly."}),
+            503,
+            {"Retry-After": str(retry_after)},
+        )
+    g.bulkhead_slot = (request_class, time.monotonic())
+    return None
+
+
+def leave_bulkhead(held_slot):
+    request_class, started = held_slot
+    bulkheads[request_class].leave(time.monotonic() - started)
+
+
+@bp.teardown_app_request
+def release_bulkhead_slot(exc):
+    held_slot = g.pop("bulkhead_slot", None)
+    if held_slot is not None:
+        leave_bulkhead(held_slot)
+
 
+# Reports each request class's slots, queue and shed requests
+@bp.route("/api/bulkheads", methods=["GET"])
+def get_bulkhead_stats():
+    return (
+        jsonify(
+            {
+                "enabled": BULKHEADS_ENABLED,
+                "classes": {name: b.snapshot() for name, b in bulkheads.items()},
+            }
+        ),
+        200,
+    )
 
-# Route for the main application
-@app.route("/enigma")
-def enigma_home():
-    """Serves the main game page."""
-    return render_template("index.html")
+
+# --- Request Profiling ---
+# Opt-in captures of single requests to the routes below (see request_profiler.py):
+# a CPU profile, flame-graph stack samples and/or allocations. A request is captured
+# when it sends "X-Profile: cpu,stacks,alloc" with "Authorization: Bearer
+# $PROFILING_TOKEN", or is picked by the sample rate an admin set through
+# /api/profiles/settings. Without the token, profiling is off entirely.
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_STORED = 50
+PROFILE_MAX_SAMPLING_MINUTES = 24 * 60
+PROFILED_ENDPOINTS = {
+    "enigma.validate_answer",
+    "enigma.generate_puzzle",
+    "enigma.get_player_statistics",
+}
+profile_store = request_profiler.ProfileStore(PROFILE_DIR, PROFILE_MAX_STORED)
+# Sampling switched on by an admin; off until then, and again once it expires
+profiling_settings = {"sample_rate": 0.0, "kinds": ["cpu"], "until": None}
+# One capture at a time: tracemalloc is process-wide, and captures slow the server
+profiling_slot = threading.Lock()
+
+
+def is_profiling_admin():
+    return bool(PROFILING_TOKEN) and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {PROFILING_TOKEN}"
+    )
 
 
-@app.route("/terminal")
-def terminal():
-    """Serves the terminal interface."""
-    return render_template("terminal.html")
+# Kinds to capture for this request and what triggered it, or (None, None)
+def choose_profile_kinds():
+    if "X-Profile" in request.headers:
+        if not is_profiling_admin():
+            return None, None
+        return request_profiler.parse_kinds(request.headers["X-Profile"]), "header"
+    settings = profiling_settings
+    if (
+        settings["sample_rate"] > 0
+        and datetime.utcnow() < settings["until"]
+        and random.random() < settings["sample_rate"]
+    ):
+        return settings["kinds"], "sampled"
+    return None, None
 
 
-@app.route("/final-easy-complete")
-def final_easy_complete():
-    return render_template("final-easy-complete.html")
+@bp.before_app_request
+def start_request_profile():
+    if request.endpoint not in PROFILED_ENDPOINTS or not PROFILING_TOKEN:
+        return
+    kinds, trigger = choose_profile_kinds()
+    if not kinds or not profiling_slot.acquire(blocking=False):
+        return
+    try:
+        profile = request_profiler.RequestProfile(kinds)
+        profile.start()
+    except Exception:
+        profiling_slot.release()
+        logging.exception("Could not start request profile.")
+        return
+    g.request_profile = (profile, trigger)
 
 
-@app.route("/final-hard-complete")
-def final_hard_complete():
-    return render_template("final-hard-complete.html")
+# Stops the capture and stores it; status is None when the view raised
+def finish_request_profile(status):
+    profile, trigger = g.pop("request_profile")
+    try:
+        artifacts, seconds = profile.stop()
+        return profile_store.save(
+            {
+                "captured_at": datetime.utcnow().isoformat(),
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": status,
+                "request_id": log_pipeline.get_request_id(),
+                "trigger": trigger,
+                "kinds": profile.kinds,
+                "seconds": round(seconds, 4),
+            },
+            artifacts,
+        )
+    except Exception:
+        logging.exception("Could not save request profile.")
+        return None
+    finally:
+        profiling_slot.release()
+
+
+@bp.after_app_request
+def stop_request_profile(response):
+    if "request_profile" in g:
+        profile_id = finish_request_profile(response.status_code)
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+@bp.teardown_app_request
+def discard_request_profile(exc):
+    if "request_profile" in g:
+        finish_request_profile(None)
+
+
+# Lists stored profiles, newest first
+@bp.route("/api/profiles", methods=["GET"])
+def list_profiles():
+    if not PROFILING_TOKEN:
+        return jsonify({"error": "Profiling is not configured"}), 503
+    if not is_profiling_admin():
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({"profiles": profile_store.list()}), 200
+
+
+# Downloads one artifact: cpu.pstats (python -m pstats, snakeviz), cpu.txt,
+# stacks.folded (flamegraph.pl, speedscope) or alloc.txt
+@bp.route("/api/profiles/<string:profile_id>/<string:artifact>", methods=["GET"])
+def download_profile(profile_id, artifact):
+    if not PROFILING_TOKEN:
+        return jsonify({"error": "Profiling is not configured"}), 503
+    if not is_profiling_admin():
+        return jsonify({"error": "Unauthorized"}), 401
+    directory = profile_store.artifact_directory(profile_id, artifact)
+    if directory is None:
+        return jsonify({"error": "Profile artifact not found"}), 404
+    return send_from_directory(
+        os.path.abspath(directory),
+        artifact,
+        as_attachment=True,
+        download_name=f"{profile_id}-{artifact}",
+    )
 
 
-@app.route("/retry_puzzle")
-def retry_puzzle():
-    return render_template("retry_puzzle.html")
+# Shows or sets sampled profiling: {"sample_rate": 0.05, "kinds": ["stacks"],
+# "minutes": 30}; a sample_rate of 0 switches it off
+@bp.route("/api/profiles/settings", methods=["GET", "POST"])
+def profiling_settings_endpoint():
+    global profiling_settings
+    if not PROFILING_TOKEN:
+        return jsonify({"error": "Profiling is not configured"}), 503
+    if not is_profiling_admin():
+        return jsonify({"error": "Unauthorized"}), 401
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        try:
+            sample_rate = float(data.get("sample_rate", 0))
+            minutes = float(data.get("minutes", 15))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate and minutes must be numbers"}), 400
+        kinds = request_profiler.parse_kinds(",".join(data.get("kinds") or ["cpu"]))
+        if not 0 <= sample_rate <= 1 or not kinds:
+            return (
+                jsonify(
+                    {
+                        "error": "sample_rate must be between 0 and 1, kinds one or "
+                        f"more of {', '.join(request_profiler.PROFILE_KINDS)}"
+                    }
+                ),
+                400,
+            )
+        minutes = min(max(minutes, 0), PROFILE_MAX_SAMPLING_MINUTES)
+        # Replaced as a whole, so a request never sees half of the new settings
+        profiling_settings = {
+            "sample_rate": sample_rate,
+            "kinds": kinds,
+            "until": datetime.utcnow() + timedelta(minutes=minutes),
+        }
+        logging.info(
+            f"Sampled profiling set to {sample_rate} ({', '.join(kinds)}) for "
+            f"{minutes} minutes."
+        )
+    settings = profiling_settings
+    active = settings["sample_rate"] > 0 and datetime.utcnow() < settings["until"]
+    return (
+        jsonify(
+            {
+                "sample_rate": settings["sample_rate"] if active else 0.0,
+                "kinds": settings["kinds"],
+                "until": settings["until"].isoformat() if active else None,
+                "profiled_endpoints": sorted(PROFILED_ENDPOINTS),
+            }
+        ),
+        200,
+    )
 
 
-@app.route("/personnel/dr-thorne")
-def dr_thorne_route():
-    return render_template("Dr. Thorne.html")
+# --- Traffic Capture ---
+# Opt-in recording of live requests for replay_traffic.py (see traffic_capture.py):
+# with TRAFFIC_CAPTURE_FILE set, each API request is appended to that file with its
+# timing, status, response and the LLM completions it used, so it can be replayed
+# against another build with the same LLM outputs. Passwords and emails are
+# pseudonymized and request headers are not kept.
+TRAFFIC_CAPTURE_FILE = os.getenv("TRAFFIC_CAPTURE_FILE")
+TRAFFIC_CAPTURE_MAX_BODY = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY", "65536"))
+# Secret for the pseudonyms. A player's sign-up and later logins only replay if
+# they got the same pseudonymized password, so every worker and every restart
+# that writes to a capture must use the same key
+TRAFFIC_CAPTURE_KEY = os.getenv("TRAFFIC_CAPTURE_KEY")
+# Static files and operational endpoints (several need credentials that aren't kept)
+TRAFFIC_CAPTURE_SKIPPED_ENDPOINTS = STATIC_ENDPOINTS | {
+    "enigma.get_metrics",
+    "enigma.get_bulkhead_stats",
+    "enigma.list_profiles",
+    "enigma.download_profile",
+    "enigma.profiling_settings_endpoint",
+    "enigma.get_traffic_capture_stats",
+    "enigma.export_analytics",
+    "enigma.get_compaction_report",
+}
+traffic_recorder = None  # Set up by create_app() when TRAFFIC_CAPTURE_FILE is set
+
+
+@bp.before_app_request
+def start_traffic_capture():
+    if (
+        traffic_recorder is None
+        or request.endpoint is None
+        or request.endpoint in TRAFFIC_CAPTURE_SKIPPED_ENDPOINTS
+    ):
+        return
+    request_id = log_pipeline.get_request_id()
+    traffic_recorder.begin(request_id)
+    g.traffic_capture = (request_id, time.time(), time.perf_counter())
 
 
-@app.route("/personnel/dr-lena")
-def dr_lena_route():
-    return render_template("Dr.Lena.html")
+@bp.after_app_request
+def record_traffic(response):
+    if "traffic_capture" not in g:
+        return response
+    request_id, arrived_at, started = g.pop("traffic_capture")
+    try:
+        query = request.query_string.decode("utf-8", "replace")
+        body = request.get_json(silent=True)
+        entry = {
+            "ts": round(arrived_at, 3),
+            "id": request_id,
+            "e": request.endpoint,
+            "m": request.method,
+            "p": f"{request.path}?{query}" if query else request.path,
+            "b": traffic_recorder.pseudonymizer.sanitize_request(body),
+            "s": response.status_code,
+        }
+        if response.is_streamed or response.direct_passthrough:
+            # Recorded once the body has been sent, with the LLM calls it made
+            entry["r"] = None
+            response.call_on_close(lambda: traffic_recorder.finish(entry, started))
+        else:
+            entry.update(
+                traffic_capture.describe_body(
+                    response.get_data(),
+                    response.mimetype == "application/json",
+                    TRAFFIC_CAPTURE_MAX_BODY,
+                )
+            )
+            traffic_recorder.finish(entry, started)
+    except Exception:
+        traffic_recorder.discard(request_id)
+        logging.exception("Could not record request for traffic capture.")
+    return response
+
+
+@bp.teardown_app_request
+def discard_traffic_capture(exc):
+    if "traffic_capture" in g:  # No response was recorded
+        request_id, _, _ = g.pop("traffic_capture")
+        traffic_recorder.discard(request_id)
+
+
+# Reports whether traffic is being captured and how much has been recorded
+@bp.route("/api/traffic_capture", methods=["GET"])
+def get_traffic_capture_stats():
+    if traffic_recorder is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **traffic_recorder.stats}), 200
+
+
+# --- Static Pages ---
+# Context-free pages, rendered once and served from memory: endpoint -> (rule, template)
+STATIC_PAGES = {
+    "landing_page": ("/", "landing.html"),
+    "enigma_home": ("/enigma", "index.html"),
+    "terminal": ("/terminal", "terminal.html"),
+    "final_easy_complete": ("/final-easy-complete", "final-easy-complete.html"),
+    "final_hard_complete": ("/final-hard-complete", "final-hard-escape.html"),
+    "retry_puzzle": ("/retry_puzzle", "retry_puzzle.html"),
+    "dr_thorne_route": ("/personnel/dr-thorne", "Dr. Thorne.html"),
+    "dr_lena_route": ("/personnel/dr-lena", "Dr.Lena.html"),
+    "kappa_route": ("/personnel/kappa-7", "Kappa.html"),
+    "sigma_route": ("/personnel/sigma-3", "Sigma.html"),
+    "hard_motivation_route": ("/briefing/hard-motivation", "hard_motivation.html"),
+    "introduction_route": ("/introduction", "introduction.html"),
+    "nightmare_motivation_route": (
+        "/nightmare-motivation",
+        "nightmare_motivation.html",
+    ),
+    "welcome_packet_route": ("/welcome-packet", "Welcome Packet.html"),
+    "invaders_route": ("/simulation/invaders", "invaders.html"),
+    "statistics_page": ("/statistics", "statistics.html"),
+}
+rendered_pages = {}
+
+
+# Renders a static page into a cached body with its ETag and Last-Modified validators
+def render_static_page(endpoint):
+    template_name = STATIC_PAGES[endpoint][1]
+    template_path = os.path.join(
+        current_app.root_path, current_app.template_folder, template_name
+    )
+    mtime = int(os.path.getmtime(template_path)) if os.path.exists(template_path) else 0
+    body = render_template(template_name).encode("utf-8")
+    page = {
+        "body": body,
+        "etag": hashlib.sha1(body).hexdigest(),
+        "last_modified": mtime,
+        "template_path": template_path,
+    }
+    rendered_pages[endpoint] = page
+    logging.debug(f"Rendered static page '{template_name}' ({len(body)} bytes).")
+    return page
 
 
-@app.route("/personnel/kappa-7")
-def kappa_route():
-    return render_template("Kappa.html")
+# Renders every static page up front so the first visitor doesn't pay for Jinja
+def prerender_static_pages():
+    for endpoint, (rule, template_name) in STATIC_PAGES.items():
+        try:
+            render_static_page(endpoint)
+        except Exception as e:
+            logging.warning(f"Could not pre-render '{template_name}' for {rule}: {e}")
 
 
-@app.route("/personnel/sigma-3")
-def sigma_route():
-    return render_template("Sigma.html")
+# Serves a static page from the cache, answering conditional requests with 304
+def serve_static_page():
+    endpoint = request.endpoint.removeprefix(f"{bp.name}.")
+    page = rendered_pages.get(endpoint)
+    if page is None or (
+        current_app.jinja_env.auto_reload
+        and os.path.exists(page["template_path"])
+        and int(os.path.getmtime(page["template_path"])) != page["last_modified"]
+    ):
+        page = render_static_page(endpoint)
+    response = current_app.response_class(page["body"], mimetype="text/html")
+    response.set_etag(page["etag"])
+    response.last_modified = page["last_modified"]
+    # Always revalidate; unchanged pages are answered with an empty 304
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+for _endpoint, (_rule, _template_name) in STATIC_PAGES.items():
+    bp.add_url_rule(_rule, _endpoint, serve_static_page)
+
+
+# --- Riddle Packs ---
+# Static riddles (with their MD5 answer hashes) served per difficulty/specialization in chunks
+RIDDLE_PACK_FOLDER = "riddle_packs"
+RIDDLE_PACK_NAMES = ["easy", "hard", "nightmare", "final"]
+RIDDLE_CHUNK_SIZE = 5
+RIDDLE_CACHE_MAX_AGE = 3600
+riddle_pack_responses = (
+    {}
+)  # (difficulty, specialization, chunk) or "index" -> (body, etag, gzip body)
+
+
+# Serializes a payload once, keeping its body, ETag and (when large enough to be
+# worth it) gzipped body for reuse
+def build_cached_json(payload):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    gzipped = (
+        gzip.compress(body, compresslevel=9)
+        if len(body) >= JSON_COMPRESSION_MIN_BYTES
+        else None
+    )
+    return body, hashlib.sha1(body).hexdigest(), gzipped
+
+
+# Loads the riddle packs and pre-serializes the index and every chunk
+def load_riddle_packs():
+    pack_counts, lore_entries = {}, []
+    for pack_name in RIDDLE_PACK_NAMES:
+        pack_path = os.path.join(APP_ROOT, RIDDLE_PACK_FOLDER, f"{pack_name}.json")
+        with open(pack_path, encoding="utf-8") as f:
+            pack = json.load(f)
+        pack_counts[pack_name] = {}
+        for specialization, riddles in pack.items():
+            pack_counts[pack_name][specialization] = len(riddles)
+            for start in range(0, len(riddles), RIDDLE_CHUNK_SIZE):
+                chunk = start // RIDDLE_CHUNK_SIZE
+                riddle_pack_responses[(pack_name, specialization, chunk)] = (
+                    build_cached_json(
+                        {
+                            "difficulty": pack_name,
+                            "specialization": specialization,
+                            "chunk": chunk,
+                            "start": start,
+                            "total": len(riddles),
+                            "riddles": riddles[start : start + RIDDLE_CHUNK_SIZE],
+                        }
+                    )
+                )
+            for index, riddle in enumerate(riddles):
+                if riddle.get("lore"):
+                    source = (
+                        f"Final/{specialization}"
+                        if pack_name == "final"
+                        else f"{pack_name}/{specialization} {index + 1}"
+                    )
+                    lore_entries.append({"source": source, "lore": riddle["lore"]})
+    riddle_pack_responses["index"] = build_cached_json(
+        {"chunk_size": RIDDLE_CHUNK_SIZE, "packs": pack_counts, "lore": lore_entries}
+    )
+    logging.info(
+        f"Loaded riddle packs: {len(riddle_pack_responses) - 1} chunks across {len(RIDDLE_PACK_NAMES)} packs."
+    )
 
 
-@app.route("/briefing/hard-motivation")
-def hard_motivation_route():
-    return render_template("hard_motivation.html")
+# Builds a cacheable JSON response from a pre-serialized body; private bodies always revalidate
+def cached_json_response(cached, private=False):
+    body, etag, gzipped = cached
+    encoding = None
+    if gzipped is not None and request.accept_encodings["gzip"]:
+        body, etag, encoding = gzipped, f"{etag}-gzip", "gzip"
+    response = current_app.response_class(body, mimetype="application/json")
+    response.content_encoding = encoding
+    if gzipped is not None:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    if private:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = RIDDLE_CACHE_MAX_AGE
+    return response.make_conditional(request)
 
 
-@app.route("/introduction")
-def introduction_route():
-    return render_template("introduction.html")
+# Lists the available riddle packs, their sizes and the lore they contain
+@bp.route("/api/riddles", methods=["GET"])
+def get_riddle_index():
+    return cached_json_response(riddle_pack_responses["index"])
 
 
-@app.route("/nightmare-motivation")
-def nightmare_motivation_route():
-    return render_template("nightmare_motivation.html")
+# Returns one chunk of a riddle pack, e.g. /api/riddles/hard/backend/1
+@bp.route(
+    "/api/riddles/<string:difficulty>/<string:specialization>/<int:chunk>",
+    methods=["GET"],
+)
+def get_riddle_chunk(difficulty, specialization, chunk):
+    cached = riddle_pack_responses.get(
+        (difficulty.lower(), specialization.lower(), chunk)
+    )
+    if cached is None:
+        return jsonify({"error": "Riddle pack chunk not found"}), 404
+    return cached_json_response(cached)
+
+
+# --- Terminal Filesystem ---
+# Simulated filesystem for the secure terminal: access level -> {path: content}.
+# Every level also sees the guest files; its own files take precedence. A visitor
+# holds the guest level plus the levels they have proven this session by logging
+# in to the terminal (see terminal_login); they are kept in the signed session.
+TERMINAL_FILESYSTEM_FILE = "terminal_filesystem.json"
+TERMINAL_BASE_ACCESS_LEVEL = "guest"
+# Special terminal accounts: login name (lowercased) -> (password, access level)
+TERMINAL_ACCOUNTS = {
+    "guest": ("enigma1", "guest"),
+    "unit734": ("titanic", "unit734"),
+    "architect_node": ("chimera_rsa", "architect"),
+    "lpetrova": ("channel7G", "dr_lena_petrova"),
+    "athorne": ("AX4", "dr_aris_thorne"),
+    "master_student": ("egg_hunt", "masterschool"),
+    "gl1tch": ("cake?", "gl1tch"),
+}
+# Signs the session cookie that carries the granted levels. Every worker (and the
+# next restart) must use the same one, or terminal logins are forgotten
+SECRET_KEY = os.getenv("SECRET_KEY")
+terminal_fs_nodes = {}  # access level -> {node path: (body, etag, gzip body)}
+
+
+# Pre-serializes one node per file and directory visible at each access level
+def load_terminal_filesystem():
+    fs_path = os.path.join(APP_ROOT, TERMINAL_FILESYSTEM_FILE)
+    with open(fs_path, encoding="utf-8") as f:
+        levels = json.load(f)
+    base_files = levels.get(TERMINAL_BASE_ACCESS_LEVEL, {})
+    for access_level, level_files in levels.items():
+        visible_files = {**base_files, **level_files}
+        directories = {"": {"dirs": set(), "files": set()}}
+        nodes = {}
+        for file_path, content in visible_files.items():
+            nodes[file_path] = build_cached_json(
+                {"type": "file", "path": f"/{file_path}", "content": content}
+            )
+            parts = file_path.split("/")
+            for depth in range(len(parts) - 1):
+                parent = "/".join(parts[:depth])
+                directories.setdefault(parent, {"dirs": set(), "files": set()})
+                directories[parent]["dirs"].add(parts[depth])
+            parent = "/".join(parts[:-1])
+            directories.setdefault(parent, {"dirs": set(), "files": set()})
+            directories[parent]["files"].add(parts[-1])
+        for dir_path, entries in directories.items():
+            # A file shadows a directory of the same name, as in the terminal's lookups
+            nodes.setdefault(
+                dir_path,
+                build_cached_json(
+                    {
+                        "type": "directory",
+                        "path": f"/{dir_path}/" if dir_path else "/",
+                        "dirs": sorted(entries["dirs"]),
+                        "files": sorted(entries["files"]),
+                    }
+                ),
+            )
+        terminal_fs_nodes[access_level] = nodes
+    logging.info(
+        f"Loaded terminal filesystem: {len(levels)} access levels, {sum(len(n) for n in terminal_fs_nodes.values())} nodes."
+    )
 
 
-@app.route("/welcome-packet")
-def welcome_packet_route():
-    return render_template("Welcome Packet.html")
+# Access levels proven in this session; guest needs no login
+def get_terminal_access_levels():
+    return {TERMINAL_BASE_ACCESS_LEVEL, *session.get("terminal_levels", [])}
 
 
-@app.route("/simulation/invaders")
-def invaders_route():
-    return render_template("invaders.html")
+# Logs in to the terminal as a special account or a registered player and grants
+# the account's access level for the rest of the session
+@bp.route("/api/terminal/login", methods=["POST"])
+def terminal_login():
+    data = request.get_json(silent=True)
+    if not data or not data.get("username") or not data.get("password"):
+        return jsonify({"error": "Missing username or password"}), 400
+    username = data["username"].strip()
+    password = data["password"]
+    account = TERMINAL_ACCOUNTS.get(username.lower())
+    if account is not None:
+        account_password, access_level = account
+        if not hmac.compare_digest(password.encode(), account_password.encode()):
+            return jsonify({"error": "Invalid username or password"}), 401
+        result = {"username": username.lower(), "access_level": access_level}
+    else:
+        player = Player.query.filter_by(username=username).first()
+        if not player or not player.check_password(password):
+            logging.warning(f"Terminal login failed for username '{username}'.")
+            return jsonify({"error": "Invalid username or password"}), 401
+        access_level = player.terminal_access_level or "unit734"
+        result = {
+            "username": player.username,
+            "access_level": access_level,
+            "player_id": player.player_id,
+        }
+    session.permanent = True
+    session["terminal_levels"] = sorted(get_terminal_access_levels() | {access_level})
+    logging.info(f"Terminal login as '{result['username']}' ({access_level}).")
+    return jsonify(result), 200
+
+
+# Drops the access levels granted by terminal logins
+@bp.route("/api/terminal/logout", methods=["POST"])
+def terminal_logout():
+    session.pop("terminal_levels", None)
+    return jsonify({"message": "Logged out"}), 200
+
+
+# Returns one file or directory of the terminal filesystem as seen by an access
+# level held in this session: ?access_level=&path= (default level: guest)
+@bp.route("/api/terminal/fs", methods=["GET"])
+def get_terminal_fs_node():
+    access_level = request.args.get("access_level") or TERMINAL_BASE_ACCESS_LEVEL
+    # Levels without files of their own (e.g. registered_user) see the guest tree
+    nodes = terminal_fs_nodes.get(access_level)
+    if nodes is None:
+        nodes = terminal_fs_nodes[TERMINAL_BASE_ACCESS_LEVEL]
+    elif access_level not in get_terminal_access_levels():
+        return jsonify({"error": "Access denied"}), 403
+    node_path = request.args.get("path", "/").strip("/")
+    cached = nodes.get(node_path)
+    if cached is None:
+        return jsonify({"error": "File not found or access denied"}), 404
+    return cached_json_response(cached, private=True)
 
 
 # Creates a player with a username and default credentials for the main game
 
 
-@app.route("/players", methods=["POST"])
+@bp.route("/players", methods=["POST"])
 def create_player_simple():
     data = request.get_json()
     if not data or "username" not in data:
@@ -592,7 +1711,7 @@ def create_player_simple():
 
 
 # Registers a new player with username, email, and password for terminal access and statistics
-@app.route("/register", methods=["POST"])
+@bp.route("/register", methods=["POST"])
 def register_player():
     data = request.get_json()
     if not data or not all(k in data for k in ("username", "email", "password")):
@@ -645,7 +1764,7 @@ def register_player():
 
 
 # Authenticates a player using username and password for terminal login
-@app.route("/login", methods=["POST"])
+@bp.route("/login", methods=["POST"])
 def login_player():
     data = request.get_json()
     if not data or not data.get("username") or not data.get("password"):
@@ -675,12 +1794,7 @@ def login_player():
         return jsonify({"error": "Invalid username or password"}), 401
 
 
-@app.route("/statistics")
-def statistics_page():
-    return render_template("statistics.html")
-
-
-@app.route("/api/statistics/<string:username>", methods=["GET"])
+@bp.route("/api/statistics/<string:username>", methods=["GET"])
 def get_player_statistics(username):
     try:
         player = Player.query.filter_by(username=username).first()
@@ -751,7 +1865,7 @@ def get_player_statistics(username):
 
 
 # Endpoint to record a found password
-@app.route("/api/record_found_credential", methods=["POST"])
+@bp.route("/api/record_found_credential", methods=["POST"])
 def record_found_credential():
     data = request.get_json()
     if not data or "username" not in data or "found_account" not in data:
@@ -791,7 +1905,7 @@ def record_found_credential():
 
 
 # Retrieves player data by player ID
-@app.route("/players/<int:player_id>", methods=["GET"])
+@bp.route("/players/<int:player_id>", methods=["GET"])
 def get_player(player_id):
     try:
         player = db.session.get(Player, player_id)
@@ -816,7 +1930,7 @@ def get_player(player_id):
 
 
 # Retrieves player data by username
-@app.route("/player/username/<string:username>", methods=["GET"])
+@bp.route("/player/username/<string:username>", methods=["GET"])
 def get_player_by_username(username):
     try:
         if not username:
@@ -847,129 +1961,1570 @@ def get_player_by_username(username):
         )
 
 
-# Generates a new AI-generated puzzle for a given domain and difficulty
-@app.route("/generate_puzzle", methods=["POST"])
-def generate_puzzle():
-    if ai_client is None:
-        return jsonify({"error": "AI service is unavailable"}), 503
-
-    data = request.get_json()
-    player_id = data.get("player_id")
-    domain = data.get("domain")
-    difficulty = data.get("difficulty")
-    exclude_puzzle_id = data.get(
-        "exclude_puzzle_id"
-    )  # *** FIX: Get the ID to exclude ***
-
-    if not all([player_id, domain, difficulty]):
-        return jsonify({"error": "Missing player_id, domain, or difficulty"}), 400
+# --- LLM Rate Limiting ---
+# Every OpenAI call takes a slot from one shared limiter that bounds concurrency and
+# tokens per minute. Callers queue (boundedly) for a slot; when the queue is full or
+# the wait times out they get LLMOverloaded, which endpoints turn into 503 + Retry-After.
+class LLMOverloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"LLM capacity exhausted, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LLMLimiter:
+    def __init__(self, max_concurrency, tokens_per_minute, max_queue_depth, timeout):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue_depth = max_queue_depth
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0  # Set from upstream rate-limit headers
+        self.stats = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "upstream_rate_limited": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
 
-    if domain not in VALID_DOMAINS or difficulty not in VALID_DIFFICULTIES:
-        return jsonify({"error": "Invalid domain or difficulty"}), 400
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60,
+        )
+        self._refilled_at = now
 
-    # 1. Check for existing, unfinished puzzle (prioritize skipped, then attempted)
-    try:
-        query = (
-            PlayerProgress.query.join(Puzzle)
-            .filter(
-                PlayerProgress.player_id == player_id,
-                Puzzle.domain == domain,
-                Puzzle.difficulty == difficulty,
-                Puzzle.is_ai_generated == True,
-                PlayerProgress.status.in_(["skipped", "attempted"]),
-            )
-            .order_by(
-                PlayerProgress.status.desc()
-            )  # 'skipped' comes before 'attempted'
+    def _can_start(self, cost, now):
+        return (
+            self._active < self.max_concurrency
+            and self._tokens >= cost
+            and now >= self._paused_until
         )
 
-        # *** FIX: Exclude the specified puzzle ID from the search ***
-        if exclude_puzzle_id:
-            query = query.filter(Puzzle.puzzle_id != exclude_puzzle_id)
+    # Seconds until the token budget and any upstream pause would admit cost
+    def _delay(self, cost, now):
+        token_delay = (cost - self._tokens) * 60 / self.tokens_per_minute
+        return max(self._paused_until - now, token_delay, 0)
+
+    def _retry_after(self, cost, now):
+        return max(1, math.ceil(self._delay(cost, now)))
+
+    # Holds a slot for one call; set usage["tokens"] to the actual usage to correct the budget
+    @contextmanager
+    def slot(self, estimated_tokens, timeout=None):
+        cost = min(estimated_tokens, self.tokens_per_minute)
+        started = time.monotonic()
+        with self._cond:
+            self._refill(started)
+            if not self._can_start(cost, started):
+                if self._waiting >= self.max_queue_depth:
+                    self.stats["rejected_queue_full"] += 1
+                    raise LLMOverloaded(self._retry_after(cost, started))
+                self._waiting += 1
+                self.stats["max_queue_depth"] = max(
+                    self.stats["max_queue_depth"], self._waiting
+                )
+                deadline = started + min(self.timeout, timeout or self.timeout)
+                try:
+                    while True:
+                        now = time.monotonic()
+                        self._refill(now)
+                        if self._can_start(cost, now):
+                            break
+                        if now >= deadline:
+                            self.stats["rejected_timeout"] += 1
+                            raise LLMOverloaded(self._retry_after(cost, now))
+                        # Woken early when a slot is released
+                        delay = self._delay(cost, now) or deadline - now
+                        self._cond.wait(min(delay, deadline - now))
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self._tokens -= cost
+            waited = time.monotonic() - started
+            self.stats["admitted"] += 1
+            self.stats["total_wait_seconds"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+        usage = {"tokens": cost}
+        try:
+            yield usage
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._tokens -= usage["tokens"] - cost
+                self._cond.notify_all()
+
+    # Stops admitting calls until the upstream rate-limit window resets
+    def pause(self, seconds):
+        with self._cond:
+            self.stats["upstream_rate_limited"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # Lowers the local budget when the upstream reports fewer tokens left than we assumed
+    def sync_remaining_tokens(self, remaining_tokens):
+        with self._cond:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, remaining_tokens)
+
+    def snapshot(self):
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            admitted = self.stats["admitted"]
+            return {
+                "active": self._active,
+                "queue_depth": self._waiting,
+                "tokens_available": int(self._tokens),
+                "paused_for_seconds": round(max(0, self._paused_until - now), 3),
+                "avg_wait_seconds": (
+                    round(self.stats["total_wait_seconds"] / admitted, 4)
+                    if admitted
+                    else 0.0
+                ),
+                **self.stats,
+            }
 
-        existing_progress = query.first()
+
+llm_limiter = LLMLimiter(
+    LLM_MAX_CONCURRENCY,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_QUEUE_DEPTH,
+    LLM_QUEUE_TIMEOUT,
+)
+
+
+# --- LLM Circuit Breaker ---
+# Stops calling OpenAI after repeated failures or very slow calls, so requests fail
+# fast (and fall back to stored puzzles) instead of each one waiting out its retries.
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Circuit open, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, slow_call_seconds, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0, "failures": 0, "slow_calls": 0}
+
+    # Raises CircuitOpenError unless a call may go through now
+    def before_call(self):
+        with self._lock:
+            if self._state == "closed":
+                return
+            retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+            if self._state == "open" and retry_after <= 0:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(max(1, math.ceil(retry_after)))
+
+    def record_success(self, latency):
+        if latency > self.slow_call_seconds:
+            llm_logger.warning(
+                "Slow OpenAI call (%.1fs) counted as a failure.", latency
+            )
+            with self._lock:
+                self.stats["slow_calls"] += 1
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state != "closed":
+                llm_logger.info("OpenAI circuit closed after a successful probe.")
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.stats["opened"] += 1
+                    llm_logger.error(
+                        "OpenAI circuit opened after %s consecutive failures.",
+                        self._failures,
+                    )
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    # Hands back an unused half-open probe (e.g. the call never reached OpenAI)
+    def release_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._state == "open"
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                **self.stats,
+            }
+
+
+llm_breaker = CircuitBreaker(
+    BREAKER_FAILURE_THRESHOLD, BREAKER_SLOW_CALL_SECONDS, BREAKER_RESET_TIMEOUT
+)
+
+
+# Sleeps a jittered exponential backoff before a retry, never past the deadline
+def sleep_before_retry(attempt, deadline):
+    delay = random.uniform(0, RETRY_BACKOFF_BASE ** (attempt + 1))
+    time.sleep(max(0, min(delay, deadline - time.monotonic())))
+
+
+# --- LLM Usage Tracking ---
+# Token usage and latency per call type, e.g. ("puzzle", "Frontend/Easy")
+llm_usage_lock = threading.Lock()
+llm_usage_stats = {}
+
+
+# Adds one completion's token usage and latency to the per-type totals
+def record_llm_usage(kind, puzzle_type, completion, latency):
+    llm_logger.info(
+        "LLM %s %s: %.2fs, prompt %s (cached %s), completion %s tokens.",
+        kind,
+        puzzle_type,
+        latency,
+        completion["prompt_tokens"],
+        completion["cached_tokens"],
+        completion["completion_tokens"],
+    )
+    with llm_usage_lock:
+        totals = llm_usage_stats.setdefault(
+            (kind, puzzle_type),
+            {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "completion_tokens": 0,
+                "total_latency_seconds": 0.0,
+            },
+        )
+        totals["calls"] += 1
+        totals["total_latency_seconds"] += latency
+        for field in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+            totals[field] += completion[field] or 0
+    llm_calls.inc(kind, "ok")
+    llm_call_duration.observe(latency, kind, "ok")
+    llm_finish_reasons.inc(kind, str(completion["finish_reason"]))
+    for field in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+        if completion[field]:
+            llm_tokens.inc(kind, field[: -len("_tokens")], amount=completion[field])
+
+
+# Reports token usage, prompt-cache hit ratio and latency per call type
+@bp.route("/api/llm/usage", methods=["GET"])
+def get_llm_usage():
+    with llm_usage_lock:
+        usage = [
+            {
+                "kind": kind,
+                "puzzle_type": puzzle_type,
+                **totals,
+                "cached_prompt_ratio": (
+                    round(totals["cached_tokens"] / totals["prompt_tokens"], 4)
+                    if totals["prompt_tokens"]
+                    else 0.0
+                ),
+                "avg_latency_seconds": round(
+                    totals["total_latency_seconds"] / totals["calls"], 4
+                ),
+            }
+            for (kind, puzzle_type), totals in sorted(llm_usage_stats.items())
+        ]
+    return jsonify(usage), 200
+
+
+# Guards one provider call with the circuit breaker, the shared limiter and the
+# caller's deadline. The body gets {"timeout": seconds left} and must store the
+# provider's completion dict under "completion".
+@contextmanager
+def guarded_llm_call(kind, puzzle_type, estimated_tokens, deadline):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        record_llm_call(kind, "deadline")
+        raise TimeoutError("Deadline exceeded before the OpenAI call")
+    try:
+        llm_breaker.before_call()
+    except CircuitOpenError:
+        record_llm_call(kind, "circuit_open")
+        raise
+    try:
+        with llm_limiter.slot(estimated_tokens, timeout=remaining) as usage:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                record_llm_call(kind, "deadline")
+                raise TimeoutError("Deadline exceeded while queued for an OpenAI call")
+            call = {"timeout": remaining, "completion": None}
+            started = time.monotonic()
+            try:
+                yield call
+            except puzzle_providers.ProviderRateLimited as e:
+                # Backpressure, not an outage: pause admissions but don't trip the breaker
+                llm_logger.warning(
+                    "OpenAI rate limit hit; pausing LLM calls for %ss.", e.retry_after
+                )
+                record_llm_call(kind, "rate_limited", started)
+                llm_limiter.pause(e.retry_after)
+                llm_breaker.release_probe()
+                raise
+            except Exception as e:
+                record_llm_call(
+                    kind, "timeout" if isinstance(e, TimeoutError) else "error", started
+                )
+                llm_breaker.record_failure()
+                raise
+            except BaseException:
+                # Abandoned mid-call, e.g. a streaming client disconnected
+                record_llm_call(kind, "abandoned", started)
+                llm_breaker.release_probe()
+                raise
+            completion = call["completion"]
+            latency = time.monotonic() - started
+            llm_breaker.record_success(latency)
+            record_llm_usage(kind, puzzle_type, completion, latency)
+            if completion["remaining_tokens"] is not None:
+                llm_limiter.sync_remaining_tokens(completion["remaining_tokens"])
+            if completion["total_tokens"]:
+                usage["tokens"] = completion["total_tokens"]
+    except (LLMOverloaded, TimeoutError) as e:
+        if isinstance(e, LLMOverloaded):
+            record_llm_call(kind, "overloaded")
+        llm_breaker.release_probe()
+        raise
+
+
+# Makes one JSON-mode chat completion call; the call's timeout is whatever remains
+# of the caller's deadline
+def create_chat_completion(
+    kind, puzzle_type, messages, temperature, estimated_tokens, deadline
+):
+    with guarded_llm_call(kind, puzzle_type, estimated_tokens, deadline) as call:
+        call["completion"] = get_puzzle_provider().complete(
+            kind, messages, temperature, call["timeout"]
+        )
+    return call["completion"]
+
+
+# Streaming variant of create_chat_completion: yields content deltas and returns
+# the completion dict once the stream ends
+def stream_chat_completion(
+    kind, puzzle_type, messages, temperature, estimated_tokens, deadline
+):
+    with guarded_llm_call(kind, puzzle_type, estimated_tokens, deadline) as call:
+        call["completion"] = yield from get_puzzle_provider().stream(
+            kind, messages, temperature, call["timeout"]
+        )
+    return call["completion"]
+
+
+# Lets the provider open its connections before the first puzzle is requested
+def warm_up_puzzle_provider():
+    provider = get_puzzle_provider()
+    if provider is None:
+        return
+    started = time.monotonic()
+    try:
+        provider.warm_up()
+        llm_logger.info(
+            "Puzzle provider warmed up in %.2fs.", time.monotonic() - started
+        )
+    except Exception as e:
+        llm_logger.warning(
+            "Puzzle provider warm-up failed (will connect lazily): %s", e
+        )
+
+
+# Reports limiter queue depth, wait times and rejections, plus the circuit breaker state
+@bp.route("/api/llm/limiter", methods=["GET"])
+def get_llm_limiter_stats():
+    return (
+        jsonify({**llm_limiter.snapshot(), "circuit_breaker": llm_breaker.snapshot()}),
+        200,
+    )
+
+
+# --- Request Coalescing ---
+# Concurrent identical requests (double clicks, several tabs) share one in-flight
+# call: the first caller runs it, the others wait for and reuse its result.
+# Followers give up after FLIGHT_WAIT_TIMEOUT, so a leader that never finishes
+# can't hold their threads forever.
+FLIGHT_WAIT_TIMEOUT = PUZZLE_REQUEST_DEADLINE + 15  # The leader's LLM time + saving
+
+
+class FlightTimeout(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self, timeout=FLIGHT_WAIT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> in-flight call state
+
+    # Returns (call, True) for the first caller of a key, (call, False) for the rest
+    def join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                puzzle_logger.debug("Joining in-flight call for %s.", key)
+                return call, False
+            call = {"done": threading.Event(), "result": None, "error": None}
+            self._calls[key] = call
+            return call, True
+
+    # Called by the leader with the result or the error to share; calls after the
+    # first are ignored, so cleanup paths can call it unconditionally
+    def finish(self, key, call, result=None, error=None):
+        with self._lock:
+            if call["done"].is_set():
+                return
+            call["result"], call["error"] = result, error
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            call["done"].set()
+
+    def wait(self, call, timeout=None):
+        if not call["done"].wait(self.timeout if timeout is None else timeout):
+            raise FlightTimeout("Timed out waiting for an identical in-flight request")
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    def do(self, key, fn):
+        call, is_leader = self.join(key)
+        if not is_leader:
+            return self.wait(call)
+        result, error = None, None
+        try:
+            result = fn()
+            return result
+        except BaseException as e:
+            # Followers get an ordinary error, not the leader's SystemExit and the like
+            error = (
+                e
+                if isinstance(e, Exception)
+                else RuntimeError("The in-flight request was interrupted")
+            )
+            raise
+        finally:
+            self.finish(key, call, result=result, error=error)
+
+
+puzzle_generation_flight = SingleFlight()
+
+# SingleFlight only covers one process. Across gunicorn workers the leader is the
+# worker that inserts the PuzzleGenerationClaims row for the player, domain and
+# difficulty; the others poll until the puzzle it saves shows up as the player's
+# unfinished one. A claim older than FLIGHT_WAIT_TIMEOUT was left by a worker that
+# died and is replaced.
+GENERATION_CLAIM_POLL_INTERVAL = 0.25
+
+
+# Inserts the claim; returns its ID, or None if another worker holds it
+def claim_puzzle_generation(player_id, domain, difficulty):
+    key = {"player_id": player_id, "domain": domain, "difficulty": difficulty}
+    stale_before = datetime.utcnow() - timedelta(seconds=FLIGHT_WAIT_TIMEOUT)
+    try:
+        PuzzleGenerationClaim.query.filter_by(**key).filter(
+            PuzzleGenerationClaim.claimed_at < stale_before
+        ).delete(synchronize_session=False)
+        claim = PuzzleGenerationClaim(**key, claimed_at=datetime.utcnow())
+        db.session.add(claim)
+        db.session.commit()
+        return claim.id
+    except IntegrityError:
+        db.session.rollback()
+        return None
+
+
+def release_puzzle_generation(claim_id):
+    if claim_id is None:
+        return
+    try:
+        PuzzleGenerationClaim.query.filter_by(id=claim_id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        puzzle_logger.exception(
+            "Could not release puzzle generation claim %s.", claim_id
+        )
+
+
+# Returns (claim ID, None) once this worker may generate the puzzle, or (None,
+# result) with the one another worker saved meanwhile. Raises FlightTimeout when
+# that worker takes longer than FLIGHT_WAIT_TIMEOUT.
+def acquire_puzzle_generation(player_id, domain, difficulty, exclude_puzzle_id):
+    wait_until = time.monotonic() + FLIGHT_WAIT_TIMEOUT
+    while True:
+        claim_id = claim_puzzle_generation(player_id, domain, difficulty)
+        # Checked after claiming too: the previous holder may have just saved one
+        existing = find_unfinished_puzzle(
+            player_id, domain, difficulty, exclude_puzzle_id
+        )
+        if existing:
+            release_puzzle_generation(claim_id)
+            return None, existing
+        if claim_id is not None:
+            return claim_id, None
+        if time.monotonic() >= wait_until:
+            raise FlightTimeout("Timed out waiting for another worker's puzzle")
+        time.sleep(GENERATION_CLAIM_POLL_INTERVAL)
+
+
+# Reads a puzzle request body; returns (fields, None) or (None, error response)
+def read_puzzle_request():
+    if get_puzzle_provider() is None:
+        return None, (jsonify({"error": "AI service is unavailable"}), 503)
+
+    data = request.get_json()
+    player_id = data.get("player_id")
+    domain = data.get("domain")
+    difficulty = data.get("difficulty")
+    exclude_puzzle_id = data.get(
+        "exclude_puzzle_id"
+    )  # *** FIX: Get the ID to exclude ***
+
+    if not all([player_id, domain, difficulty]):
+        return None, (
+            jsonify({"error": "Missing player_id, domain, or difficulty"}),
+            400,
+        )
+
+    if domain not in VALID_DOMAINS or difficulty not in VALID_DIFFICULTIES:
+        return None, (jsonify({"error": "Invalid domain or difficulty"}), 400)
+
+    return (player_id, domain, difficulty, exclude_puzzle_id), None
+
+
+# Callers racing on the same player/domain/difficulty all receive the same puzzle
+def get_puzzle_flight_key(player_id, domain, difficulty, exclude_puzzle_id):
+    return (str(player_id), domain, difficulty, exclude_puzzle_id)
+
+
+# Generates a new AI-generated puzzle for a given domain and difficulty
+@bp.route("/generate_puzzle", methods=["POST"])
+def generate_puzzle():
+    fields, error_response = read_puzzle_request()
+    if error_response:
+        return error_response
+    player_id, domain, difficulty, exclude_puzzle_id = fields
+
+    flight_key = get_puzzle_flight_key(*fields)
+    try:
+        body, status_code = puzzle_generation_flight.do(
+            flight_key,
+            lambda: find_or_generate_puzzle(
+                player_id, domain, difficulty, exclude_puzzle_id
+            ),
+        )
+    except LLMOverloaded as e:
+        puzzle_logger.warning(
+            "Puzzle generation rejected for Player %s: %s", player_id, e
+        )
+        return (
+            jsonify({"error": "AI service is busy. Please try again shortly."}),
+            503,
+            {"Retry-After": str(e.retry_after)},
+        )
+    except FlightTimeout as e:
+        puzzle_logger.warning("Puzzle request for Player %s: %s", player_id, e)
+        return (
+            jsonify({"error": "AI service is busy. Please try again shortly."}),
+            503,
+            {"Retry-After": "5"},
+        )
+    if status_code < 400:
+        puzzle_prefetcher.schedule(player_id, domain, difficulty)
+    return jsonify(body), status_code
+
+
+# Returns (response body, status code) with the player's unfinished puzzle or a newly generated one
+def find_or_generate_puzzle(player_id, domain, difficulty, exclude_puzzle_id=None):
+    # 1. Check for existing, unfinished puzzle (prioritize skipped, then attempted)
+    existing = find_unfinished_puzzle(player_id, domain, difficulty, exclude_puzzle_id)
+    if existing:
+        return existing
+
+    # 2. Hand out the puzzle prefetched for this player, if there is one
+    deadline = time.monotonic() + PUZZLE_REQUEST_DEADLINE
+    reserved = puzzle_prefetcher.claim(
+        player_id, domain, difficulty, exclude_puzzle_id, deadline
+    )
+    if reserved:
+        return reserved
+
+    # 3. Otherwise generate a new one, unless another worker already is
+    claim_id, existing = acquire_puzzle_generation(
+        player_id, domain, difficulty, exclude_puzzle_id
+    )
+    if existing:
+        return existing
+    try:
+        puzzle_logger.info(
+            "No existing puzzle found for Player %s. Generating a new one for %s/%s.",
+            player_id,
+            domain,
+            difficulty,
+        )
+
+        for attempt in range(MAX_RETRIES):
+            if time.monotonic() >= deadline:
+                puzzle_logger.warning(
+                    "Puzzle generation deadline reached for Player %s.", player_id
+                )
+                break
+            if attempt:
+                llm_retries.inc("puzzle")
+            try:
+                completion = create_chat_completion(
+                    "puzzle",
+                    f"{domain}/{difficulty}",
+                    get_puzzle_generation_messages(domain, difficulty),
+                    GENERATION_TEMPERATURE,
+                    PUZZLE_TOKEN_ESTIMATE,
+                    deadline,
+                )
+                puzzle_data = parse_openai_response_content(completion["content"])
+
+                if is_complete_puzzle(puzzle_data):
+                    # 4. Save the new puzzle and progress (None: a repeat, so regenerate)
+                    result = save_generated_puzzle(
+                        player_id, domain, difficulty, puzzle_data
+                    )
+                    if result:
+                        return result
+
+            except LLMOverloaded:
+                raise
+            except CircuitOpenError as e:
+                puzzle_logger.warning(
+                    "Skipping puzzle generation for Player %s: %s", player_id, e
+                )
+                break
+            except Exception as e:
+                puzzle_logger.exception("Error on OpenAI call, attempt %s", attempt + 1)
+                # After a 429 the limiter holds the next attempt until the upstream reset
+                if not isinstance(e, puzzle_providers.ProviderRateLimited):
+                    sleep_before_retry(attempt, deadline)
+
+        # 5. OpenAI is failing: hand out a stored puzzle this player hasn't seen yet
+        return handle_puzzle_generation_failure(player_id, domain, difficulty)
+    finally:
+        release_puzzle_generation(claim_id)
+
+
+# Returns (body, 200) with the player's skipped or attempted puzzle, (error, 500), or None
+def find_unfinished_puzzle(player_id, domain, difficulty, exclude_puzzle_id=None):
+    try:
+        query = (
+            PlayerProgress.query.join(Puzzle)
+            .filter(
+                PlayerProgress.player_id == player_id,
+                Puzzle.domain == domain,
+                Puzzle.difficulty == difficulty,
+                Puzzle.is_ai_generated == True,
+                PlayerProgress.status.in_(["skipped", "attempted"]),
+            )
+            .order_by(
+                PlayerProgress.status.desc()
+            )  # 'skipped' comes before 'attempted'
+        )
+
+        # *** FIX: Exclude the specified puzzle ID from the search ***
+        if exclude_puzzle_id:
+            query = query.filter(Puzzle.puzzle_id != exclude_puzzle_id)
+
+        existing_progress = query.first()
 
         if existing_progress and existing_progress.puzzle:
-            logging.info(
-                f"Returning existing puzzle (ID: {existing_progress.puzzle_id}, Status: {existing_progress.status}) for Player {player_id}."
+            puzzle_logger.info(
+                "Returning existing puzzle (ID: %s, Status: %s) for Player %s.",
+                existing_progress.puzzle_id,
+                existing_progress.status,
+                player_id,
             )
             # IMPORTANT: Change status from 'skipped' back to 'attempted' so it's not permanently stuck
             if existing_progress.status == "skipped":
                 existing_progress.status = "attempted"
                 db.session.commit()
-            return jsonify(existing_progress.puzzle.to_dict()), 200
+            return existing_progress.puzzle.to_dict(), 200
 
     except Exception as e:
-        logging.exception("DB error checking for existing puzzle.")
-        return jsonify({"error": "Database error while checking for puzzles."}), 500
+        puzzle_logger.exception("DB error checking for existing puzzle.")
+        return {"error": "Database error while checking for puzzles."}, 500
+    return None
+
+
+def get_puzzle_generation_messages(domain, difficulty):
+    return [
+        {
+            "role": "system",
+            "content": "You are an expert puzzle creator. Generate puzzles in valid JSON as specified.",
+        },
+        {"role": "user", "content": get_puzzle_generation_prompt(domain, difficulty)},
+    ]
 
-    # 2. If no existing puzzle, generate a new one
-    logging.info(
-        f"No existing puzzle found for Player {player_id}. Generating a new one for {domain}/{difficulty}."
+
+def is_complete_puzzle(puzzle_data):
+    return bool(
+        puzzle_data
+        and "puzzle_description" in puzzle_data
+        and "validation_criteria" in puzzle_data
     )
-    prompt_content = get_puzzle_generation_prompt(domain, difficulty)
 
-    for attempt in range(MAX_RETRIES):
+
+# Stores a generated puzzle with a progress entry ('attempted', or 'reserved' when
+# prefetched); returns (body, 201). A near-duplicate of a stored puzzle is not stored:
+# the stored one is handed out instead (body, 200), or None is returned if the player
+# already has it, so the caller regenerates.
+def save_generated_puzzle(
+    player_id, domain, difficulty, puzzle_data, status="attempted"
+):
+    signature = puzzle_similarity.signature(puzzle_data["puzzle_description"])
+    duplicate_id = find_duplicate_puzzle(domain, difficulty, signature)
+    if duplicate_id is not None:
+        duplicate = db.session.get(Puzzle, duplicate_id)
+        if duplicate is not None:
+            return assign_duplicate_puzzle(player_id, duplicate, status)
+        puzzle_similarity_index.remove(duplicate_id)  # Deleted since it was indexed
+
+    new_puzzle = Puzzle(
+        domain=domain,
+        difficulty=difficulty,
+        puzzle_description=puzzle_data["puzzle_description"],
+        validation_criteria=puzzle_data["validation_criteria"],
+        is_ai_generated=True,
+    )
+    db.session.add(new_puzzle)
+    db.session.flush()
+
+    new_progress = PlayerProgress(
+        player_id=player_id,
+        puzzle_id=new_puzzle.puzzle_id,
+        status=status,
+    )
+    db.session.add(new_progress)
+    db.session.commit()
+
+    puzzle_similarity_index.add(new_puzzle.puzzle_id, domain, difficulty, signature)
+
+    puzzle_logger.info(
+        "Saved new puzzle (ID: %s) and %s progress for Player %s.",
+        new_puzzle.puzzle_id,
+        status,
+        player_id,
+    )
+    return new_puzzle.to_dict(), 201
+
+
+# --- Puzzle Similarity ---
+# Generated puzzles are checked against the stored bank for their domain/difficulty
+# with a MinHash/LSH index (see puzzle_similarity.py), built from the database on
+# first use and kept up to date as puzzles are saved.
+puzzle_similarity_index = puzzle_similarity.PuzzleSimilarityIndex()
+puzzle_similarity_lock = threading.Lock()
+puzzle_similarity_stats = {
+    "checks": 0,
+    "duplicates": 0,
+    "folded": 0,
+    "rejected": 0,
+    "total_check_seconds": 0.0,
+}
+
+
+# Indexes every stored puzzle once; later puzzles are added as they are saved
+def ensure_puzzle_similarity_index():
+    if puzzle_similarity_index.loaded:
+        return
+    with puzzle_similarity_lock:
+        if puzzle_similarity_index.loaded:
+            return
+        started = time.monotonic()
+        rows = db.session.query(
+            Puzzle.puzzle_id,
+            Puzzle.domain,
+            Puzzle.difficulty,
+            Puzzle.puzzle_description,
+        ).all()
+        for puzzle_id, domain, difficulty, description in rows:
+            puzzle_similarity_index.add(
+                puzzle_id,
+                domain,
+                difficulty,
+                puzzle_similarity.signature(description),
+            )
+        puzzle_similarity_index.loaded = True
+    puzzle_logger.info(
+        "Indexed %s stored puzzles for duplicate detection in %.2fs.",
+        len(rows),
+        time.monotonic() - started,
+    )
+
+
+# Returns the id of a stored near-duplicate of the signature's puzzle, or None
+def find_duplicate_puzzle(domain, difficulty, signature):
+    ensure_puzzle_similarity_index()
+    started = time.perf_counter()
+    duplicate = puzzle_similarity_index.find_duplicate(domain, difficulty, signature)
+    elapsed = time.perf_counter() - started
+    with puzzle_similarity_lock:
+        puzzle_similarity_stats["checks"] += 1
+        puzzle_similarity_stats["total_check_seconds"] += elapsed
+        if duplicate:
+            puzzle_similarity_stats["duplicates"] += 1
+    if duplicate is None:
+        return None
+    duplicate_id, score = duplicate
+    puzzle_logger.info(
+        "Generated %s/%s puzzle is a near-duplicate of Puzzle %s (similarity %.2f).",
+        domain,
+        difficulty,
+        duplicate_id,
+        score,
+    )
+    return duplicate_id
+
+
+# Hands the stored duplicate to the player instead of a new row; returns (body, 200),
+# or None when the player has already been given it
+def assign_duplicate_puzzle(player_id, duplicate, status):
+    seen = PlayerProgress.query.filter_by(
+        player_id=player_id, puzzle_id=duplicate.puzzle_id
+    ).first()
+    if seen:
+        with puzzle_similarity_lock:
+            puzzle_similarity_stats["rejected"] += 1
+        puzzle_logger.warning(
+            "Rejected a repeat of Puzzle %s for Player %s; regenerating.",
+            duplicate.puzzle_id,
+            player_id,
+        )
+        return None
+    db.session.add(
+        PlayerProgress(
+            player_id=player_id, puzzle_id=duplicate.puzzle_id, status=status
+        )
+    )
+    db.session.commit()
+    with puzzle_similarity_lock:
+        puzzle_similarity_stats["folded"] += 1
+    return duplicate.to_dict(), 200
+
+
+# Builds the index at startup so the first generated puzzle doesn't wait for it
+def preload_puzzle_similarity_index(app):
+    with app.app_context():
         try:
-            response = ai_client.chat.completions.create(
-                model=OPENAI_MODEL_NAME,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert puzzle creator. Generate puzzles in valid JSON as specified.",
-                    },
-                    {"role": "user", "content": prompt_content},
-                ],
-                temperature=GENERATION_TEMPERATURE,
-                response_format={"type": "json_object"},
+            ensure_puzzle_similarity_index()
+        except SQLAlchemyError as e:
+            puzzle_logger.warning(
+                "Could not preload the puzzle similarity index: %s", e
             )
-            raw_response = response.choices[0].message.content
-            puzzle_data = parse_openai_response_content(raw_response)
 
-            if (
-                puzzle_data
-                and "puzzle_description" in puzzle_data
-                and "validation_criteria" in puzzle_data
-            ):
-                # 3. Save the new puzzle and progress
-                new_puzzle = Puzzle(
-                    domain=domain,
-                    difficulty=difficulty,
-                    puzzle_description=puzzle_data["puzzle_description"],
-                    validation_criteria=puzzle_data["validation_criteria"],
-                    is_ai_generated=True,
-                )
-                db.session.add(new_puzzle)
-                db.session.flush()
 
-                new_progress = PlayerProgress(
-                    player_id=player_id,
-                    puzzle_id=new_puzzle.puzzle_id,
-                    status="attempted",
-                )
-                db.session.add(new_progress)
-                db.session.commit()
+# Reports how many generated puzzles were near-duplicates and how long checks take
+@bp.route("/api/puzzles/similarity", methods=["GET"])
+def get_puzzle_similarity_stats():
+    with puzzle_similarity_lock:
+        stats = dict(puzzle_similarity_stats)
+    checks = stats["checks"]
+    return (
+        jsonify(
+            {
+                "indexed": len(puzzle_similarity_index),
+                "avg_check_ms": (
+                    round(stats["total_check_seconds"] * 1000 / checks, 4)
+                    if checks
+                    else 0.0
+                ),
+                **stats,
+            }
+        ),
+        200,
+    )
 
-                logging.info(
-                    f"Saved new puzzle (ID: {new_puzzle.puzzle_id}) and progress for Player {player_id}."
-                )
-                return jsonify(new_puzzle.to_dict()), 201
 
-        except Exception as e:
-            logging.exception(f"Error on OpenAI call, attempt {attempt + 1}")
-            time.sleep(1.5**attempt)
+# --- Puzzle Search ---
+# SQLite FTS5 index over Puzzles.puzzle_description. It is an external-content table
+# (the text is stored only once, in Puzzles) kept in sync by triggers, so every
+# insert, update or delete through any code path is reflected immediately.
+PUZZLE_SEARCH_TABLE = "PuzzlesSearch"
+PUZZLE_SEARCH_MAX_PER_PAGE = 100
+PUZZLE_SEARCH_TERM_PATTERN = re.compile(r"\w+\*?")
+PUZZLE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {PUZZLE_SEARCH_TABLE} USING fts5(
+        puzzle_description, content='Puzzles', content_rowid='puzzle_id',
+        tokenize='porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PUZZLE_SEARCH_TABLE}_ai AFTER INSERT ON Puzzles BEGIN
+        INSERT INTO {PUZZLE_SEARCH_TABLE}(rowid, puzzle_description)
+        VALUES (new.puzzle_id, new.puzzle_description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PUZZLE_SEARCH_TABLE}_ad AFTER DELETE ON Puzzles BEGIN
+        INSERT INTO {PUZZLE_SEARCH_TABLE}({PUZZLE_SEARCH_TABLE}, rowid, puzzle_description)
+        VALUES ('delete', old.puzzle_id, old.puzzle_description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PUZZLE_SEARCH_TABLE}_au
+    AFTER UPDATE OF puzzle_description ON Puzzles BEGIN
+        INSERT INTO {PUZZLE_SEARCH_TABLE}({PUZZLE_SEARCH_TABLE}, rowid, puzzle_description)
+        VALUES ('delete', old.puzzle_id, old.puzzle_description);
+        INSERT INTO {PUZZLE_SEARCH_TABLE}(rowid, puzzle_description)
+        VALUES (new.puzzle_id, new.puzzle_description);
+    END""",
+]
+puzzle_search_ready = False
+
 
+# Creates the search table and triggers; a new index is filled from the existing rows
+def create_puzzle_search_index(connection):
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": PUZZLE_SEARCH_TABLE},
+    ).first()
+    for statement in PUZZLE_SEARCH_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(
+            text(
+                f"INSERT INTO {PUZZLE_SEARCH_TABLE}({PUZZLE_SEARCH_TABLE}) VALUES ('rebuild')"
+            )
+        )
+        puzzle_logger.info("Built the puzzle full-text search index.")
+    return True
+
+
+# db.create_all() (init_database.py) creates the index along with the Puzzles table
+event.listen(
+    Puzzle.__table__,
+    "after_create",
+    lambda target, connection, **kw: create_puzzle_search_index(connection),
+)
+
+
+# Adds the index to databases created before it existed; False where FTS5 isn't available
+def ensure_puzzle_search_index():
+    global puzzle_search_ready
+    if not puzzle_search_ready:
+        try:
+            with db.engine.begin() as connection:
+                puzzle_search_ready = create_puzzle_search_index(connection)
+        except SQLAlchemyError as e:
+            puzzle_logger.warning("Puzzle full-text search is unavailable: %s", e)
+    return puzzle_search_ready
+
+
+# Inserts many puzzles (dicts of column values) in one transaction. On SQLite the
+# per-row search trigger is dropped inside that transaction and the new rows are
+# indexed by a single statement, which is several times faster; BEGIN IMMEDIATE
+# keeps other writers out until the trigger is back.
+def bulk_insert_puzzles(rows):
+    if not rows:
+        return
+    if not ensure_puzzle_search_index():
+        db.session.execute(insert(Puzzle), rows)
+        db.session.commit()
+        return
+    with db.engine.connect() as connection:
+        sqlite_connection = connection.connection.driver_connection
+        isolation_level = sqlite_connection.isolation_level
+        sqlite_connection.isolation_level = None  # So BEGIN also covers the DDL
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            last_id = connection.execute(
+                text("SELECT coalesce(max(puzzle_id), 0) FROM Puzzles")
+            ).scalar()
+            connection.execute(text(f"DROP TRIGGER {PUZZLE_SEARCH_TABLE}_ai"))
+            connection.execute(insert(Puzzle.__table__), rows)
+            connection.execute(
+                text(f"""INSERT INTO {PUZZLE_SEARCH_TABLE}(rowid, puzzle_description)
+                    SELECT puzzle_id, puzzle_description FROM Puzzles
+                    WHERE puzzle_id > :last_id"""),
+                {"last_id": last_id},
+            )
+            connection.execute(text(PUZZLE_SEARCH_DDL[1]))
+            connection.commit()
+        finally:
+            sqlite_connection.isolation_level = isolation_level
+
+
+# Turns free text into an FTS5 query: every word must match, "word*" matches a prefix
+def build_puzzle_search_query(raw_query):
+    terms = PUZZLE_SEARCH_TERM_PATTERN.findall(raw_query or "")
+    return " ".join(
+        f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"' for term in terms
+    )
+
+
+# Searches the puzzle bank by topic, best matches (BM25) first
+@bp.route("/api/puzzles/search", methods=["GET"])
+def search_puzzles():
+    match_query = build_puzzle_search_query(request.args.get("q"))
+    domain = request.args.get("domain")
+    difficulty = request.args.get("difficulty")
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = min(
+            max(int(request.args.get("per_page", 20)), 1), PUZZLE_SEARCH_MAX_PER_PAGE
+        )
+    except ValueError:
+        return jsonify({"error": "page and per_page must be integers"}), 400
+    if not match_query:
+        return jsonify({"error": "Missing search query 'q'"}), 400
+    if (domain and domain not in VALID_DOMAINS) or (
+        difficulty and difficulty not in VALID_DIFFICULTIES
+    ):
+        return jsonify({"error": "Invalid domain or difficulty"}), 400
+    if not ensure_puzzle_search_index():
+        return jsonify({"error": "Puzzle search is unavailable"}), 503
+
+    filters = "".join(
+        f" AND p.{column} = :{column}"
+        for column, value in (("domain", domain), ("difficulty", difficulty))
+        if value
+    )
+    # One extra row tells whether there is a next page without counting every match
+    statement = text(f"""SELECT p.puzzle_id,
+               snippet({PUZZLE_SEARCH_TABLE}, 0, '**', '**', '...', 16) AS snippet,
+               bm25({PUZZLE_SEARCH_TABLE}) AS score
+        FROM {PUZZLE_SEARCH_TABLE} JOIN Puzzles AS p ON p.puzzle_id = {PUZZLE_SEARCH_TABLE}.rowid
+        WHERE {PUZZLE_SEARCH_TABLE} MATCH :query{filters}
+        ORDER BY score LIMIT :limit OFFSET :offset""")
+    try:
+        rows = (
+            db.session.execute(
+                statement,
+                {
+                    "query": match_query,
+                    "domain": domain,
+                    "difficulty": difficulty,
+                    "limit": per_page + 1,
+                    "offset": (page - 1) * per_page,
+                },
+            )
+            .mappings()
+            .all()
+        )
+        has_more, rows = len(rows) > per_page, rows[:per_page]
+        puzzles = {
+            puzzle.puzzle_id: puzzle
+            for puzzle in Puzzle.query.filter(
+                Puzzle.puzzle_id.in_([row["puzzle_id"] for row in rows])
+            )
+        }
+    except SQLAlchemyError:
+        puzzle_logger.exception("Puzzle search failed for query %r.", match_query)
+        return jsonify({"error": "Database error while searching puzzles."}), 500
+
+    results = [
+        {
+            **puzzles[row["puzzle_id"]].to_dict(),
+            "snippet": row["snippet"],
+            "score": round(-row["score"], 4),  # bm25() is lower-is-better
+        }
+        for row in rows
+    ]
     return (
         jsonify(
             {
-                "error": "AI service failed to generate a valid puzzle after multiple attempts."
+                "query": match_query,
+                "page": page,
+                "per_page": per_page,
+                "has_more": has_more,
+                "results": results,
             }
         ),
-        500,
+        200,
+    )
+
+
+# Returns a stored fallback puzzle, or the error to report when there is none
+def handle_puzzle_generation_failure(player_id, domain, difficulty):
+    fallback = serve_stored_puzzle(player_id, domain, difficulty)
+    if fallback:
+        return fallback
+    if llm_breaker.is_open:
+        return {"error": "AI service is temporarily unavailable."}, 503
+    return {
+        "error": "AI service failed to generate a valid puzzle after multiple attempts."
+    }, 500
+
+
+# Assigns a random stored puzzle the player has never been given, or returns None
+def serve_stored_puzzle(player_id, domain, difficulty):
+    try:
+        seen_puzzle_ids = db.session.query(PlayerProgress.puzzle_id).filter(
+            PlayerProgress.player_id == player_id
+        )
+        archived_puzzle_ids = db.session.query(ArchivedProgress.puzzle_id).filter(
+            ArchivedProgress.player_id == player_id
+        )
+        reserved_puzzle_ids = db.session.query(PlayerProgress.puzzle_id).filter(
+            PlayerProgress.status == "reserved"
+        )
+        puzzle = (
+            Puzzle.query.filter(
+                Puzzle.domain == domain,
+                Puzzle.difficulty == difficulty,
+                Puzzle.is_ai_generated == True,
+                ~Puzzle.puzzle_id.in_(seen_puzzle_ids),
+                ~Puzzle.puzzle_id.in_(archived_puzzle_ids),
+                ~Puzzle.puzzle_id.in_(reserved_puzzle_ids),
+            )
+            .order_by(func.random())
+            .first()
+        )
+        if puzzle is None:
+            puzzle_logger.warning(
+                "No unseen stored %s/%s puzzle for Player %s.",
+                domain,
+                difficulty,
+                player_id,
+            )
+            return None
+        db.session.add(
+            PlayerProgress(
+                player_id=player_id, puzzle_id=puzzle.puzzle_id, status="attempted"
+            )
+        )
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        puzzle_logger.exception("DB error serving a stored fallback puzzle.")
+        return None
+    puzzle_logger.info(
+        "Served stored puzzle (ID: %s) to Player %s as a fallback.",
+        puzzle.puzzle_id,
+        player_id,
     )
+    return {**puzzle.to_dict(), "fallback": True}, 200
+
+
+# --- Puzzle Prefetch ---
+# Once a puzzle is served, the player's next one for the same domain/difficulty is
+# generated in the background and parked as a 'reserved' progress entry (reserved at
+# last_attempted_at). The next request claims it instead of waiting on OpenAI, or
+# waits for a prefetch still in flight; reservations unclaimed after the TTL expire
+# and their puzzles go back to the stored-puzzle pool.
+class PuzzlePrefetcher:
+    def __init__(self, enabled, reservation_ttl):
+        self.enabled = enabled
+        self.reservation_ttl = reservation_ttl
+        self._lock = threading.Lock()
+        self._pending = {}  # (player, domain, difficulty) -> Event set when done
+        self.stats = {
+            "scheduled": 0,
+            "reserved": 0,
+            "skipped_busy": 0,
+            "failed": 0,
+            "hits": 0,
+            "waited_hits": 0,
+            "misses": 0,
+            "expired": 0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    # Starts preparing the player's next puzzle unless a prefetch is already running.
+    # Speculative work never queues behind real requests for an LLM slot.
+    def schedule(self, player_id, domain, difficulty):
+        if not self.enabled or get_puzzle_provider() is None or llm_breaker.is_open:
+            return
+        limiter = llm_limiter.snapshot()
+        if limiter["queue_depth"] or limiter["active"] >= llm_limiter.max_concurrency:
+            self._count("skipped_busy")
+            return
+        key = (str(player_id), domain, difficulty)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = threading.Event()
+            self.stats["scheduled"] += 1
+        # In a copy of the caller's context, so its logs carry the request ID
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(
+                self._run,
+                current_app._get_current_object(),
+                key,
+                player_id,
+                domain,
+                difficulty,
+            ),
+            name="puzzle-prefetch",
+            daemon=True,
+        ).start()
+
+    def _run(self, app, key, player_id, domain, difficulty):
+        try:
+            with app.app_context():
+                self.expire_reservations()
+                self._prepare(player_id, domain, difficulty)
+        except Exception:
+            db.session.rollback()
+            self._count("failed")
+            puzzle_logger.exception("Puzzle prefetch failed for Player %s.", player_id)
+        finally:
+            with self._lock:
+                done = self._pending.pop(key)
+            done.set()
+
+    def _prepare(self, player_id, domain, difficulty):
+        reserved = (
+            PlayerProgress.query.join(Puzzle)
+            .filter(
+                PlayerProgress.player_id == player_id,
+                PlayerProgress.status == "reserved",
+                Puzzle.domain == domain,
+                Puzzle.difficulty == difficulty,
+            )
+            .first()
+        )
+        if reserved:
+            return
+        try:
+            completion = create_chat_completion(
+                "puzzle",
+                f"{domain}/{difficulty}",
+                get_puzzle_generation_messages(domain, difficulty),
+                GENERATION_TEMPERATURE,
+                PUZZLE_TOKEN_ESTIMATE,
+                time.monotonic() + PUZZLE_REQUEST_DEADLINE,
+            )
+        except (LLMOverloaded, CircuitOpenError) as e:
+            self._count("skipped_busy")
+            puzzle_logger.info(
+                "Skipped puzzle prefetch for Player %s: %s", player_id, e
+            )
+            return
+        puzzle_data = parse_openai_response_content(completion["content"])
+        if not is_complete_puzzle(puzzle_data):
+            self._count("failed")
+            puzzle_logger.warning(
+                "Prefetched puzzle for Player %s was incomplete.", player_id
+            )
+            return
+        if save_generated_puzzle(
+            player_id, domain, difficulty, puzzle_data, status="reserved"
+        ):
+            self._count("reserved")
+
+    # Drops every reservation older than the TTL; returns how many were dropped
+    def expire_reservations(self):
+        expires_before = datetime.utcnow() - timedelta(seconds=self.reservation_ttl)
+        expired = PlayerProgress.query.filter(
+            PlayerProgress.status == "reserved",
+            PlayerProgress.last_attempted_at < expires_before,
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if expired:
+            self._count("expired", expired)
+            puzzle_logger.info("Expired %s unclaimed prefetched puzzles.", expired)
+        return expired
+
+    # Returns (body, 200) with the player's reserved puzzle, or None. Waits (until the
+    # deadline) for a prefetch in flight, since it is the call we would make anyway.
+    def claim(self, player_id, domain, difficulty, exclude_puzzle_id, deadline):
+        if not self.enabled:
+            return None
+        with self._lock:
+            pending = self._pending.get((str(player_id), domain, difficulty))
+        if pending is not None:
+            pending.wait(max(0, deadline - time.monotonic()))
+        try:
+            expires_before = datetime.utcnow() - timedelta(seconds=self.reservation_ttl)
+            query = PlayerProgress.query.join(Puzzle).filter(
+                PlayerProgress.player_id == player_id,
+                PlayerProgress.status == "reserved",
+                PlayerProgress.last_attempted_at >= expires_before,
+                Puzzle.domain == domain,
+                Puzzle.difficulty == difficulty,
+            )
+            if exclude_puzzle_id:
+                query = query.filter(Puzzle.puzzle_id != exclude_puzzle_id)
+            for progress in query.order_by(PlayerProgress.last_attempted_at).all():
+                # Conditional update so concurrent requests can't claim it twice
+                claimed = PlayerProgress.query.filter_by(
+                    progress_id=progress.progress_id, status="reserved"
+                ).update(
+                    {"status": "attempted", "last_attempted_at": datetime.utcnow()},
+                    synchronize_session=False,
+                )
+                db.session.commit()
+                if claimed:
+                    self._count("waited_hits" if pending is not None else "hits")
+                    puzzle_logger.info(
+                        "Served prefetched puzzle (ID: %s) to Player %s.",
+                        progress.puzzle_id,
+                        player_id,
+                    )
+                    return db.session.get(Puzzle, progress.puzzle_id).to_dict(), 200
+        except SQLAlchemyError:
+            db.session.rollback()
+            puzzle_logger.exception("DB error claiming a prefetched puzzle.")
+        self._count("misses")
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.stats["hits"] + self.stats["waited_hits"]
+            requests = hits + self.stats["misses"]
+            return {
+                "enabled": self.enabled,
+                "pending": len(self._pending),
+                "hit_rate": round(hits / requests, 4) if requests else None,
+                **self.stats,
+            }
+
+
+puzzle_prefetcher = PuzzlePrefetcher(PUZZLE_PREFETCH, PREFETCH_RESERVATION_TTL)
+
+
+# Reports prefetch hit rate: requests served a reserved puzzle vs. ones that had to wait on OpenAI
+@bp.route("/api/puzzles/prefetch", methods=["GET"])
+def get_puzzle_prefetch_stats():
+    return jsonify(puzzle_prefetcher.snapshot()), 200
+
+
+# Formats one server-sent event
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+# Streaming variant of /generate_puzzle over server-sent events:
+#   delta  {"text": ...}  next part of the puzzle description as it is generated
+#   reset  {}             a failed attempt is being retried; discard the deltas so far
+#   puzzle {...}          the stored puzzle (same body as /generate_puzzle), last event
+#   error  {"error": ...} generation failed, last event
+@bp.route("/generate_puzzle/stream", methods=["POST"])
+def generate_puzzle_stream():
+    fields, error_response = read_puzzle_request()
+    if error_response:
+        return error_response
+
+    # Joined here so concurrent /generate_puzzle calls for the same key coalesce with this one
+    flight_key = get_puzzle_flight_key(*fields)
+    call, is_leader = puzzle_generation_flight.join(flight_key)
+    if is_leader:
+        events = stream_puzzle_generation(flight_key, call, *fields)
+        # The generator finishes the call when it runs; if the response is closed
+        # before it starts, or never sent, the call is finished here instead
+        g.puzzle_flight = (flight_key, call)
+
+        @after_this_request
+        def finish_flight_on_close(response):
+            response.call_on_close(lambda: finish_interrupted_flight(flight_key, call))
+            return response
+
+    else:
+        events = stream_joined_puzzle(call)
+    return current_app.response_class(
+        stream_with_request_id(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Lets requests joined to a stream's call retry when the stream never ran to the
+# end; does nothing if the call has already finished
+def finish_interrupted_flight(flight_key, call):
+    puzzle_generation_flight.finish(
+        flight_key,
+        call,
+        ({"error": "Puzzle generation was interrupted. Please try again."}, 503),
+    )
+
+
+# A response that failed after the view (e.g. in an after_request hook) is never
+# sent, so neither its stream nor its close callback will run
+@bp.teardown_app_request
+def finish_unsent_puzzle_flight(exc):
+    flight = g.pop("puzzle_flight", None)
+    if flight is not None and exc is not None:
+        finish_interrupted_flight(*flight)
+
+
+# Emits the final event for a (body, status code) puzzle result
+def puzzle_result_event(result):
+    body, status_code = result
+    return sse_event("puzzle" if status_code < 400 else "error", body)
+
+
+# Emits the result of another request's in-flight generation for the same key
+def stream_joined_puzzle(call):
+    try:
+        yield puzzle_result_event(puzzle_generation_flight.wait(call))
+    except LLMOverloaded as e:
+        yield sse_event(
+            "error",
+            {
+                "error": "AI service is busy. Please try again shortly.",
+                "retry_after": e.retry_after,
+            },
+        )
+    except FlightTimeout:
+        yield sse_event(
+            "error",
+            {
+                "error": "AI service is busy. Please try again shortly.",
+                "retry_after": 5,
+            },
+        )
+
+
+# Relays a completion stream as delta events carrying the decoded puzzle description
+def relay_description_deltas(deltas, description):
+    try:
+        while True:
+            try:
+                chunk = next(deltas)
+            except StopIteration as stop:
+                return stop.value
+            text = description.feed(chunk)
+            if text:
+                yield sse_event("delta", {"text": text})
+    finally:
+        deltas.close()
+
+
+# Leader side of /generate_puzzle/stream; mirrors find_or_generate_puzzle
+def stream_puzzle_generation(
+    flight_key, call, player_id, domain, difficulty, exclude_puzzle_id
+):
+    result, error, claim_id = None, None, None
+    try:
+        result = find_unfinished_puzzle(
+            player_id, domain, difficulty, exclude_puzzle_id
+        )
+        if result:
+            yield puzzle_result_event(result)
+            return
+
+        deadline = time.monotonic() + PUZZLE_REQUEST_DEADLINE
+        result = puzzle_prefetcher.claim(
+            player_id, domain, difficulty, exclude_puzzle_id, deadline
+        )
+        if result:
+            yield puzzle_result_event(result)
+            return
+
+        try:
+            claim_id, result = acquire_puzzle_generation(
+                player_id, domain, difficulty, exclude_puzzle_id
+            )
+        except FlightTimeout as e:
+            error = e
+            yield sse_event(
+                "error",
+                {
+                    "error": "AI service is busy. Please try again shortly.",
+                    "retry_after": 5,
+                },
+            )
+            return
+        if result:
+            yield puzzle_result_event(result)
+            return
+
+        puzzle_logger.info(
+            "Streaming a new %s/%s puzzle for Player %s.", domain, difficulty, player_id
+        )
+        for attempt in range(MAX_RETRIES):
+            if time.monotonic() >= deadline:
+                puzzle_logger.warning(
+                    "Puzzle generation deadline reached for Player %s.", player_id
+                )
+                break
+            if attempt:
+                llm_retries.inc("puzzle")
+            description = JsonStringFieldStream("puzzle_description")
+            try:
+                completion = yield from relay_description_deltas(
+                    stream_chat_completion(
+                        "puzzle",
+                        f"{domain}/{difficulty}",
+                        get_puzzle_generation_messages(domain, difficulty),
+                        GENERATION_TEMPERATURE,
+                        PUZZLE_TOKEN_ESTIMATE,
+                        deadline,
+                    ),
+                    description,
+                )
+                puzzle_data = parse_openai_response_content(completion["content"])
+                if is_complete_puzzle(puzzle_data):
+                    result = save_generated_puzzle(
+                        player_id, domain, difficulty, puzzle_data
+                    )
+                    if result:
+                        yield puzzle_result_event(result)
+                        return
+            except LLMOverloaded as e:
+                error = e
+                yield sse_event(
+                    "error",
+                    {
+                        "error": "AI service is busy. Please try again shortly.",
+                        "retry_after": e.retry_after,
+                    },
+                )
+                return
+            except CircuitOpenError as e:
+                puzzle_logger.warning(
+                    "Skipping puzzle generation for Player %s: %s", player_id, e
+                )
+                break
+            except Exception as e:
+                puzzle_logger.exception(
+                    "Error on OpenAI stream, attempt %s", attempt + 1
+                )
+                if not isinstance(e, puzzle_providers.ProviderRateLimited):
+                    sleep_before_retry(attempt, deadline)
+            if description.started:
+                yield sse_event("reset", {})
+
+        result = handle_puzzle_generation_failure(player_id, domain, difficulty)
+        yield puzzle_result_event(result)
+    finally:
+        release_puzzle_generation(claim_id)
+        if result is None and error is None:
+            # The client went away mid-stream; let joined requests retry
+            finish_interrupted_flight(flight_key, call)
+        else:
+            puzzle_generation_flight.finish(flight_key, call, result, error)
+        if result is not None and result[1] < 400:
+            puzzle_prefetcher.schedule(player_id, domain, difficulty)
 
 
-@app.route("/api/skip_puzzle", methods=["POST"])
+@bp.route("/api/skip_puzzle", methods=["POST"])
 def skip_puzzle():
     data = request.get_json()
     player_id = data.get("player_id")
@@ -990,8 +3545,11 @@ def skip_puzzle():
             # If save_progress is true, mark as 'skipped', otherwise mark as 'abandoned'
             progress.status = "skipped" if save_progress else "abandoned"
             db.session.commit()
-            logging.info(
-                f"Player {player_id} {'skipped and saved' if save_progress else 'abandoned'} Puzzle {puzzle_id}."
+            puzzle_logger.info(
+                "Player %s %s Puzzle %s.",
+                player_id,
+                "skipped and saved" if save_progress else "abandoned",
+                puzzle_id,
             )
             return jsonify({"message": f"Puzzle {progress.status} successfully."}), 200
         else:
@@ -1000,11 +3558,11 @@ def skip_puzzle():
 
     except Exception as e:
         db.session.rollback()
-        logging.exception("Error skipping puzzle.")
+        puzzle_logger.exception("Error skipping puzzle.")
         return jsonify({"error": "Database error while skipping puzzle."}), 500
 
 
-@app.route("/api/skipped_puzzles/<int:player_id>", methods=["GET"])
+@bp.route("/api/skipped_puzzles/<int:player_id>", methods=["GET"])
 def get_skipped_puzzles(player_id):
     try:
         skipped_progress = (
@@ -1020,14 +3578,16 @@ def get_skipped_puzzles(player_id):
         puzzles_data = [progress.puzzle.to_dict() for progress in skipped_progress]
         return jsonify(puzzles_data), 200
     except Exception as e:
-        logging.exception(f"Error fetching skipped puzzles for player {player_id}: {e}")
+        puzzle_logger.exception(
+            "Error fetching skipped puzzles for player %s: %s", player_id, e
+        )
         return jsonify({"error": "Internal server error fetching skipped puzzles"}), 500
 
 
 # Generates a hint for a puzzle based on the puzzle and user's last answer
 def generate_hint_for_puzzle(puzzle, user_answer=""):
-    if ai_client is None:
-        logging.error("Hint: OpenAI client not initialized.")
+    if get_puzzle_provider() is None:
+        llm_logger.error("Hint: puzzle provider not initialized.")
         return None
     hint_prompt_content = f"""
     You are a helpful assistant providing subtle hints for technical puzzles.
@@ -1037,46 +3597,57 @@ def generate_hint_for_puzzle(puzzle, user_answer=""):
     Generate a single, concise, subtle hint. Do NOT give the answer. Guide the user.
     Return ONLY JSON: {{"hint_text": "The generated hint."}}
     """
-    logging.debug(
-        f"--- Sending Hint Prompt to OpenAI (Model: {OPENAI_MODEL_NAME}, Temp: {HINT_TEMPERATURE}) ---:\nUser Message: {hint_prompt_content[:500]}...\n---"
+    llm_logger.debug(
+        "--- Sending Hint Prompt to OpenAI (Model: %s, Temp: %s) ---:\nUser Message: %s...\n---",
+        OPENAI_MODEL_NAME,
+        HINT_TEMPERATURE,
+        hint_prompt_content[:500],
     )
     hint_text_val = None
     last_error = "No attempts for hint."
+    deadline = time.monotonic() + HINT_REQUEST_DEADLINE
     for attempt in range(HINT_GENERATION_RETRIES):
-        logging.info(
-            f"Attempt {attempt + 1}/{HINT_GENERATION_RETRIES} for hint from OpenAI..."
+        if time.monotonic() >= deadline:
+            last_error = "Hint deadline reached."
+            break
+        if attempt:
+            llm_retries.inc("hint")
+        llm_logger.info(
+            "Attempt %s/%s for hint from OpenAI...",
+            attempt + 1,
+            HINT_GENERATION_RETRIES,
         )
         try:
-            response = ai_client.chat.completions.create(
-                model=OPENAI_MODEL_NAME,
-                messages=[
+            completion = create_chat_completion(
+                "hint",
+                f"{puzzle.domain}/{puzzle.difficulty}",
+                [
                     {
                         "role": "system",
                         "content": "You are a helpful hint generation assistant. Provide hints in JSON format as specified.",
                     },
                     {"role": "user", "content": hint_prompt_content},
                 ],
-                temperature=HINT_TEMPERATURE,
-                response_format={"type": "json_object"},
-            )
-            raw_response_content = (
-                response.choices[0].message.content
-                if response.choices and response.choices[0].message
-                else ""
+                HINT_TEMPERATURE,
+                HINT_TOKEN_ESTIMATE,
+                deadline,
             )
-            logging.debug(
-                f"Raw OpenAI Hint Response Content (Att {attempt + 1}): >>>\n{raw_response_content[:300]}...\n<<<"
-            )
-            finish_reason = (
-                response.choices[0].finish_reason if response.choices else "unknown"
+            raw_response_content = completion["content"] or ""
+            llm_logger.debug(
+                "Raw OpenAI Hint Response Content (Att %s): >>>\n%s...\n<<<",
+                attempt + 1,
+                raw_response_content[:300],
             )
+            finish_reason = completion["finish_reason"]
             if finish_reason != "stop":
-                logging.warning(
-                    f"OpenAI Hint Gen Finish Reason (Att {attempt + 1}): {finish_reason}"
+                llm_logger.warning(
+                    "OpenAI Hint Gen Finish Reason (Att %s): %s",
+                    attempt + 1,
+                    finish_reason,
                 )
                 last_error = f"AI hint response incomplete or filtered (Reason: {finish_reason}) on attempt {attempt + 1}."
                 if attempt < HINT_GENERATION_RETRIES - 1:
-                    time.sleep(1)
+                    sleep_before_retry(attempt, deadline)
                     continue
                 else:
                     break
@@ -1088,25 +3659,29 @@ def generate_hint_for_puzzle(puzzle, user_answer=""):
                 and parsed["hint_text"].strip()
             ):
                 hint_text_val = parsed["hint_text"]
-                logging.info(f"Hint generated by OpenAI (Att {attempt + 1}).")
+                llm_logger.info("Hint generated by OpenAI (Att %s).", attempt + 1)
                 break
             else:
                 last_error = f"Bad hint format/empty from OpenAI (Att {attempt + 1}). Content: '{raw_response_content[:200]}...'"
-            logging.warning(last_error)
+            llm_logger.warning(last_error)
             if attempt < HINT_GENERATION_RETRIES - 1:
-                time.sleep(1)
+                sleep_before_retry(attempt, deadline)
+        except (LLMOverloaded, CircuitOpenError) as e:
+            # Hints are optional; don't hold up answer validation waiting for capacity
+            last_error = f"Hint skipped, LLM unavailable: {e}"
+            break
         except Exception as e:
             last_error = f"OpenAI Hint API call error (Att {attempt + 1}): {e}"
-            logging.exception(last_error)
-        if attempt < HINT_GENERATION_RETRIES - 1:
-            time.sleep(1)
+            llm_logger.exception(last_error)
+            if attempt < HINT_GENERATION_RETRIES - 1:
+                sleep_before_retry(attempt, deadline)
     if not hint_text_val:
-        logging.error(f"Failed to get hint from OpenAI. Last error: {last_error}")
+        llm_logger.error("Failed to get hint from OpenAI. Last error: %s", last_error)
     return hint_text_val
 
 
 # Validates a player's answer for a puzzle and provides feedback
-@app.route("/validate_answer", methods=["POST"])
+@bp.route("/validate_answer", methods=["POST"])
 def validate_answer():
     try:
         data = request.get_json()
@@ -1123,8 +3698,11 @@ def validate_answer():
     except Exception:
         return jsonify({"error": "Invalid payload"}), 400
 
-    logging.info(
-        f"Validation: P{player_id}, Q{puzzle_id}. Ans: '{str(user_answer)[:50]}...'"
+    validation_logger.info(
+        "Validation: P%s, Q%s. Ans: '%s...'",
+        player_id,
+        puzzle_id,
+        str(user_answer)[:50],
     )
     try:
         puzzle, player = db.session.get(Puzzle, puzzle_id), db.session.get(
@@ -1151,8 +3729,8 @@ def validate_answer():
             try:
                 struct_crit = json.loads(crit_str)
             except json.JSONDecodeError:
-                logging.warning(
-                    f"Bad structured criteria Q{puzzle_id}: {crit_str[:100]}"
+                validation_logger.warning(
+                    "Bad structured criteria Q%s: %s", puzzle_id, crit_str[:100]
                 )
 
         if struct_crit and isinstance(struct_crit, dict):
@@ -1161,11 +3739,22 @@ def validate_answer():
                 is_correct, feedback = val_res, fb_eval
             else:
                 feedback = fb_eval
-                logging.warning(
-                    f"Structured validation for Q{puzzle_id} was unsupported or malformed. Feedback: {feedback}"
+                validation_logger.warning(
+                    "Structured validation for Q%s was unsupported or malformed. Feedback: %s",
+                    puzzle_id,
+                    feedback,
                 )
+            answer_validations.inc(
+                "structured",
+                (
+                    "unsupported"
+                    if val_res is None
+                    else "correct" if is_correct else "incorrect"
+                ),
+            )
         else:
             is_correct, feedback = validate_legacy_criteria(crit_str, user_answer)
+            answer_validations.inc("legacy", "correct" if is_correct else "incorrect")
 
         if progress.status != "solved":
             progress.attempts += 1
@@ -1176,20 +3765,29 @@ def validate_answer():
         if is_correct:
             if progress.status != "solved":
                 progress.status, progress.solved_at = "solved", datetime.utcnow()
-            logging.info(
-                f"P{player_id} solved Q{puzzle_id} (Total Attempts for this puzzle: {progress.attempts})."
+            validation_logger.info(
+                "P%s solved Q%s (Total Attempts for this puzzle: %s).",
+                player_id,
+                puzzle_id,
+                progress.attempts,
             )
         else:
-            logging.info(
-                f"P{player_id} incorrect for Q{puzzle_id} (Total Attempts for this puzzle: {progress.attempts})."
+            validation_logger.info(
+                "P%s incorrect for Q%s (Total Attempts for this puzzle: %s).",
+                player_id,
+                puzzle_id,
+                progress.attempts,
             )
             if (
                 progress.status != "solved"
                 and progress.attempts >= HINT_REQUEST_THRESHOLD
                 and not progress.hint_text
             ):
-                logging.info(
-                    f"Attempting to generate hint for P{player_id}, Q{puzzle_id} after {progress.attempts} attempts."
+                validation_logger.info(
+                    "Attempting to generate hint for P%s, Q%s after %s attempts.",
+                    player_id,
+                    puzzle_id,
+                    progress.attempts,
                 )
                 gen_hint = generate_hint_for_puzzle(puzzle, str(user_answer))
                 if gen_hint:
@@ -1199,11 +3797,16 @@ def validate_answer():
                     )
                     current_hint = gen_hint
                     feedback = f"{feedback} A hint is now available."
-                    logging.info(
-                        f"Hint for P{player_id}, Q{puzzle_id}: '{gen_hint[:50]}...'"
+                    validation_logger.info(
+                        "Hint for P%s, Q%s: '%s...'",
+                        player_id,
+                        puzzle_id,
+                        gen_hint[:50],
                     )
                 else:
-                    logging.warning(f"Failed to get hint P{player_id}, Q{puzzle_id}.")
+                    validation_logger.warning(
+                        "Failed to get hint P%s, Q%s.", player_id, puzzle_id
+                    )
 
         db.session.commit()
 
@@ -1214,15 +3817,440 @@ def validate_answer():
         return jsonify(res_payload), 200
     except Exception as e:
         db.session.rollback()
-        logging.exception(
-            f"Error in validate_answer P:{player_id if 'player_id' in locals() else 'Unknown'} Q:{puzzle_id if 'puzzle_id' in locals() else 'Unknown'}"
+        validation_logger.exception(
+            "Error in validate_answer P:%s Q:%s",
+            player_id if "player_id" in locals() else "Unknown",
+            puzzle_id if "puzzle_id" in locals() else "Unknown",
         )
         return jsonify({"error": "Internal error during validation."}), 500
 
 
-# Runs the Flask application with database table validation
-if __name__ == "__main__":
+# --- Analytics Export ---
+# PlayerProgress, Players and FoundCredentials as NDJSON or CSV, streamed in keyset
+# batches (each a short query, so the database is never locked for long and memory
+# stays flat) and incremental: a run exports rows whose watermark column is after
+# `since` and up to the watermark returned for the next run.
+ANALYTICS_EXPORT_TOKEN = os.getenv("ANALYTICS_EXPORT_TOKEN")
+ANALYTICS_BATCH_SIZE = 1000
+ANALYTICS_FLUSH_BYTES = 64 * 1024
+ANALYTICS_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# dataset -> (model, watermark column, id column, exported columns, filters)
+ANALYTICS_DATASETS = {
+    "progress": (
+        PlayerProgress,
+        "last_attempted_at",
+        "progress_id",
+        [
+            "progress_id",
+            "player_id",
+            "puzzle_id",
+            "status",
+            "attempts",
+            "last_attempted_at",
+            "solved_at",
+            "hint_requested_at",
+        ],
+        [PlayerProgress.status != "reserved"],  # Prefetched, not yet played
+    ),
+    "players": (
+        Player,
+        "created_at",
+        "player_id",
+        ["player_id", "username", "created_at", "terminal_access_level"],
+        [],
+    ),
+    "credentials": (
+        FoundCredential,
+        "found_at",
+        "id",
+        ["id", "player_id", "found_username", "found_at"],
+        [],
+    ),
+}
+analytics_indexes_ready = False
+
+
+# Databases created before the watermark columns were indexed get the indexes here
+def ensure_analytics_indexes():
+    global analytics_indexes_ready
+    if not analytics_indexes_ready:
+        for model, watermark_name, *_ in ANALYTICS_DATASETS.values():
+            for index in model.__table__.indexes:
+                if watermark_name in index.columns:
+                    index.create(db.engine, checkfirst=True)
+        analytics_indexes_ready = True
+
+
+# Latest watermark of a dataset, the upper bound of an export started now
+def get_analytics_watermark(dataset):
+    model, watermark_name = ANALYTICS_DATASETS[dataset][:2]
+    return db.session.query(func.max(getattr(model, watermark_name))).scalar()
+
+
+# Yields a dataset's rows (dicts) with since < watermark <= until, oldest first
+def iter_analytics_rows(dataset, since, until):
+    if until is None:
+        return  # Nothing to export yet
+    model, watermark_name, id_name, columns, filters = ANALYTICS_DATASETS[dataset]
+    watermark, row_id = getattr(model, watermark_name), getattr(model, id_name)
+    query = db.session.query(*[getattr(model, name) for name in columns]).filter(
+        watermark <= until, *filters
+    )
+    if since is not None:
+        query = query.filter(watermark > since)
+    last = None
+    while True:
+        batch = query
+        if last is not None:
+            # A row-value comparison is one index range scan; the OR form sorts
+            batch = batch.filter(tuple_(watermark, row_id) > tuple_(*last))
+        rows = batch.order_by(watermark, row_id).limit(ANALYTICS_BATCH_SIZE).all()
+        if not rows:
+            return
+        for row in rows:
+            yield {
+                name: value.isoformat() if isinstance(value, datetime) else value
+                for name, value in zip(columns, row)
+            }
+        last = (getattr(rows[-1], watermark_name), getattr(rows[-1], id_name))
+
+
+# Encodes rows as NDJSON or CSV (with a header row), in chunks of ~64 KB
+def format_analytics_rows(rows, columns, export_format):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer:
+        writer.writerow(columns)
+    for row in rows:
+        if writer:
+            writer.writerow([row[name] for name in columns])
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        if buffer.tell() >= ANALYTICS_FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# Streams one dataset for analytics. Needs "Authorization: Bearer $ANALYTICS_EXPORT_TOKEN";
+# ?format=ndjson|csv, ?since=<X-Export-Watermark of the previous export>
+@bp.route("/api/analytics/export/<string:dataset>", methods=["GET"])
+def export_analytics(dataset):
+    if not ANALYTICS_EXPORT_TOKEN:
+        return jsonify({"error": "Analytics export is not configured"}), 503
+    if not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {ANALYTICS_EXPORT_TOKEN}"
+    ):
+        return jsonify({"error": "Unauthorized"}), 401
+    if dataset not in ANALYTICS_DATASETS:
+        return jsonify({"error": f"Unknown dataset '{dataset}'"}), 404
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ANALYTICS_FORMATS:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    try:
+        since = (
+            datetime.fromisoformat(request.args["since"])
+            if request.args.get("since")
+            else None
+        )
+    except ValueError:
+        return jsonify({"error": "since must be an ISO 8601 timestamp"}), 400
+
+    ensure_analytics_indexes()
+    until = get_analytics_watermark(dataset) or since
+    columns = ANALYTICS_DATASETS[dataset][3]
+    logging.info(
+        f"Analytics export of {dataset} ({export_format}): {since} -> {until}."
+    )
+    return current_app.response_class(
+        stream_with_request_id(
+            format_analytics_rows(
+                iter_analytics_rows(dataset, since, until), columns, export_format
+            )
+        ),
+        mimetype=ANALYTICS_FORMATS[export_format],
+        headers={
+            "X-Export-Watermark": until.isoformat() if until else "",
+            "Content-Disposition": f"attachment; filename={dataset}.{export_format}",
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+# --- Retention & Compaction ---
+# Progress nobody will read again (abandoned puzzles, attempts untouched for months)
+# is moved to ArchivedProgress, and AI puzzles no player holds are pruned down to a
+# pool of the newest ORPHAN_PUZZLE_POOL_SIZE per domain/difficulty, which
+# serve_stored_puzzle hands out again. Work is done a batch per short transaction,
+# with a pause in between, so players' writes never wait long for the lock.
+ABANDONED_RETENTION_DAYS = 7
+STALE_PROGRESS_RETENTION_DAYS = 90  # For 'attempted' entries; solved/skipped are kept
+ORPHAN_PUZZLE_MIN_AGE_DAYS = 30
+ORPHAN_PUZZLE_POOL_SIZE = 200
+COMPACTION_BATCH_SIZE = 500
+COMPACTION_BATCH_PAUSE = 0.05  # Seconds between batches
+ARCHIVED_PROGRESS_COLUMNS = [
+    "progress_id",
+    "player_id",
+    "puzzle_id",
+    "status",
+    "attempts",
+    "last_attempted_at",
+]
+last_compaction_report = None
+
+
+# Moves the progress entries matching the filters to ArchivedProgress; returns the count
+def archive_progress(filters, batch_size=COMPACTION_BATCH_SIZE):
+    archived = 0
+    while True:
+        ids = [
+            row.progress_id
+            for row in db.session.query(PlayerProgress.progress_id)
+            .filter(*filters)
+            .order_by(PlayerProgress.progress_id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return archived
+        # Filters are checked again, so an entry a player touched meanwhile stays put
+        in_batch = [PlayerProgress.progress_id.in_(ids), *filters]
+        db.session.execute(
+            insert(ArchivedProgress).from_select(
+                ARCHIVED_PROGRESS_COLUMNS + ["archived_at"],
+                select(
+                    *[
+                        getattr(PlayerProgress, name)
+                        for name in ARCHIVED_PROGRESS_COLUMNS
+                    ],
+                    literal(datetime.utcnow()),
+                ).where(*in_batch),
+            )
+        )
+        archived += PlayerProgress.query.filter(*in_batch).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        if len(ids) < batch_size:
+            return archived
+        time.sleep(COMPACTION_BATCH_PAUSE)
+
+
+# Deletes AI puzzles without progress entries created before the cutoff, keeping the
+# newest pool_size of them per domain/difficulty; returns the count
+def prune_orphan_puzzles(
+    created_before, pool_size=ORPHAN_PUZZLE_POOL_SIZE, batch_size=COMPACTION_BATCH_SIZE
+):
+    held = (
+        select(PlayerProgress.puzzle_id)
+        .where(PlayerProgress.puzzle_id == Puzzle.puzzle_id)
+        .exists()
+    )
+    orphan_filters = [
+        Puzzle.is_ai_generated == True,
+        Puzzle.created_at < created_before,
+        ~held,
+    ]
+    pruned = 0
+    for domain, difficulty in (
+        db.session.query(Puzzle.domain, Puzzle.difficulty).distinct().all()
+    ):
+        while True:
+            ids = [
+                row.puzzle_id
+                for row in db.session.query(Puzzle.puzzle_id)
+                .filter(
+                    Puzzle.domain == domain,
+                    Puzzle.difficulty == difficulty,
+                    *orphan_filters,
+                )
+                .order_by(Puzzle.created_at.desc(), Puzzle.puzzle_id.desc())
+                .offset(pool_size)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            # Re-checked in the delete: one may have been served as a fallback meanwhile
+            Puzzle.query.filter(Puzzle.puzzle_id.in_(ids), ~held).delete(
+                synchronize_session=False
+            )
+            kept = {
+                row.puzzle_id
+                for row in db.session.query(Puzzle.puzzle_id).filter(
+                    Puzzle.puzzle_id.in_(ids)
+                )
+            }
+            db.session.commit()
+            for puzzle_id in set(ids) - kept:
+                puzzle_similarity_index.remove(puzzle_id)
+            pruned += len(ids) - len(kept)
+            time.sleep(COMPACTION_BATCH_PAUSE)
+    return pruned
+
+
+# Page usage of the SQLite file: (file bytes, bytes on the free list), or None elsewhere
+def get_database_space():
+    if db.engine.dialect.name != "sqlite":
+        return None
+    page_size, page_count, free_pages = (
+        db.session.execute(text(f"PRAGMA {name}")).scalar()
+        for name in ("page_size", "page_count", "freelist_count")
+    )
+    return page_size * page_count, page_size * free_pages
+
+
+# Runs every retention rule and returns (and logs) what was reclaimed. Freed pages are
+# reused by new rows; vacuum=True also shrinks the file, but locks the whole database
+# while it rewrites it, so it is only offered by compact_database.py.
+def compact_database(batch_size=COMPACTION_BATCH_SIZE, vacuum=False):
+    global last_compaction_report
+    started = time.monotonic()
+    ArchivedProgress.__table__.create(db.engine, checkfirst=True)
+    space_before = get_database_space()
+    now = datetime.utcnow()
+    report = {
+        "started_at": now.isoformat(),
+        "reservations_expired": puzzle_prefetcher.expire_reservations(),
+        "abandoned_archived": archive_progress(
+            [
+                PlayerProgress.status == "abandoned",
+                PlayerProgress.last_attempted_at
+                < now - timedelta(days=ABANDONED_RETENTION_DAYS),
+            ],
+            batch_size,
+        ),
+        "stale_archived": archive_progress(
+            [
+                PlayerProgress.status == "attempted",
+                PlayerProgress.last_attempted_at
+                < now - timedelta(days=STALE_PROGRESS_RETENTION_DAYS),
+            ],
+            batch_size,
+        ),
+    }
+    # After archiving, so puzzles only those entries held are pruned in the same run
+    report["orphan_puzzles_pruned"] = prune_orphan_puzzles(
+        now - timedelta(days=ORPHAN_PUZZLE_MIN_AGE_DAYS), batch_size=batch_size
+    )
+    if vacuum and space_before:
+        db.session.commit()
+        with db.engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql(
+                "VACUUM"
+            )
+    space_after = get_database_space()
+    if space_before and space_after:
+        report["file_bytes"] = space_after[0]
+        report["free_bytes"] = space_after[1]
+        # Bytes the removed rows occupied: now free for reuse, or gone from the file
+        report["reclaimed_bytes"] = (space_before[0] - space_after[0]) + (
+            space_after[1] - space_before[1]
+        )
+    report["seconds"] = round(time.monotonic() - started, 3)
+    last_compaction_report = report
+    logging.info(f"Database compaction finished: {report}")
+    return report
+
+
+# Takes an exclusive lock on path without waiting; returns the open file holding it,
+# or None while another process has it
+def try_lock_file(path):
+    import fcntl
+
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+# Runs the compaction job every COMPACTION_INTERVAL_HOURS in the server process. With
+# several server workers, only the one holding lock_path runs it; when that worker
+# exits, the lock is released and another worker takes over
+def run_scheduled_compaction(app, lock_path=None):
+    lock_file = None
+    while True:
+        time.sleep(COMPACTION_INTERVAL_HOURS * 3600)
+        if lock_path and lock_file is None:
+            lock_file = try_lock_file(lock_path)
+            if lock_file is None:
+                continue
+        with app.app_context():
+            try:
+                compact_database()
+            except SQLAlchemyError:
+                db.session.rollback()
+                logging.exception("Scheduled database compaction failed.")
+
+
+# Reports the last compaction run: rows archived/pruned and bytes reclaimed
+@bp.route("/api/maintenance/compaction", methods=["GET"])
+def get_compaction_report():
+    return (
+        jsonify(
+            {
+                "interval_hours": COMPACTION_INTERVAL_HOURS,
+                "last_run": last_compaction_report,
+            }
+        ),
+        200,
+    )
+
+
+# --- Application Factory ---
+# create_app() only wires things up; the OpenAI SDK is imported when the puzzle
+# provider is first used (or warmed up), so scripts that only need the database,
+# and server workers, start quickly. prepare_app() does the one-off startup work
+# and start_background_tasks() starts this process's threads; under gunicorn they
+# run in the master before forking and in each worker respectively (see wsgi.py).
+def create_app():
+    global traffic_recorder
+    app = Flask(__name__, template_folder="templates", static_folder="static")
+    CORS(app)
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
+        "DATABASE_URL", f"sqlite:///{DB_NAME}"
+    )
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.secret_key = SECRET_KEY or secrets.token_bytes(32)
+    if not SECRET_KEY:
+        logging.info(
+            "SECRET_KEY is not set: terminal logins only last until this process "
+            "restarts and are not recognized by other worker processes."
+        )
+    db.init_app(app)
+    app.register_blueprint(bp)
+    asset_manifest.update(build_assets.load_manifest(app.static_folder))
+    if not riddle_pack_responses:
+        load_riddle_packs()
+    if not terminal_fs_nodes:
+        load_terminal_filesystem()
+    if TRAFFIC_CAPTURE_FILE and traffic_recorder is None:
+        traffic_recorder = traffic_capture.TrafficRecorder(
+            TRAFFIC_CAPTURE_FILE, TRAFFIC_CAPTURE_MAX_BODY, TRAFFIC_CAPTURE_KEY
+        )
+        logging.info(f"Capturing API traffic to {TRAFFIC_CAPTURE_FILE}.")
+        if not TRAFFIC_CAPTURE_KEY:
+            logging.warning(
+                "TRAFFIC_CAPTURE_KEY is not set: pseudonyms in the capture are only "
+                "consistent within this process, so players who signed up before a "
+                "restart or in another worker will fail to log in on replay."
+            )
+    return app
+
+
+# Builds the static assets, renders the static pages and checks the database
+def prepare_app(app):
     with app.app_context():
+        asset_manifest.update(build_assets.build_assets(app.static_folder))
+        prerender_static_pages()
+        ensure_puzzle_search_index()
+        ensure_analytics_indexes()
+        ArchivedProgress.__table__.create(db.engine, checkfirst=True)
+        PuzzleGenerationClaim.__table__.create(db.engine, checkfirst=True)
         try:
             from sqlalchemy import inspect as sa_inspect
 
@@ -1241,4 +4269,27 @@ if __name__ == "__main__":
             logging.error(
                 f"Error checking database tables: {e}. Ensure DB file exists and is accessible."
             )
+
+
+# Starts the warm-up, index preload and compaction threads of this process
+def start_background_tasks(app, compaction_lock_path=None):
+    if OPENAI_WARMUP:
+        threading.Thread(target=warm_up_puzzle_provider, daemon=True).start()
+    threading.Thread(
+        target=preload_puzzle_similarity_index, args=(app,), daemon=True
+    ).start()
+    if COMPACTION_INTERVAL_HOURS > 0:
+        threading.Thread(
+            target=run_scheduled_compaction,
+            args=(app, compaction_lock_path),
+            daemon=True,
+        ).start()
+
+
+# Runs the Flask application with database table validation
+if __name__ == "__main__":
+    # Development server; in production run: gunicorn -c gunicorn.conf.py wsgi:app
+    app = create_app()
+    prepare_app(app)
+    start_background_tasks(app)
     app.run(host="0.0.0.0", port=8000, debug=True)
@@ -0,0 +1,211 @@
+import argparse
+import http.client
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# A real HTTP server with a fixed pool of threads (like a gunicorn gthread worker),
+# the offline puzzle provider standing in for a slow OpenAI, and a throwaway database;
+# all read when app is imported
+_workdir = tempfile.mkdtemp(prefix="enigma-bulkheads-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/bench.db")
+os.environ.setdefault("PUZZLE_PROVIDER", "fake")
+os.environ.setdefault("PUZZLE_PREFETCH", "false")
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+os.environ.setdefault("OPENAI_WARMUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from werkzeug.serving import BaseWSGIServer
+
+import app as enigma
+from app import create_app, db, llm_limiter, Player, Puzzle
+
+SERVER_THREADS = 8
+VALIDATION_CLIENTS = 4
+ANSWER = "B"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Serves each connection on one of a fixed number of threads."""
+
+    request_queue_size = 256
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def seed(app, players):
+    """Creates a puzzle whose answer is ANSWER, and the players; returns their IDs."""
+    with app.app_context():
+        db.create_all()
+        puzzle = Puzzle(
+            domain="Backend",
+            difficulty="Easy",
+            puzzle_description="Which option is correct? A) no B) yes",
+            validation_criteria="The correct option is B",
+            is_ai_generated=False,
+        )
+        accounts = [
+            Player(username=f"bench-{i}", email=f"bench-{i}@bench.local")
+            for i in range(players)
+        ]
+        for player in accounts:
+            player.password_hash = "benchmark"
+        db.session.add(puzzle)
+        db.session.add_all(accounts)
+        db.session.commit()
+        return puzzle.puzzle_id, [player.player_id for player in accounts]
+
+
+def post(port, path, payload):
+    """Returns (status, seconds, Retry-After header) of one POST."""
+    started = time.perf_counter()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        connection.request(
+            "POST", path, json.dumps(payload), {"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        response.read()
+        return (
+            response.status,
+            time.perf_counter() - started,
+            response.getheader("Retry-After"),
+        )
+    finally:
+        connection.close()
+
+
+def run_phase(port, puzzle_id, validating_players, new_players, seconds, spike_clients):
+    """
+    Validation clients answer (correctly, so no hints are generated) for `seconds`
+    while spike_clients keep requesting AI puzzles for players who have none.
+    Returns the validation latencies and errors, and the puzzle requests' statuses
+    and Retry-After values.
+    """
+    stop_at = time.monotonic() + seconds
+    players_lock = threading.Lock()
+    latencies, errors, puzzle_statuses, retry_afters = [], [], [], []
+
+    def next_player():
+        with players_lock:
+            return next(new_players)
+
+    def validate_loop(player_id):
+        while time.monotonic() < stop_at:
+            status, elapsed, _ = post(
+                port,
+                "/validate_answer",
+                {"player_id": player_id, "puzzle_id": puzzle_id, "user_answer": ANSWER},
+            )
+            latencies.append(elapsed)
+            if status != 200:
+                errors.append(status)
+
+    def spike_loop():
+        while time.monotonic() < stop_at:
+            status, _, retry_after = post(
+                port,
+                "/generate_puzzle",
+                {
+                    "player_id": next_player(),
+                    "domain": "Frontend",
+                    "difficulty": "Easy",
+                },
+            )
+            puzzle_statuses.append(status)
+            if retry_after:
+                retry_afters.append(int(retry_after))
+                time.sleep(0.05)  # An impatient client, not one honouring Retry-After
+
+    threads = [
+        threading.Thread(target=validate_loop, args=(player_id,))
+        for player_id in validating_players
+    ] + [threading.Thread(target=spike_loop) for _ in range(spike_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, puzzle_statuses, retry_afters
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    """
+    Load test for the bulkheads, e.g.:
+        python benchmark_bulkheads.py --spike-clients 24 --llm-latency 2
+    Measures /validate_answer latency on its own and during a burst of
+    /generate_puzzle calls held up by a slow LLM, with bulkheads on and off.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the bulkheads.")
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--spike-clients", type=int, default=24)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = create_app()
+    # The fake provider still spends the token budget; don't let it throttle the spike
+    llm_limiter.tokens_per_minute = llm_limiter._tokens = 1e12
+    provider = enigma.get_puzzle_provider()
+    provider.latency = args.llm_latency
+    puzzle_id, player_ids = seed(app, 5000)
+    server = PooledWSGIServer("127.0.0.1", 0, app, SERVER_THREADS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    validating_players = player_ids[:VALIDATION_CLIENTS]
+    new_players = iter(player_ids[VALIDATION_CLIENTS:])
+
+    print(
+        f"{SERVER_THREADS} server threads, {VALIDATION_CLIENTS} validation clients, "
+        f"{args.spike_clients} puzzle clients, LLM latency {args.llm_latency}s"
+    )
+    print(
+        f"{'bulkheads':<10}{'phase':<7}{'answers':>8}{'errors':>7}{'p50 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'puzzles':>8}{'shed':>6}{'retry-after':>12}"
+    )
+    for enabled in (True, False):
+        enigma.BULKHEADS_ENABLED = enabled
+        for phase, spike_clients in (("quiet", 0), ("spike", args.spike_clients)):
+            latencies, errors, statuses, retry_afters = run_phase(
+                port,
+                puzzle_id,
+                validating_players,
+                new_players,
+                args.seconds,
+                spike_clients,
+            )
+            served = sum(1 for status in statuses if status < 300)
+            shed = sum(1 for status in statuses if status == 503)
+            print(
+                f"{'on' if enabled else 'off':<10}{phase:<7}{len(latencies):>8}"
+                f"{len(errors):>7}{statistics.median(latencies) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+                f"{max(latencies) * 1000:>9.1f}{served:>8}{shed:>6}"
+                f"{(f'{min(retry_afters)}-{max(retry_afters)}s' if retry_afters else '-'):>12}"
+            )
+            time.sleep(args.llm_latency * 2)  # Let the spike's stragglers finish
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
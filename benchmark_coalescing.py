@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Fires a burst of identical /generate_puzzle requests at the offline provider from
+# several worker processes sharing one database, as gunicorn's workers do, and
+# checks they were coalesced into one provider call and one new puzzle. Everything
+# else runs with the app's default configuration, bulkheads included: requests they
+# shed get 503, the rest must all get the same puzzle. Settings are read when app
+# is imported; the worker processes inherit them.
+_workdir = tempfile.mkdtemp(prefix="enigma-coalescing-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/burst.db")
+os.environ["PUZZLE_PROVIDER"] = "fake"
+os.environ["PUZZLE_PREFETCH"] = "false"
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+os.environ.setdefault("OPENAI_WARMUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app as enigma
+from app import create_app, db, llm_limiter, Player, Puzzle, PuzzleGenerationClaim
+
+
+def burst(app, player_id, threads):
+    """Sends `threads` identical requests at once; returns (status, puzzle ID) pairs."""
+    start = threading.Barrier(threads)
+    results = [None] * threads
+
+    def request(index):
+        client = app.test_client()
+        start.wait()
+        response = client.post(
+            "/generate_puzzle",
+            json={"player_id": player_id, "domain": "Backend", "difficulty": "Hard"},
+        )
+        results[index] = (response.status_code, response.get_json().get("puzzle_id"))
+
+    workers = [threading.Thread(target=request, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def run_worker(args):
+    """One worker process: waits for the shared start time, bursts, prints JSON."""
+    app = create_app()
+    # The fake provider still spends the token budget; don't let it get in the way
+    llm_limiter.tokens_per_minute = llm_limiter._tokens = 1e12
+    provider = enigma.get_puzzle_provider()
+    provider.latency = args.llm_latency
+    time.sleep(max(0, args.start_at - time.time()))
+    results = burst(app, args.player_id, args.threads)
+    print(json.dumps({"results": results, "provider_calls": provider._calls}))
+
+
+def check_interrupted_leader():
+    """A leader killed by a BaseException must not leave its key behind."""
+    flight = enigma.SingleFlight(timeout=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    try:
+        flight.do("key", interrupted)
+    except KeyboardInterrupt:
+        pass
+    return flight.do("key", lambda: "ran") == "ran"
+
+
+def main():
+    """
+    Concurrency check for request coalescing, e.g.:
+        python benchmark_coalescing.py --workers 4 --threads 20 --llm-latency 0.5
+    Exits with status 1 unless the burst made exactly one provider call across all
+    workers, saved exactly one puzzle and every request that wasn't shed got it.
+    """
+    parser = argparse.ArgumentParser(description="Check /generate_puzzle coalescing.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=20, help="Per worker")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--player-id", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.start_at is not None:
+        run_worker(args)
+        return
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        player = Player(username="burst", email="burst@bench.local")
+        player.password_hash = "benchmark"
+        db.session.add(player)
+        db.session.commit()
+        player_id = player.player_id
+
+    # Leave the workers time to import the app before the burst starts
+    start_at = time.time() + 5
+    command = [sys.executable, os.path.abspath(__file__)]
+    command += ["--threads", str(args.threads), "--llm-latency", str(args.llm_latency)]
+    command += ["--player-id", str(player_id), "--start-at", str(start_at)]
+    workers = [
+        subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.workers)
+    ]
+    outputs = [json.loads(worker.communicate()[0]) for worker in workers]
+    elapsed = time.time() - start_at
+    with app.app_context():
+        puzzles = db.session.query(Puzzle).count()
+        claims = db.session.query(PuzzleGenerationClaim).count()
+    results = [tuple(result) for output in outputs for result in output["results"]]
+    provider_calls = sum(output["provider_calls"] for output in outputs)
+    served = [(status, puzzle_id) for status, puzzle_id in results if status < 300]
+    puzzle_ids = {puzzle_id for _, puzzle_id in served}
+    statuses = sorted({status for status, _ in results})
+
+    print(f"{len(results)} identical requests from {args.workers} workers")
+    print(f"in {elapsed:.2f}s: {len(served)} served, {len(results) - len(served)} shed")
+    print(f"statuses {statuses}, puzzle IDs {sorted(puzzle_ids, key=str)}")
+    print(f"provider calls {provider_calls}, puzzles saved {puzzles}")
+    failures = []
+    if provider_calls != 1:
+        failures.append(f"expected 1 provider call, got {provider_calls}")
+    if puzzles != 1:
+        failures.append(f"expected 1 puzzle, got {puzzles}")
+    if len(puzzle_ids) != 1:
+        failures.append("the served requests didn't all get the same puzzle")
+    if any(status >= 300 and status != 503 for status in statuses):
+        failures.append("requests failed with something other than 503")
+    if claims:
+        failures.append(f"{claims} generation claims were left behind")
+    if not check_interrupted_leader():
+        failures.append("an interrupted leader left its key in flight")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
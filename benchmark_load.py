@@ -0,0 +1,467 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+# Drives a mix of API calls at a fixed concurrency against a real HTTP server,
+# a throwaway database seeded to a chosen size and the offline puzzle provider
+# (all read when app is imported), and writes per-endpoint throughput and latency
+# percentiles to a JSON file. The seed makes the dataset and the sequence of
+# operations repeatable, so result files from different commits can be compared.
+_workdir = tempfile.mkdtemp(prefix="enigma-load-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/load.db")
+os.environ.setdefault("PUZZLE_PROVIDER", "fake")
+os.environ.setdefault("PUZZLE_PREFETCH", "false")
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+os.environ.setdefault("OPENAI_WARMUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+import app as enigma
+from app import create_app, db, llm_limiter, Player, PlayerProgress, Puzzle
+
+PASSWORD = "benchmark-password"
+ANSWER_OPTIONS = "ABCD"  # The fake provider's puzzles are multiple choice
+STANDARD_DOMAINS = ["frontend", "backend", "database"]
+PROGRESS_STATUSES = {"solved": 0.6, "attempted": 0.25, "skipped": 0.15}
+# Operation -> endpoint it is reported under
+ENDPOINTS = {
+    "players": "POST /players",
+    "login": "POST /login",
+    "statistics": "GET /api/statistics/<username>",
+    "generate": "POST /generate_puzzle",
+    "validate": "POST /validate_answer",
+    "skip": "POST /api/skip_puzzle",
+}
+DEFAULT_MIX = "validate=35,generate=15,statistics=15,login=15,players=10,skip=10"
+PERCENTILES = {"p50_ms": 0.50, "p95_ms": 0.95, "p99_ms": 0.99}
+
+
+def parse_mix(spec):
+    """Parses "validate=35,login=15" into {operation: weight}."""
+    mix = {}
+    for part in spec.split(","):
+        operation, _, weight = part.partition("=")
+        operation = operation.strip()
+        if operation not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {operation!r} (choose from {', '.join(ENDPOINTS)})"
+            )
+        try:
+            mix[operation] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad weight in {part!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs a positive weight")
+    return mix
+
+
+def seed(app, players, puzzles, progress_rows, rng):
+    """
+    Bulk-inserts players (all sharing PASSWORD), puzzles and progress rows.
+    Returns the players' (player_id, username) pairs and the (player_id,
+    puzzle_id) pairs still open for answering or skipping.
+    """
+    password_hash = generate_password_hash(PASSWORD)  # Hashing is slow; do it once
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            insert(Player),
+            [
+                {
+                    "username": f"load-{i}",
+                    "email": f"load-{i}@bench.local",
+                    "password_hash": password_hash,
+                }
+                for i in range(players)
+            ],
+        )
+        puzzle_rows = []
+        for i in range(puzzles):
+            ai_generated = rng.random() < 0.7
+            correct_option = rng.choice(ANSWER_OPTIONS)
+            puzzle_rows.append(
+                {
+                    "domain": (
+                        rng.choice(enigma.VALID_DOMAINS)
+                        if ai_generated
+                        else rng.choice(STANDARD_DOMAINS)
+                    ),
+                    "difficulty": rng.choice(enigma.VALID_DIFFICULTIES),
+                    "puzzle_description": f"Seeded puzzle #{i}: which option is correct?",
+                    "validation_criteria": json.dumps(
+                        {"type": "multiple_choice", "correct_option": correct_option}
+                    ),
+                    "is_ai_generated": ai_generated,
+                }
+            )
+        db.session.execute(insert(Puzzle), puzzle_rows)
+        accounts = db.session.query(Player.player_id, Player.username).all()
+        puzzle_ids = [row.puzzle_id for row in db.session.query(Puzzle.puzzle_id)]
+
+        pairs = set()
+        progress_rows = min(progress_rows, len(accounts) * len(puzzle_ids))
+        while len(pairs) < progress_rows:
+            pairs.add((rng.choice(accounts).player_id, rng.choice(puzzle_ids)))
+        statuses = rng.choices(
+            list(PROGRESS_STATUSES), list(PROGRESS_STATUSES.values()), k=len(pairs)
+        )
+        rows = [
+            {
+                "player_id": player_id,
+                "puzzle_id": puzzle_id,
+                "status": status,
+                "attempts": rng.randint(1, 5),
+                "solved_at": datetime.utcnow() if status == "solved" else None,
+            }
+            for (player_id, puzzle_id), status in zip(sorted(pairs), statuses)
+        ]
+        if rows:
+            db.session.execute(insert(PlayerProgress), rows)
+        db.session.commit()
+        open_pairs = [
+            (row["player_id"], row["puzzle_id"])
+            for row in rows
+            if row["status"] == "attempted"
+        ]
+        return [tuple(account) for account in accounts], open_pairs
+
+
+class Workload:
+    """
+    The operations of the mix, sharing what the virtual users know: the seeded
+    players and the puzzles players have been handed but not yet solved or skipped.
+    """
+
+    def __init__(self, port, accounts, open_pairs):
+        self.port = port
+        self.accounts = accounts
+        self._open = list(open_pairs)
+        self._open_set = set(open_pairs)
+        self._lock = threading.Lock()
+        self._new_players = 0
+
+    def request(self, method, path, payload=None):
+        """Returns (status, response body) of one request on a new connection."""
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+        try:
+            if payload is None:
+                connection.request(method, path)
+            else:
+                connection.request(
+                    method,
+                    path,
+                    json.dumps(payload),
+                    {"Content-Type": "application/json"},
+                )
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def _take_open(self, rng):
+        with self._lock:
+            if not self._open:
+                return None
+            index = rng.randrange(len(self._open))
+            self._open[index], self._open[-1] = self._open[-1], self._open[index]
+            pair = self._open.pop()
+            self._open_set.discard(pair)
+            return pair
+
+    def _put_open(self, pair):
+        with self._lock:
+            if pair not in self._open_set:
+                self._open.append(pair)
+                self._open_set.add(pair)
+
+    def players(self, rng):
+        # Half are returning players, half sign up (and pay for password hashing)
+        if rng.random() < 0.5:
+            username = rng.choice(self.accounts)[1]
+        else:
+            with self._lock:
+                self._new_players += 1
+                username = f"newcomer-{self._new_players}"
+        return "players", self.request("POST", "/players", {"username": username})
+
+    def login(self, rng):
+        password = PASSWORD if rng.random() < 0.9 else "wrong-password"
+        username = rng.choice(self.accounts)[1]
+        return "login", self.request(
+            "POST", "/login", {"username": username, "password": password}
+        )
+
+    def statistics(self, rng):
+        username = rng.choice(self.accounts)[1]
+        return "statistics", self.request("GET", f"/api/statistics/{quote(username)}")
+
+    def generate(self, rng):
+        player_id = rng.choice(self.accounts)[0]
+        status, body = self.request(
+            "POST",
+            "/generate_puzzle",
+            {
+                "player_id": player_id,
+                "domain": rng.choice(enigma.VALID_DOMAINS),
+                "difficulty": rng.choice(enigma.VALID_DIFFICULTIES),
+            },
+        )
+        if status < 300:
+            self._put_open((player_id, json.loads(body)["puzzle_id"]))
+        return "generate", (status, body)
+
+    def validate(self, rng):
+        pair = self._take_open(rng)
+        if pair is None:  # Nothing left to answer; players go get a puzzle
+            return self.generate(rng)
+        player_id, puzzle_id = pair
+        status, body = self.request(
+            "POST",
+            "/validate_answer",
+            {
+                "player_id": player_id,
+                "puzzle_id": puzzle_id,
+                "user_answer": rng.choice(ANSWER_OPTIONS),
+            },
+        )
+        if status != 200 or not json.loads(body).get("correct"):
+            self._put_open(pair)
+        return "validate", (status, body)
+
+    def skip(self, rng):
+        pair = self._take_open(rng)
+        if pair is None:
+            return self.generate(rng)
+        player_id, puzzle_id = pair
+        return "skip", self.request(
+            "POST",
+            "/api/skip_puzzle",
+            {
+                "player_id": player_id,
+                "puzzle_id": puzzle_id,
+                "save_progress": rng.random() < 0.5,
+            },
+        )
+
+
+def run_load(workload, mix, concurrency, seconds, warmup, seed_value):
+    """
+    Runs `concurrency` virtual users, each picking operations from the mix back to
+    back. Returns the (operation, status, seconds) samples taken after the warm-up
+    and how long they were collected for.
+    """
+    operations, weights = list(mix), list(mix.values())
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + seconds
+    samples = [[] for _ in range(concurrency)]
+
+    def user(index):
+        rng = random.Random(f"{seed_value}-{index}")
+        while True:
+            started = time.monotonic()
+            if started >= stop_at:
+                return
+            operation = rng.choices(operations, weights)[0]
+            try:
+                operation, (status, _) = getattr(workload, operation)(rng)
+            except OSError:
+                status = None  # No response at all
+            if started >= measure_from:
+                samples[index].append((operation, status, time.monotonic() - started))
+
+    threads = [
+        threading.Thread(target=user, args=(i,), daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [sample for user_samples in samples for sample in user_samples], seconds
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples, seconds):
+    """Requests, errors (no response or 5xx), statuses and latency of a sample set."""
+    latencies = [elapsed for _, _, elapsed in samples]
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary = {
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _ in samples if status is None or status >= 500),
+        "throughput_rps": round(len(samples) / seconds, 2),
+        "statuses": dict(sorted(statuses.items())),
+    }
+    for name, fraction in PERCENTILES.items():
+        summary[name] = (
+            round(percentile(latencies, fraction) * 1000, 2) if latencies else None
+        )
+    summary["max_ms"] = round(max(latencies) * 1000, 2) if latencies else None
+    return summary
+
+
+def git_revision():
+    """(commit, whether the working tree has changes), or (None, None) outside git."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=directory,
+            check=True,
+        ).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            cwd=directory,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(changes)
+
+
+def print_report(results, baseline=None):
+    endpoints = results["endpoints"]
+    before = (baseline or {}).get("endpoints", {})
+    print(
+        f"{'endpoint':<32}{'requests':>9}{'errors':>7}{'rps':>8}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        + (f"{'p99 vs base':>13}" if baseline else "")
+    )
+    for endpoint, summary in [*endpoints.items(), ("total", results["total"])]:
+        line = (
+            f"{endpoint:<32}{summary['requests']:>9}{summary['errors']:>7}"
+            f"{summary['throughput_rps']:>8.1f}"
+        )
+        for name in PERCENTILES:
+            value = summary[name]
+            line += f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+        if baseline:
+            old = (
+                baseline.get("total", {})
+                if endpoint == "total"
+                else before.get(endpoint, {})
+            ).get("p99_ms")
+            line += (
+                f"{(summary['p99_ms'] - old) / old * 100:>+12.1f}%"
+                if old and summary["p99_ms"] is not None
+                else f"{'-':>13}"
+            )
+        print(line)
+
+
+def main():
+    """
+    Load test of the backend API, e.g.:
+        python benchmark_load.py --players 2000 --concurrency 16 --seconds 60 \\
+            --output load-new.json --compare load-old.json
+    Writes throughput and p50/p95/p99 latency per endpoint (and overall) as JSON,
+    with the commit, settings and dataset size, so runs on different commits can
+    be compared. Keep the seed, sizes and mix the same between runs you compare.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the API under load.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--puzzles", type=int, default=300)
+    parser.add_argument("--progress", type=int, default=10000, help="progress rows")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3, help="seconds not measured")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load-benchmark.json")
+    parser.add_argument("--compare", help="earlier results file to compare p99 with")
+    args = parser.parse_args()
+
+    app = create_app()
+    # The fake provider still spends the token budget; running out would throttle
+    # /generate_puzzle to the budget rather than measure it
+    llm_limiter.tokens_per_minute = llm_limiter._tokens = 1e12
+    enigma.get_puzzle_provider().latency = args.llm_latency
+    rng = random.Random(args.seed)
+    seeded_at = time.perf_counter()
+    accounts, open_pairs = seed(app, args.players, args.puzzles, args.progress, rng)
+    print(
+        f"Seeded {len(accounts)} players, {args.puzzles} puzzles and "
+        f"{args.progress} progress rows in {time.perf_counter() - seeded_at:.1f}s"
+    )
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workload = Workload(server.server_port, accounts, open_pairs)
+    print(
+        f"{args.concurrency} clients for {args.seconds:g}s "
+        f"(after {args.warmup:g}s warm-up), LLM latency {args.llm_latency:g}s"
+    )
+    samples, seconds = run_load(
+        workload, args.mix, args.concurrency, args.seconds, args.warmup, args.seed
+    )
+    server.shutdown()
+
+    commit, dirty = git_revision()
+    results = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": {
+                "players": args.players,
+                "puzzles": args.puzzles,
+                "progress": args.progress,
+                "concurrency": args.concurrency,
+                "seconds": args.seconds,
+                "warmup": args.warmup,
+                "mix": args.mix,
+                "llm_latency": args.llm_latency,
+                "seed": args.seed,
+                "bulkheads": enigma.BULKHEADS_ENABLED,
+            },
+        },
+        "total": summarize(samples, seconds),
+        "endpoints": {
+            ENDPOINTS[operation]: summarize(
+                [sample for sample in samples if sample[0] == operation], seconds
+            )
+            for operation in ENDPOINTS
+            if any(sample[0] == operation for sample in samples)
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline['meta'].get('commit') or args.compare}")
+    print_report(results, baseline)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# The benchmark runs against a throwaway database and the offline puzzle provider;
+# both are read when app is imported
+_workdir = tempfile.mkdtemp(prefix="enigma-logbench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/bench.db")
+os.environ.setdefault("PUZZLE_PROVIDER", "fake")
+os.environ.setdefault("PUZZLE_PROVIDER_LATENCY", "0")
+os.environ.setdefault("PUZZLE_PREFETCH", "false")
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+
+import log_pipeline
+from app import create_app, db, llm_limiter, Player
+
+LEGACY_FORMAT = "%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
+SUBSYSTEM_LOGGERS = ["enigma.llm", "enigma.puzzles", "enigma.validation"]
+REQUESTS_PER_SESSION = 4
+
+app = create_app()
+
+# The fake provider still spends the token budget; waiting for it to refill would
+# swamp what is being measured
+llm_limiter.tokens_per_minute = llm_limiter._tokens = 1e12
+
+
+def configure(mode, log_path):
+    """Sets up logging for one benchmark mode, writing to log_path."""
+    log_pipeline.stop_logging()
+    logging.disable(logging.NOTSET)
+    for name in SUBSYSTEM_LOGGERS:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    stream = open(log_path, "a", encoding="utf-8")
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "legacy":
+        # What app.py did before: synchronous, formatted on the request thread, DEBUG
+        logging.basicConfig(
+            level=logging.DEBUG, format=LEGACY_FORMAT, stream=stream, force=True
+        )
+    elif mode == "pipeline":
+        log_pipeline.configure_logging(level="INFO", stream=stream)
+    elif mode == "pipeline-debug":
+        log_pipeline.configure_logging(
+            level="DEBUG", debug_sample_rate=0.1, stream=stream
+        )
+    return stream
+
+
+def create_players(count, prefix):
+    """Inserts players directly; signing up through the API would time password hashing."""
+    with app.app_context():
+        players = [
+            Player(username=f"{prefix}-{i}", email=f"{prefix}-{i}@bench.local")
+            for i in range(count)
+        ]
+        for player in players:
+            player.password_hash = "benchmark"
+        db.session.add_all(players)
+        db.session.commit()
+        return [player.player_id for player in players]
+
+
+def run_sessions(client, player_ids):
+    """
+    One session per player: get an AI puzzle and miss it three times (the third
+    miss generates a hint, the chattiest path).
+    """
+    for player_id in player_ids:
+        puzzle = client.post(
+            "/generate_puzzle",
+            json={"player_id": player_id, "domain": "Backend", "difficulty": "Easy"},
+        ).get_json()
+        for _ in range(3):
+            client.post(
+                "/validate_answer",
+                json={
+                    "player_id": player_id,
+                    "puzzle_id": puzzle["puzzle_id"],
+                    "user_answer": "Z",
+                },
+            )
+
+
+def main():
+    """
+    Measures what logging adds to a request, e.g.:
+        python benchmark_logging.py --sessions 200
+    Modes take turns session by session (so drift in machine load hits them all
+    alike); the overhead is a mode's median session time minus the median with
+    logging off, per request.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark per-request logging.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument(
+        "--modes", nargs="+", default=["off", "legacy", "pipeline", "pipeline-debug"]
+    )
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    logging.disable(logging.CRITICAL)  # Until the first configure()
+    run_sessions(client, create_players(5, "warmup"))
+    player_ids = {mode: create_players(args.sessions, mode) for mode in args.modes}
+    timings = {mode: [] for mode in args.modes}
+    log_paths = {mode: os.path.join(_workdir, f"{mode}.log") for mode in args.modes}
+    for i in range(args.sessions):
+        for mode in random.sample(args.modes, len(args.modes)):
+            stream = configure(mode, log_paths[mode])
+            started = time.perf_counter()
+            run_sessions(client, [player_ids[mode][i]])
+            timings[mode].append(time.perf_counter() - started)
+            log_pipeline.stop_logging()  # Drain the queue into the file
+            logging.disable(logging.CRITICAL)  # Until the next configure()
+            stream.close()
+    logging.disable(logging.NOTSET)
+
+    baseline = statistics.median(timings["off"]) if "off" in timings else None
+    print(f"{args.sessions} sessions of {REQUESTS_PER_SESSION} requests per mode")
+    print(f"{'mode':<16}{'ms/request':>12}{'overhead us':>14}{'log lines':>11}")
+    for mode in args.modes:
+        median = statistics.median(timings[mode])
+        overhead = (
+            f"{(median - baseline) / REQUESTS_PER_SESSION * 1e6:.0f}"
+            if baseline is not None and mode != "off"
+            else "-"
+        )
+        with open(log_paths[mode], encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        print(
+            f"{mode:<16}{median / REQUESTS_PER_SESSION * 1000:>12.3f}"
+            f"{overhead:>14}{lines:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
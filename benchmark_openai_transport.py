@@ -0,0 +1,164 @@
+import argparse
+import http.server
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Per-call transport overhead of the OpenAI client, against a local HTTPS stub of
+# the chat completions endpoint. Each mode sends the same sequential completions
+# through create_chat_completion(); the stub answers instantly, so what is left is
+# the client, TLS and connection handling. With "no reuse" the stub closes every
+# connection after its response, as if nothing were kept alive. Loopback has no
+# network RTT, so against the real API the gap is larger.
+COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": '{"ok": true}'},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 20, "completion_tokens": 5, "total_tokens": 25},
+}
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive unless the response says otherwise
+    # Headers and body go out in separate writes; with Nagle on, delayed ACKs would
+    # stall every kept-alive response by ~40 ms
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if not self.server.keep_alive:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(workdir):
+    """Starts the HTTPS stub on a free loopback port with a throwaway certificate."""
+    cert, key = os.path.join(workdir, "cert.pem"), os.path.join(workdir, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.keep_alive = True
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cert
+
+
+def run(enigma, server, calls):
+    """Sends calls sequential completions; returns (ms per call, connections opened)."""
+    messages = [{"role": "user", "content": "Say ok as JSON."}]
+    connections = server.connections
+    started = time.perf_counter()
+    for _ in range(calls):
+        enigma.create_chat_completion(
+            "puzzle", "Backend", messages, 0.7, 100, time.monotonic() + 30
+        )
+    elapsed = time.perf_counter() - started
+    return elapsed / calls * 1000, server.connections - connections
+
+
+def main():
+    """
+    Transport benchmark for the OpenAI client, e.g.:
+        python benchmark_openai_transport.py --calls 200
+    Needs the openssl command line tool for the stub's certificate. Exits with
+    status 1 if the pooled client does not reuse its connection.
+    """
+    parser = argparse.ArgumentParser(description="Time OpenAI calls to a local stub.")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    if shutil.which("openssl") is None:
+        print("FAIL: the openssl command line tool is needed for the stub")
+        sys.exit(1)
+
+    # The stub must be up before app is imported: its URL and certificate are
+    # read from the environment when the client is built
+    workdir = tempfile.mkdtemp(prefix="enigma-transport-")
+    server, cert = start_stub(workdir)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"https://127.0.0.1:{server.server_port}/v1"
+    os.environ["SSL_CERT_FILE"] = cert
+    os.environ["PUZZLE_PROVIDER"] = "openai"
+    os.environ["OPENAI_WARMUP"] = "false"
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/transport.db")
+    os.environ.setdefault("PUZZLE_PREFETCH", "false")
+    os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    import app as enigma
+
+    # Tokens are not what is being measured
+    enigma.llm_limiter.tokens_per_minute = enigma.llm_limiter._tokens = 1e12
+    app = enigma.create_app()
+    with app.app_context():
+        # First call builds the client; keep it out of both timings
+        run(enigma, server, 1)
+        results = {}
+        for label, keep_alive in [("pooled keep-alive", True), ("no reuse", False)]:
+            server.keep_alive = keep_alive
+            ms_per_call, connections = run(enigma, server, args.calls)
+            results[label] = connections
+            print(
+                f"{label:>17}: {ms_per_call:.2f} ms per call, "
+                f"{connections} new connection(s)"
+            )
+    server.shutdown()
+    if results["pooled keep-alive"] > 1:
+        print("FAIL: the pooled client opened a connection per call")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
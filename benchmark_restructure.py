@@ -0,0 +1,301 @@
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+# Differential test and timing for restructure_code_puzzle_description_if_needed.
+# The implementation it replaced is kept below as the reference: a seeded corpus of
+# generated descriptions is run through both and every output is compared.
+os.environ.setdefault("PUZZLE_PROVIDER", "fake")
+os.environ.setdefault("PUZZLE_PREFETCH", "false")
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+os.environ.setdefault("OPENAI_WARMUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app import restructure_code_puzzle_description_if_needed
+
+PROSE = [
+    "Write a function that returns the **longest** run of equal values.",
+    "The input is a list of integers; it may be empty.",
+    "Handle negative numbers and duplicates.",
+    "Your solution should run in linear time.",
+    "See the notes below before you start.",
+]
+HEADINGS = [
+    "### Example Usage:",
+    "## Examples:",
+    "### Test Cases:",
+    "Example Usage:",
+    "### Example:",
+    "### Notes:",
+]
+LANGUAGES = ["python", "javascript", "js", "c", "java", "objective-c", "", "c++"]
+PLACEHOLDERS = [
+    "# Your code here",
+    "// Your code here",
+    "/* Your code here */",
+    "# Implement the parser here",
+]
+CODE = [
+    "def longest_run(values):",
+    "print(longest_run([1, 1, 2]))  # 2",
+    "assert longest_run([]) == 0",
+    "function longestRun(values) {",
+    "}",
+    "return 0",
+]
+
+
+# The implementation before the single-pass rewrite, unchanged apart from its name
+def legacy_restructure(description: str) -> str:
+    placeholder_patterns = [
+        r"# Your code here",
+        r"// Your code here",
+        r"/\* Your code here \*/",
+        r"# Implement .* here",
+    ]
+    code_block_regex = r"```(?:[a-zA-Z0-9_.-]*\n)?([\s\S]*?)\n```"
+    all_code_in_description = "".join(re.findall(code_block_regex, description))
+    has_placeholder = any(
+        re.search(pattern, all_code_in_description, re.IGNORECASE)
+        for pattern in placeholder_patterns
+    )
+    elements_for_keyword_check = re.split(r"(```[\s\S]*?```)", description)
+    text_segments_for_keyword_check = [
+        el for el in elements_for_keyword_check if not el.startswith("```")
+    ]
+    has_example_usage_keyword = any(
+        re.search(
+            r"\n###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
+            segment,
+            re.IGNORECASE | re.MULTILINE,
+        )
+        for segment in text_segments_for_keyword_check
+    ) or any(
+        re.search(r"Example Usage:", segment, re.IGNORECASE | re.MULTILINE)
+        for segment in text_segments_for_keyword_check
+    )
+    if not has_placeholder:
+        logging.debug("No placeholder found, not restructuring.")
+        return description
+    if not has_example_usage_keyword:
+        logging.debug(
+            "No 'Example Usage' keyword found, not restructuring complex cases."
+        )
+        return description  # Keep original if no clear example heading
+    logging.info(
+        "Potential candidate for restructuring based on placeholder and 'Example Usage' keyword."
+    )
+    split_pattern = r"(```([a-zA-Z0-9_.-]*)\n[\s\S]*?\n```)"
+    elements = re.split(split_pattern, description)
+    main_task_description_parts, main_code_skeleton_block, example_parts = [], None, []
+    found_main_skeleton, found_example_heading = False, False
+    idx = 0
+    while idx < len(elements):
+        element = elements[idx]
+        if not element:
+            idx += 1
+            continue
+        is_code_block_match = (
+            element.startswith("```")
+            and element.endswith("```")
+            and (idx + 1 < len(elements))
+        )
+        if not found_main_skeleton:
+            if is_code_block_match and any(
+                re.search(pattern, element, re.IGNORECASE)
+                for pattern in placeholder_patterns
+            ):
+                main_code_skeleton_block, found_main_skeleton = element, True
+                idx += 2
+            else:
+                main_task_description_parts.append(element)
+        else:
+            if not is_code_block_match and re.search(
+                r"###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
+                element,
+                re.IGNORECASE | re.MULTILINE,
+            ):
+                found_example_heading = True
+                standardized_heading = "\n### Example Usage:\n"
+                cleaned_element_text = re.sub(
+                    r"###?\s*(Example Usage|Examples?|Test Cases?)\s*:",
+                    "",
+                    element.strip(),
+                    flags=re.IGNORECASE,
+                ).strip()
+                example_parts.append(standardized_heading)
+                if cleaned_element_text:
+                    example_parts.append(cleaned_element_text + "\n")
+            elif found_example_heading:
+                example_parts.append(element)
+                idx += 2 if is_code_block_match else 0
+            elif is_code_block_match:
+                if not found_example_heading:
+                    example_parts.append("\n### Example Usage:\n")
+                    found_example_heading = True
+                example_parts.append(element)
+                idx += 2
+            else:
+                # Heuristic: if it's text followed by a code block, assume it's part of examples
+                if (
+                    idx + 1 < len(elements) and elements[idx + 1].startswith("```")
+                ) or (
+                    idx + 3 < len(elements) and elements[idx + 3].startswith("```")
+                ):  # Check further ahead for code blocks
+                    if not found_example_heading:
+                        example_parts.append("\n### Example Usage:\n")
+                        found_example_heading = True
+                    example_parts.append(element)
+                else:  # Otherwise, probably still part of the main description
+                    main_task_description_parts.append(element)
+        idx += 1
+    if not main_code_skeleton_block:
+        logging.debug("Main32 skeleton not identified, returning original.")
+        return description
+    final_desc = (
+        "".join(main_task_description_parts).strip()
+        + "\n\n"
+        + main_code_skeleton_block.strip()
+    )
+    if example_parts:
+        final_desc += "\n" + "".join(example_parts).strip()
+    if len(final_desc) > len(description) * 0.8 or found_example_heading:
+        logging.info("Puzzle description restructured.")
+        return final_desc.strip()
+    logging.info("Restructuring not significant or failed, returning original.")
+    return description
+
+
+def code_block(rng, languages=LANGUAGES):
+    lines = rng.choices(CODE, k=rng.randint(1, 4))
+    if rng.random() < 0.4:
+        lines.insert(rng.randint(0, len(lines)), rng.choice(PLACEHOLDERS))
+    return f"```{rng.choice(languages)}\n" + "\n".join(lines) + "\n```"
+
+
+def make_description(rng, glued=False):
+    """
+    A random code-puzzle-like description. With glued, some fences are joined
+    straight onto the next piece instead of being followed by a line break.
+    """
+    parts = []
+    for _ in range(rng.randint(1, 8)):
+        roll = rng.random()
+        if roll < 0.35:
+            parts.append(" ".join(rng.choices(PROSE, k=rng.randint(1, 3))))
+        elif roll < 0.55:
+            parts.append(rng.choice(HEADINGS))
+        elif roll < 0.95:
+            parts.append(code_block(rng))
+        else:
+            # A stray fence with no partner
+            parts.append(rng.choice(["```", "```c++", "``` "]))
+    description = parts[0]
+    for part in parts[1:]:
+        if glued and description.endswith("```") and rng.random() < 0.5:
+            description += part
+        else:
+            description += rng.choice(["\n", "\n\n"]) + part
+    return description
+
+
+def differential(seed, count, glued):
+    """Runs count generated descriptions through both; returns the mismatches."""
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(count):
+        description = make_description(rng, glued)
+        expected = legacy_restructure(description)
+        if restructure_code_puzzle_description_if_needed(description) != expected:
+            mismatches.append(description)
+    return mismatches
+
+
+def sized_description(rng, size, stray_fences):
+    """
+    A restructurable description of about size characters. Stray fences (a ```c++
+    tag is not a language the fence pattern accepts) send the current version down
+    its slower path, which reruns the separate checks.
+    """
+    languages = (
+        LANGUAGES if stray_fences else [lang for lang in LANGUAGES if lang != "c++"]
+    )
+    parts = [" ".join(PROSE), "```python\ndef solve(data):\n    # Your code here\n```"]
+    parts.append("### Example Usage:")
+    length = sum(len(part) + 2 for part in parts)
+    while length < size:
+        part = rng.choice(
+            [code_block(rng, languages), " ".join(rng.choices(PROSE, k=2))]
+        )
+        parts.append(part)
+        length += len(part) + 2
+    return "\n\n".join(parts)
+
+
+def ns_per_char(function, description, budget):
+    """Repeats function(description) for about budget seconds; ns per input char."""
+    runs, started = 0, time.perf_counter()
+    while True:
+        function(description)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget:
+            return elapsed / runs / len(description) * 1e9
+
+
+def main():
+    """
+    Differential test plus timing, e.g.:
+        python benchmark_restructure.py --seed 7 --count 20000 --sizes 1000,10000,100000
+    Exits with status 1 if any description from the standard corpus restructures
+    differently from the reference. The glued-fence corpus is reported but not
+    failed on (see the comment above restructure_code_puzzle_description_if_needed).
+    """
+    parser = argparse.ArgumentParser(description="Check and time restructuring.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument(
+        "--seconds", type=float, default=0.5, help="Per size and version"
+    )
+    args = parser.parse_args()
+    # Both versions log every call
+    logging.disable(logging.CRITICAL)
+
+    failures = []
+    for label, glued in [("standard", False), ("glued fences", True)]:
+        mismatches = differential(args.seed, args.count, glued)
+        print(f"{label:>13}: {len(mismatches)} of {args.count} differ")
+        if mismatches and not glued:
+            failures.append(f"{len(mismatches)} standard descriptions differ")
+            print(repr(mismatches[0]))
+
+    rng = random.Random(args.seed)
+    print(f"{'chars':>8} {'stray fences':>12} {'reference ns/char':>18} {'current':>8}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        for stray_fences in (False, True):
+            description = sized_description(rng, size, stray_fences)
+            reference = ns_per_char(legacy_restructure, description, args.seconds)
+            current = ns_per_char(
+                restructure_code_puzzle_description_if_needed,
+                description,
+                args.seconds,
+            )
+            print(
+                f"{len(description):>8} {'yes' if stray_fences else 'no':>12}"
+                f" {reference:>18.1f} {current:>8.1f}"
+            )
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
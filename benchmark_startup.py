@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Each run is a fresh interpreter, as a new server worker or CLI script would be
+# (the OS file cache is warm after the first). The child reports how long each
+# startup step took and whether the OpenAI SDK got imported along the way.
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app as enigma
+imported = time.perf_counter()
+flask_app = enigma.create_app()
+created = time.perf_counter()
+flask_app.test_client().get("/status")
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - created) * 1000,
+    "openai_imported": "openai" in sys.modules,
+}))
+"""
+STEPS = ("import_ms", "create_app_ms", "first_request_ms")
+IMPORT_BUDGET_MS = 1000  # import app + create_app()
+
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """
+    Measures cold start, e.g. in CI:
+        python benchmark_startup.py --runs 10 --budget-ms 1000
+    Exits with status 1 when the median of import + create_app() is over budget,
+    or when creating the app and serving a request imports the OpenAI SDK.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark app startup time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp(prefix='enigma-startup-')}/startup.db",
+        "LOG_LEVEL": "WARNING",
+        "COMPACTION_INTERVAL_HOURS": "0",
+    }
+    run_once(env)  # Warms the OS file cache and writes the .pyc files
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts (median / max ms)")
+    for step in STEPS:
+        values = [run[step] for run in runs]
+        print(f"{step:<18}{statistics.median(values):>9.1f}{max(values):>9.1f}")
+    startup_ms = statistics.median(
+        run["import_ms"] + run["create_app_ms"] for run in runs
+    )
+    openai_imported = any(run["openai_imported"] for run in runs)
+    print(
+        f"startup (import + create_app): {startup_ms:.1f} ms, budget {args.budget_ms:.0f} ms"
+    )
+    print(f"OpenAI SDK imported at startup: {openai_imported}")
+
+    if startup_ms > args.budget_ms or openai_imported:
+        print(
+            "FAIL: startup budget exceeded"
+            if startup_ms > args.budget_ms
+            else "FAIL: OpenAI SDK is no longer imported lazily"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+# Minifiers and brotli are in requirements.txt; if one is missing the build still
+# runs, skipping that step, and build_assets() warns about it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_EXTENSIONS = (".js", ".css")
+HASH_LENGTH = 10
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def get_skipped_steps():
+    """(pip package, build step) for each asset package that is not installed."""
+    packages = [
+        ("Brotli", brotli, "brotli variants"),
+        ("rjsmin", rjsmin, "JS minification"),
+        ("rcssmin", rcssmin, "CSS minification"),
+    ]
+    return [(name, step) for name, module, step in packages if module is None]
+
+
+def minify(content, extension):
+    """Minifies JS/CSS source when the matching minifier is installed."""
+    if extension == ".js" and rjsmin is not None:
+        return rjsmin.jsmin(content)
+    if extension == ".css" and rcssmin is not None:
+        return rcssmin.cssmin(content)
+    return content
+
+
+def load_manifest(static_folder=STATIC_FOLDER):
+    """
+    Returns the {source path: hashed path} manifest written by build_assets,
+    or an empty dict if the assets have not been built yet.
+    """
+    manifest_path = os.path.join(static_folder, DIST_DIRNAME, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def build_assets(static_folder=STATIC_FOLDER):
+    """
+    Writes a content-hashed, minified copy of every .js/.css file under
+    static_folder into static_folder/dist, next to .gz (and, with brotli
+    installed, .br) variants, then writes the manifest.
+    Assets whose hashed output already exists are not recompressed, and
+    outputs no longer referenced by the manifest are removed.
+    """
+    skipped = get_skipped_steps()
+    if skipped:
+        logging.warning(
+            f"Skipping {', '.join(step for _, step in skipped)}: "
+            f"{', '.join(name for name, _ in skipped)} not installed "
+            f"(pip install -r requirements.txt)"
+        )
+    dist_folder = os.path.join(static_folder, DIST_DIRNAME)
+    manifest, totals = {}, {"source": 0, "minified": 0, "gzip": 0, "brotli": 0}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_folder)
+        for name in sorted(files):
+            extension = os.path.splitext(name)[1]
+            if extension not in ASSET_EXTENSIONS:
+                continue
+            source_path = os.path.join(root, name)
+            source_rel = os.path.relpath(source_path, static_folder).replace(
+                os.sep, "/"
+            )
+            with open(source_path, "rb") as f:
+                source = f.read()
+            minified = minify(source.decode("utf-8"), extension).encode("utf-8")
+            digest = hashlib.sha256(minified).hexdigest()[:HASH_LENGTH]
+            hashed_rel = f"{os.path.splitext(source_rel)[0]}.{digest}{extension}"
+            manifest[source_rel] = hashed_rel
+
+            output_path = os.path.join(dist_folder, hashed_rel)
+            gzipped = gzip.compress(minified, compresslevel=9, mtime=0)
+            totals["source"] += len(source)
+            totals["minified"] += len(minified)
+            totals["gzip"] += len(gzipped)
+            if os.path.exists(output_path):
+                if os.path.exists(output_path + ".br"):
+                    totals["brotli"] += os.path.getsize(output_path + ".br")
+                continue
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            # Compressed variants first: the plain file marks the asset as built
+            with open(output_path + ".gz", "wb") as f:
+                f.write(gzipped)
+            if brotli is not None:
+                compressed = brotli.compress(minified, mode=brotli.MODE_TEXT)
+                totals["brotli"] += len(compressed)
+                with open(output_path + ".br", "wb") as f:
+                    f.write(compressed)
+            with open(output_path, "wb") as f:
+                f.write(minified)
+            logging.debug(f"Built asset {source_rel} -> {hashed_rel}")
+
+    os.makedirs(dist_folder, exist_ok=True)
+    with open(os.path.join(dist_folder, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    remove_stale_outputs(dist_folder, set(manifest.values()))
+    logging.info(
+        f"Built {len(manifest)} static assets: {totals['source']} bytes source, "
+        f"{totals['minified']} minified, {totals['gzip']} gzip, "
+        f"{totals['brotli'] or 'n/a'} brotli."
+    )
+    return manifest
+
+
+def remove_stale_outputs(dist_folder, current_outputs):
+    """Deletes hashed assets (and their compressed variants) from older builds."""
+    for root, _, files in os.walk(dist_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, dist_folder).replace(os.sep, "/")
+            if rel == MANIFEST_NAME:
+                continue
+            for suffix in COMPRESSED_SUFFIXES:
+                if rel.endswith(suffix):
+                    rel = rel[: -len(suffix)]
+            if rel not in current_outputs:
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    print("Building static assets...")
+    build_assets()
+    print("Static asset build finished.")
@@ -0,0 +1,36 @@
+import argparse
+import json
+import logging
+
+from app import create_app, db, COMPACTION_BATCH_SIZE, compact_database
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def main():
+    """
+    Runs the retention/compaction job once, e.g. from cron:
+        python compact_database.py --vacuum
+    The server also runs it every COMPACTION_INTERVAL_HOURS (without --vacuum, which
+    locks the database while the file is rewritten). Prints the report as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description="Archive stale progress and prune orphaned puzzles."
+    )
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE)
+    parser.add_argument(
+        "--vacuum", action="store_true", help="Shrink the database file afterwards"
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        report = compact_database(args.batch_size, args.vacuum)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
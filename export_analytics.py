@@ -0,0 +1,106 @@
+import argparse
+import json
+import logging
+import os
+from datetime import datetime
+
+from app import (
+    create_app,
+    ANALYTICS_DATASETS,
+    ensure_analytics_indexes,
+    format_analytics_rows,
+    get_analytics_watermark,
+    iter_analytics_rows,
+)
+
+DEFAULT_STATE_FILE = "analytics_watermarks.json"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def load_watermarks(path):
+    """Returns {dataset: last exported watermark} from the state file, if any."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {
+                dataset: datetime.fromisoformat(value)
+                for dataset, value in json.load(f).items()
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermarks(path, watermarks):
+    """Writes the state file atomically, so a crash never loses the previous one."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {dataset: value.isoformat() for dataset, value in watermarks.items()},
+            f,
+            indent=2,
+        )
+    os.replace(temp_path, path)
+
+
+def export_dataset(dataset, export_format, output_dir, since=None):
+    """
+    Writes the dataset's rows changed after `since` to output_dir; returns the
+    (path, watermark) to pass as `since` next time, or (None, since) when nothing
+    changed. The file only appears once it is complete.
+    """
+    until = get_analytics_watermark(dataset) or since
+    if until is None or until == since:
+        logging.info(f"No {dataset} rows changed after {since}; nothing to export.")
+        return None, since
+    stamp = until.strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(output_dir, f"{dataset}-{stamp}.{export_format}")
+    columns = ANALYTICS_DATASETS[dataset][3]
+    with open(f"{path}.partial", "w", encoding="utf-8", newline="") as f:
+        for chunk in format_analytics_rows(
+            iter_analytics_rows(dataset, since, until), columns, export_format
+        ):
+            f.write(chunk)
+    os.replace(f"{path}.partial", path)
+    logging.info(f"Exported {dataset} rows after {since} up to {until} to {path}.")
+    return path, until
+
+
+def main():
+    """
+    Nightly analytics export, e.g.:
+        python export_analytics.py --format csv --output-dir exports/
+    Each run only exports rows changed since the previous one (watermarks are kept
+    in --state); pass --full to export everything again.
+    """
+    parser = argparse.ArgumentParser(description="Export player analytics.")
+    parser.add_argument(
+        "datasets",
+        nargs="*",
+        help=f"Datasets to export: {', '.join(sorted(ANALYTICS_DATASETS))} (default: all)",
+    )
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--state", default=DEFAULT_STATE_FILE)
+    parser.add_argument("--full", action="store_true", help="Ignore saved watermarks")
+    args = parser.parse_args()
+    unknown = set(args.datasets) - set(ANALYTICS_DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    watermarks = load_watermarks(args.state)
+    app = create_app()
+    with app.app_context():
+        ensure_analytics_indexes()
+        for dataset in args.datasets or sorted(ANALYTICS_DATASETS):
+            since = None if args.full else watermarks.get(dataset)
+            _, until = export_dataset(dataset, args.format, args.output_dir, since)
+            if until is not None:
+                watermarks[dataset] = until
+                save_watermarks(args.state, watermarks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+
+# Server settings for: gunicorn -c gunicorn.conf.py wsgi:app
+# Requests mostly wait on OpenAI or SQLite, so each worker process serves several
+# threads. Note the LLM limiter (LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE) is per
+# worker: size its limits for workers x limiter, not the whole server. So is the
+# in-memory coalescing of identical /generate_puzzle calls; across workers they are
+# deduplicated by a claim row in the database (PuzzleGenerationClaims).
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() + 1, 4)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# Import the app once in the master and fork the workers from it: workers boot
+# without re-importing anything, and share the imported code's memory
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Workers that capture traffic must share its pseudonym key: preloaded ones inherit
+# the master's, but without preload each worker (and each restarted one) would
+# draw its own and the capture couldn't be replayed
+if (
+    os.getenv("TRAFFIC_CAPTURE_FILE")
+    and not os.getenv("TRAFFIC_CAPTURE_KEY")
+    and not preload_app
+):
+    raise RuntimeError(
+        "TRAFFIC_CAPTURE_FILE without GUNICORN_PRELOAD needs TRAFFIC_CAPTURE_KEY"
+    )
+# Likewise the session cookie holding terminal logins is signed with SECRET_KEY; a
+# key drawn per worker would only be recognized by the worker that issued it
+if not os.getenv("SECRET_KEY") and not preload_app:
+    raise RuntimeError("GUNICORN_PRELOAD=false needs SECRET_KEY")
+# Longer than PUZZLE_REQUEST_DEADLINE, so generation isn't cut off mid-request
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "90"))
+graceful_timeout = 30
+keepalive = 5
+# Only one worker at a time runs the scheduled compaction job
+compaction_lock_file = os.getenv("COMPACTION_LOCK_FILE", "enigma-compaction.lock")
+
+
+def post_fork(server, worker):
+    # Threads (the log writer included) don't survive a fork, and database
+    # connections opened by the master must not be shared with it
+    import app as enigma
+    import wsgi
+
+    enigma.configure_app_logging()
+    with wsgi.app.app_context():
+        enigma.db.engine.dispose(close=False)
+    enigma.start_background_tasks(wsgi.app, compaction_lock_file)
@@ -1,5 +1,5 @@
 import logging
-from app import app, db  # Import app and db from your main app file
+from app import create_app, db  # Import the app factory and db from your main app file
 
 # Configure logging specifically for this script if needed,
 # or rely on the app's logging configuration if run within its context.
@@ -16,6 +16,7 @@ def initialize_database():
     """
     # app.app_context() is crucial for SQLAlchemy to know which app's
     # database configuration and models to use.
+    app = create_app()
     with app.app_context():
         logging.info(
             f"Attempting to create database tables for {app.config['SQLALCHEMY_DATABASE_URI']}..."
@@ -0,0 +1,220 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+# Logging calls only enqueue the record; a writer thread formats and writes the
+# queued records in batches, so a slow terminal or disk never holds up a request.
+# Records carry the ID of the request that logged them (set per request from
+# X-Request-ID, or generated), are written as one JSON object per line (or as
+# text), and DEBUG records can be sampled per request so a sampled request keeps
+# its whole trace.
+TEXT_FORMAT = (
+    "%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - "
+    "[%(request_id)s] - %(message)s"
+)
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+SAMPLE_SCALE = 10000
+FLUSH_INTERVAL = 0.05  # Seconds between batches
+# Attributes every LogRecord has; anything else was passed with extra= and is
+# written as a field of the JSON record
+STANDARD_RECORD_FIELDS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+_writer = None
+
+
+def get_request_id():
+    """Returns the ID of the request being handled, or None outside requests."""
+    return request_id_var.get()
+
+
+def start_request(incoming_id=None):
+    """
+    Sets the request ID for the current context: the caller's X-Request-ID if it
+    looks safe to log, otherwise a new one. Returns the token for end_request.
+    """
+    if not incoming_id or not REQUEST_ID_PATTERN.match(incoming_id):
+        incoming_id = uuid.uuid4().hex[:16]
+    return request_id_var.set(incoming_id)
+
+
+def end_request(token):
+    request_id_var.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request ID, on the thread that logged them."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps sample_rate of DEBUG records. The decision is made per request ID (so a
+    request is traced completely or not at all) and per record outside requests.
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.threshold = int(sample_rate * SAMPLE_SCALE)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.threshold >= SAMPLE_SCALE:
+            return True
+        request_id = getattr(record, "request_id", "-")
+        if request_id == "-":
+            return random.randrange(SAMPLE_SCALE) < self.threshold
+        return zlib.crc32(request_id.encode()) % SAMPLE_SCALE < self.threshold
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records as they are. The stock QueueHandler formats the message on
+    the logging thread (so it can be pickled); records here never leave the
+    process, so the writer thread formats them instead.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with extra= fields as additional keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "thread": record.threadName,
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        for name, value in record.__dict__.items():
+            if name not in STANDARD_RECORD_FIELDS:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class BatchWriter:
+    """
+    Drains the queue every FLUSH_INTERVAL and writes the batch with one write()
+    and flush(). The stock QueueListener blocks on the queue instead, so every
+    record wakes it and it competes with the request thread for the GIL.
+    """
+
+    def __init__(self, records, handler, interval=FLUSH_INTERVAL):
+        self.records = records
+        self.handler = handler
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Writes out the records still queued and stops the thread."""
+        self._stopping.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                record = self.records.get_nowait()
+            except queue.Empty:
+                break
+            if record.levelno < self.handler.level:
+                continue
+            try:
+                lines.append(self.handler.format(record))
+            except Exception:
+                self.handler.handleError(record)
+        if lines:
+            with self.handler.lock:
+                self.handler.stream.write("\n".join(lines) + "\n")
+                self.handler.flush()
+
+
+def parse_levels(spec):
+    """Parses "enigma.llm=DEBUG,werkzeug=WARNING" into {logger name: level}."""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    level="INFO", levels=None, json_format=True, debug_sample_rate=1.0, stream=None
+):
+    """
+    Routes every log record through a queue to a writer thread writing to stream
+    (stderr by default). levels sets per-logger (subsystem) levels. Safe to call
+    again: the previous pipeline is flushed and replaced.
+    """
+    global _writer
+    stop_logging()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    )
+    records = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, subsystem_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(subsystem_level)
+
+    _writer = BatchWriter(records, output)
+    _writer.start()
+    return _writer
+
+
+def stop_logging():
+    """Writes out the records still queued and stops the writer thread."""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,160 @@
+import bisect
+import threading
+
+# Counters and histograms in the Prometheus text exposition format. Updates are
+# lock-free: each thread adds to its own shard of values, and only a scrape (or a
+# thread's first update) takes the registry lock, to sum the shards. Shards of
+# threads that have exited are folded into a running total so thread-per-request
+# servers don't accumulate them.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []  # (thread, {(metric, label values): value or bucket list})
+        self._retired = {}  # Summed shards of exited threads
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def shard(self):
+        """Returns the calling thread's own {series key: value} dict."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _collect(self):
+        """Sums every shard into {series key: value}."""
+        with self._lock:
+            live = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    _merge(self._retired, values)
+            self._shards = live
+            totals = {}
+            _merge(totals, self._retired)
+            for _, values in live:
+                _merge(totals, values)
+            return totals, list(self._metrics)
+
+    def render(self):
+        """Returns every metric in the Prometheus text format."""
+        totals, metrics = self._collect()
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            series = sorted(
+                ((key[1], value) for key, value in totals.items() if key[0] is metric),
+                key=lambda item: item[0],
+            )
+            for label_values, value in series:
+                lines.extend(metric.render(label_values, value))
+        return "\n".join(lines) + "\n"
+
+
+def _merge(totals, values):
+    # list() copies in one step, so a thread updating its shard can't break the loop
+    for key, value in list(values.items()):
+        if isinstance(value, list):
+            current = totals.setdefault(key, [0] * len(value))
+            for i, amount in enumerate(value):
+                current[i] += amount
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def _format_labels(labelnames, label_values, extra=()):
+    pairs = list(zip(labelnames, label_values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *label_values, amount=1):
+        """Adds amount to the series with these label values (in labelnames order)."""
+        shard = self._registry.shard()
+        key = (self, label_values)
+        shard[key] = shard.get(key, 0) + amount
+
+    def render(self, label_values, value):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, label_values)} {_format_value(value)}"
+        ]
+
+
+class Histogram:
+    """Pre-bucketed: an observation is one bisect and two additions."""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        # Per series: a count per bucket, then the +Inf bucket, then the sum
+        shard = self._registry.shard()
+        key = (self, label_values)
+        values = shard.get(key)
+        if values is None:
+            values = shard[key] = [0] * (len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def render(self, label_values, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), values):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames, label_values, [("le", _format_value(bound))]
+            )
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(values[-1])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
@@ -0,0 +1,219 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from app import (
+    create_app,
+    db,
+    Puzzle,
+    bulk_insert_puzzles,
+    ensure_puzzle_search_index,
+)
+
+# A pack is gzipped JSONL: a header line, one line per puzzle, and a footer line
+# with the puzzle count, so a truncated file is detected on import.
+PACK_FORMAT = "enigma-puzzle-pack"
+PACK_FORMAT_VERSION = 1
+EXPORT_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = 5000
+PACK_COMPRESSION_LEVEL = 6  # Level 9 is ~3x slower for a few percent smaller packs
+PUZZLE_FIELDS = (
+    "domain",
+    "difficulty",
+    "puzzle_description",
+    "validation_criteria",
+    "is_ai_generated",
+    "created_at",
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def content_hash(domain, difficulty, puzzle_description, validation_criteria):
+    """Identifies a puzzle by its content, independent of ids and timestamps."""
+    payload = json.dumps(
+        [domain, difficulty, puzzle_description, validation_criteria],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def iter_puzzle_rows(domain=None, difficulty=None):
+    """
+    Yields puzzle rows in id order, EXPORT_BATCH_SIZE at a time (keyset
+    pagination), so memory stays flat however large the bank is.
+    """
+    columns = [Puzzle.puzzle_id] + [getattr(Puzzle, name) for name in PUZZLE_FIELDS]
+    last_id = 0
+    while True:
+        query = db.session.query(*columns).filter(Puzzle.puzzle_id > last_id)
+        if domain:
+            query = query.filter(Puzzle.domain == domain)
+        if difficulty:
+            query = query.filter(Puzzle.difficulty == difficulty)
+        rows = query.order_by(Puzzle.puzzle_id).limit(EXPORT_BATCH_SIZE).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].puzzle_id
+
+
+def export_pack(path, name=None, domain=None, difficulty=None):
+    """Writes the (optionally filtered) puzzle bank to a pack; returns the count."""
+    count = 0
+    with gzip.open(
+        path, "wt", compresslevel=PACK_COMPRESSION_LEVEL, encoding="utf-8"
+    ) as f:
+        header = {
+            "format": PACK_FORMAT,
+            "version": PACK_FORMAT_VERSION,
+            "name": name or os.path.basename(path).split(".")[0],
+            "exported_at": datetime.utcnow().isoformat(),
+            "filters": {"domain": domain, "difficulty": difficulty},
+        }
+        f.write(json.dumps(header) + "\n")
+        for row in iter_puzzle_rows(domain, difficulty):
+            record = {field: getattr(row, field) for field in PUZZLE_FIELDS}
+            record["created_at"] = (
+                row.created_at.isoformat() if row.created_at else None
+            )
+            record["content_hash"] = content_hash(
+                row.domain,
+                row.difficulty,
+                row.puzzle_description,
+                row.validation_criteria,
+            )
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+        f.write(json.dumps({"end": True, "count": count}) + "\n")
+    logging.info(f"Exported {count} puzzles to {path}.")
+    return count
+
+
+def load_existing_hashes():
+    """Content hashes of every stored puzzle, used to skip duplicates on import."""
+    return {
+        content_hash(
+            row.domain, row.difficulty, row.puzzle_description, row.validation_criteria
+        )
+        for row in iter_puzzle_rows()
+    }
+
+
+def read_pack(path):
+    """Yields the puzzle records of a pack after checking its header and footer."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != PACK_FORMAT:
+            raise ValueError(f"{path} is not a puzzle pack")
+        if header.get("version", 0) > PACK_FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is pack version {header['version']}; "
+                f"this version reads up to {PACK_FORMAT_VERSION}"
+            )
+        logging.info(
+            f"Reading pack '{header.get('name')}' (v{header['version']}, exported {header.get('exported_at')})."
+        )
+        count = 0
+        for line in f:
+            record = json.loads(line)
+            if record.get("end"):
+                if record.get("count") != count:
+                    raise ValueError(
+                        f"{path} footer lists {record.get('count')} puzzles, read {count}"
+                    )
+                return
+            count += 1
+            yield record
+    raise ValueError(f"{path} is truncated (no footer after {count} puzzles)")
+
+
+def import_pack(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Bulk-inserts a pack's puzzles in chunks of chunk_size, skipping ones whose
+    content hash is already stored (or repeated within the pack). Each chunk is
+    committed on its own, so re-running an interrupted import is safe.
+    Returns {"imported", "duplicates", "invalid"} counts.
+    """
+    ensure_puzzle_search_index()  # Before reading, so it never waits on our own reads
+    seen = load_existing_hashes()
+    counts = {"imported": 0, "duplicates": 0, "invalid": 0}
+    chunk = []
+
+    def flush():
+        if chunk:
+            bulk_insert_puzzles(chunk)
+            counts["imported"] += len(chunk)
+            chunk.clear()
+
+    for record in read_pack(path):
+        try:
+            values = {field: record[field] for field in PUZZLE_FIELDS}
+            digest = content_hash(
+                values["domain"],
+                values["difficulty"],
+                values["puzzle_description"],
+                values["validation_criteria"],
+            )
+        except (KeyError, TypeError):
+            counts["invalid"] += 1
+            continue
+        if record.get("content_hash") not in (None, digest):
+            counts["invalid"] += 1  # Edited or corrupted since export
+            continue
+        if digest in seen:
+            counts["duplicates"] += 1
+            continue
+        seen.add(digest)
+        values["created_at"] = (
+            datetime.fromisoformat(values["created_at"])
+            if values["created_at"]
+            else datetime.utcnow()
+        )
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    logging.info(
+        f"Imported {counts['imported']} puzzles from {path} "
+        f"({counts['duplicates']} duplicates, {counts['invalid']} invalid skipped)."
+    )
+    return counts
+
+
+def main():
+    """
+    Command line entry point, e.g.:
+        python puzzle_packs.py export packs/bank.jsonl.gz --domain Backend
+        python puzzle_packs.py import packs/bank.jsonl.gz
+    A running server picks imported puzzles up for duplicate detection on restart.
+    """
+    parser = argparse.ArgumentParser(description="Export or import puzzle packs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write puzzles to a pack")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--name", help="Pack name (default: file name)")
+    export_parser.add_argument("--domain")
+    export_parser.add_argument("--difficulty")
+    import_parser = commands.add_parser("import", help="Load puzzles from a pack")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.command == "export":
+            export_pack(args.path, args.name, args.domain, args.difficulty)
+        else:
+            import_pack(args.path, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
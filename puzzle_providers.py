@@ -0,0 +1,388 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import log_pipeline
+
+# A provider turns one chat request into a completion dict (see make_completion),
+# either at once with complete() or incrementally with stream(), a generator that
+# yields content deltas and returns the completion dict when it is exhausted.
+# "kind" is "puzzle" or "hint", so offline providers know what to return.
+# Upstream backoff and timeouts surface as ProviderRateLimited and ProviderTimeout.
+# httpx and the OpenAI SDK are slow to import, so only OpenAIProvider imports them.
+PROVIDER_KINDS = ("puzzle", "hint")
+RATE_LIMIT_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+RATE_LIMIT_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+STREAM_CHUNK_CHARS = 24  # Delta size used by the offline providers
+FAKE_FIRST_TOKEN_FRACTION = (
+    0.1  # Share of the fake latency spent before the first delta
+)
+
+
+class ProviderRateLimited(Exception):
+    """The upstream asked us to back off for retry_after seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Provider rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ProviderTimeout(TimeoutError):
+    """The upstream call timed out (a builtin TimeoutError, whatever the SDK raised)."""
+
+
+def parse_rate_limit_duration(value):
+    """Parses OpenAI reset durations such as "250ms", "1.5s" or "6m0s" into seconds."""
+    matches = RATE_LIMIT_DURATION_PATTERN.findall(value or "")
+    if not matches:
+        return None
+    return sum(float(n) * RATE_LIMIT_DURATION_UNITS[unit] for n, unit in matches)
+
+
+def get_rate_limit_delay(headers):
+    """Returns how long the upstream asked us to back off after a 429."""
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # HTTP-date form; fall back to the reset headers
+    delays = [
+        parse_rate_limit_duration(headers.get(name))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    return max([d for d in delays if d is not None], default=1.0)
+
+
+def make_completion(
+    content,
+    finish_reason,
+    prompt_tokens=None,
+    cached_tokens=None,
+    completion_tokens=None,
+    remaining_tokens=None,
+):
+    """Builds the completion dict every provider returns."""
+    return {
+        "content": content,
+        "finish_reason": finish_reason,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": (
+            prompt_tokens + completion_tokens
+            if prompt_tokens is not None and completion_tokens is not None
+            else None
+        ),
+        "remaining_tokens": remaining_tokens,
+    }
+
+
+def split_into_chunks(content):
+    """Splits content into stream deltas for providers that have it all up front."""
+    return [
+        content[i : i + STREAM_CHUNK_CHARS]
+        for i in range(0, len(content), STREAM_CHUNK_CHARS)
+    ]
+
+
+def request_key(kind, messages, temperature):
+    """Stable key of a chat request, used to match recordings on replay."""
+    payload = json.dumps([kind, messages, temperature], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class OpenAIProvider:
+    """Chat completions from the OpenAI API in JSON mode."""
+
+    name = "openai"
+
+    def __init__(self, client, model, connect_timeout):
+        self.client = client
+        self.model = model
+        self.connect_timeout = connect_timeout
+
+    def _create(self, messages, temperature, timeout, **options):
+        import httpx
+        from openai import APITimeoutError, RateLimitError
+
+        request_id = log_pipeline.get_request_id()
+        if request_id:
+            # Lets OpenAI support look a call up by the ID in our logs
+            options["extra_headers"] = {"X-Client-Request-Id": request_id}
+        try:
+            return self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                timeout=httpx.Timeout(
+                    timeout, connect=min(self.connect_timeout, timeout)
+                ),
+                **options,
+            )
+        except RateLimitError as e:
+            raise ProviderRateLimited(get_rate_limit_delay(e.response.headers)) from e
+        except APITimeoutError as e:
+            raise ProviderTimeout(f"OpenAI call took longer than {timeout:.2f}s") from e
+
+    @staticmethod
+    def _completion(content, finish_reason, usage, raw_response):
+        remaining_tokens = raw_response.headers.get("x-ratelimit-remaining-tokens")
+        prompt_details = getattr(usage, "prompt_tokens_details", None)
+        return make_completion(
+            content,
+            finish_reason,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            cached_tokens=(
+                prompt_details.cached_tokens if prompt_details is not None else None
+            ),
+            completion_tokens=usage.completion_tokens if usage else None,
+            remaining_tokens=(
+                int(remaining_tokens)
+                if remaining_tokens and remaining_tokens.isdigit()
+                else None
+            ),
+        )
+
+    def complete(self, kind, messages, temperature, timeout):
+        raw_response = self._create(messages, temperature, timeout)
+        response = raw_response.parse()
+        choice = response.choices[0] if response.choices else None
+        return self._completion(
+            choice.message.content if choice and choice.message else "",
+            choice.finish_reason if choice else "unknown",
+            response.usage,
+            raw_response,
+        )
+
+    def stream(self, kind, messages, temperature, timeout):
+        import httpx
+        from openai import APITimeoutError
+
+        deadline = time.monotonic() + timeout
+        raw_response = self._create(
+            messages,
+            temperature,
+            timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        chunks = raw_response.parse()
+        parts, finish_reason, usage = [], "unknown", None
+        try:
+            for chunk in chunks:
+                if chunk.usage:
+                    usage = chunk.usage  # Sent in a final chunk without choices
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta and choice.delta.content:
+                        parts.append(choice.delta.content)
+                        yield choice.delta.content
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                if time.monotonic() > deadline:
+                    raise ProviderTimeout(f"Stream took longer than {timeout:.2f}s")
+        except (APITimeoutError, httpx.TimeoutException) as e:
+            # A read timeout between chunks, wrapped by the SDK or not
+            raise ProviderTimeout(f"Stream took longer than {timeout:.2f}s") from e
+        finally:
+            chunks.close()
+        return self._completion("".join(parts), finish_reason, usage, raw_response)
+
+    def warm_up(self):
+        """
+        Opens (TLS + keep-alive) a pooled connection so the first puzzle after
+        startup doesn't pay for it; retrieving the model is free and checks the key.
+        """
+        import httpx
+
+        self.client.models.retrieve(
+            self.model,
+            timeout=httpx.Timeout(
+                self.connect_timeout * 2, connect=self.connect_timeout
+            ),
+        )
+
+
+class FakeProvider:
+    """
+    Offline provider returning valid puzzle/hint JSON after a configurable
+    latency. Output is deterministic for a given seed and call order.
+    """
+
+    name = "fake"
+    TOPICS = ["caching", "indexing", "event loops", "joins", "closures", "queues"]
+
+    def __init__(self, latency=0.5, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def _next_completion(self, kind, messages):
+        """Returns (completion, simulated latency) for the next call."""
+        with self._lock:
+            self._calls += 1
+            call_number = self._calls
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            topic = self._rng.choice(self.TOPICS)
+            correct_option = self._rng.choice("ABCD")
+        if kind == "hint":
+            payload = {"hint_text": f"Think about how {topic} affects the result."}
+        else:
+            options = "\n".join(f"{letter}) Option {letter}" for letter in "ABCD")
+            payload = {
+                "puzzle_description": (
+                    f"**Offline puzzle #{call_number}** on {topic}.\n\n"
+                    f"Which option is correct?\n\n{options}"
+                ),
+                "validation_criteria": json.dumps(
+                    {"type": "multiple_choice", "correct_option": correct_option}
+                ),
+            }
+        content = json.dumps(payload)
+        # Rough 4-characters-per-token estimate so usage tracking has numbers to show
+        completion = make_completion(
+            content,
+            "stop",
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+            cached_tokens=0,
+            completion_tokens=len(content) // 4,
+        )
+        return completion, delay
+
+    def complete(self, kind, messages, temperature, timeout):
+        completion, delay = self._next_completion(kind, messages)
+        time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise TimeoutError(f"Fake provider took longer than {timeout:.2f}s")
+        return completion
+
+    def stream(self, kind, messages, temperature, timeout):
+        completion, delay = self._next_completion(kind, messages)
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake provider took longer than {timeout:.2f}s")
+        chunks = split_into_chunks(completion["content"])
+        time.sleep(delay * FAKE_FIRST_TOKEN_FRACTION)
+        for chunk in chunks:
+            yield chunk
+            time.sleep(delay * (1 - FAKE_FIRST_TOKEN_FRACTION) / len(chunks))
+        return completion
+
+    def warm_up(self):
+        pass
+
+
+class RecordReplayProvider:
+    """
+    Replays completions recorded to a JSONL file, or (with an inner provider)
+    records every completion the inner provider makes. Replays match on the
+    exact request first, then fall back to the recordings of the same kind,
+    cycling through them in order.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, inner=None):
+        self.path = path
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_kind = {kind: [] for kind in PROVIDER_KINDS}
+        self._positions = {}
+        if inner is not None:
+            self.name = f"record:{inner.name}"
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                recording = json.loads(line)
+                self._by_key.setdefault(recording["key"], []).append(recording)
+                self._by_kind.setdefault(recording["kind"], []).append(recording)
+        logging.info(
+            f"Loaded {sum(len(r) for r in self._by_kind.values())} recorded completions from {path}."
+        )
+
+    def _record(self, key, kind, completion):
+        recording = {"key": key, "kind": kind, **completion}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(recording) + "\n")
+
+    def _replay(self, key, kind):
+        with self._lock:
+            if key in self._by_key:
+                candidates, position_key = self._by_key[key], key
+            else:
+                candidates, position_key = self._by_kind.get(kind), kind
+            if not candidates:
+                raise LookupError(f"No recorded '{kind}' completion in {self.path}")
+            position = self._positions.get(position_key, 0)
+            self._positions[position_key] = position + 1
+        recording = candidates[position % len(candidates)]
+        return make_completion(
+            recording["content"],
+            recording["finish_reason"],
+            prompt_tokens=recording.get("prompt_tokens"),
+            cached_tokens=recording.get("cached_tokens"),
+            completion_tokens=recording.get("completion_tokens"),
+        )
+
+    def complete(self, kind, messages, temperature, timeout):
+        key = request_key(kind, messages, temperature)
+        if self.inner is None:
+            return self._replay(key, kind)
+        completion = self.inner.complete(kind, messages, temperature, timeout)
+        self._record(key, kind, completion)
+        return completion
+
+    def stream(self, kind, messages, temperature, timeout):
+        key = request_key(kind, messages, temperature)
+        if self.inner is None:
+            completion = self._replay(key, kind)
+            yield from split_into_chunks(completion["content"])
+            return completion
+        completion = yield from self.inner.stream(kind, messages, temperature, timeout)
+        self._record(key, kind, completion)
+        return completion
+
+    def warm_up(self):
+        if self.inner is not None:
+            self.inner.warm_up()
+
+
+def build_provider(name, openai_client=None, model=None, connect_timeout=5.0):
+    """
+    Builds the provider selected by name ("openai", "fake", "record" or
+    "replay"), configured from the PUZZLE_PROVIDER_* environment variables.
+    Returns None when the OpenAI client it needs is unavailable; raises
+    ValueError for an unknown name and OSError for an unreadable recording.
+    """
+    name = name.lower()
+    if name == "fake":
+        return FakeProvider(
+            latency=float(os.getenv("PUZZLE_PROVIDER_LATENCY", "0.5")),
+            jitter=float(os.getenv("PUZZLE_PROVIDER_JITTER", "0")),
+            seed=int(os.getenv("PUZZLE_PROVIDER_SEED", "0")),
+        )
+    recording_path = os.getenv("PUZZLE_PROVIDER_RECORDING", "puzzle_recordings.jsonl")
+    if name == "replay":
+        return RecordReplayProvider(recording_path)
+    if name not in ("openai", "record"):
+        raise ValueError(f"Unknown puzzle provider: {name}")
+    if openai_client is None:
+        return None
+    provider = OpenAIProvider(openai_client, model, connect_timeout)
+    if name == "record":
+        return RecordReplayProvider(recording_path, inner=provider)
+    return provider
@@ -0,0 +1,127 @@
+import hashlib
+import random
+import re
+import threading
+
+# MinHash signatures over word shingles, bucketed with LSH banding: two puzzles
+# share a bucket (and become candidates) when any band of their signatures is
+# identical, which happens with high probability above ~(1/BANDS)**(1/ROWS)
+# Jaccard similarity. Candidates are then compared on the full signature.
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+DUPLICATE_THRESHOLD = 0.8  # Estimated Jaccard similarity treated as a duplicate
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Fixed seed: signatures must be comparable across restarts and processes
+_rng = random.Random(1729)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize(description):
+    """Lowercases a puzzle description and reduces it to its words."""
+    return NON_WORD_PATTERN.sub(" ", (description or "").lower()).split()
+
+
+def shingles(description):
+    """Returns the set of SHINGLE_SIZE-word shingles of a description."""
+    words = normalize(description)
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(description):
+    """Computes the MinHash signature (a tuple of NUM_PERMUTATIONS ints)."""
+    hashes = [
+        int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big"
+        )
+        for shingle in shingles(description)
+    ]
+    if not hashes:
+        return (MAX_HASH,) * NUM_PERMUTATIONS
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH
+        for a, b in PERMUTATIONS
+    )
+
+
+def similarity(signature_a, signature_b):
+    """Estimates the Jaccard similarity of two descriptions from their signatures."""
+    same = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return same / NUM_PERMUTATIONS
+
+
+class PuzzleSimilarityIndex:
+    """
+    In-memory LSH index of puzzle signatures, partitioned by domain/difficulty.
+    Lookups only touch the puzzles sharing a band with the query, so checking
+    a new puzzle against the bank stays fast as the bank grows.
+    """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._signatures = {}  # puzzle_id -> (domain, difficulty, signature)
+        self._buckets = {}  # (domain, difficulty, band, band values) -> {puzzle_id}
+
+    def _band_keys(self, domain, difficulty, sig):
+        return [
+            (domain, difficulty, band, sig[band * LSH_ROWS : (band + 1) * LSH_ROWS])
+            for band in range(LSH_BANDS)
+        ]
+
+    def add(self, puzzle_id, domain, difficulty, sig):
+        """Indexes a stored puzzle's signature."""
+        with self._lock:
+            self._remove(puzzle_id)
+            self._signatures[puzzle_id] = (domain, difficulty, sig)
+            for key in self._band_keys(domain, difficulty, sig):
+                self._buckets.setdefault(key, set()).add(puzzle_id)
+
+    def _remove(self, puzzle_id):
+        entry = self._signatures.pop(puzzle_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(*entry):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(puzzle_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def remove(self, puzzle_id):
+        """Drops a puzzle from the index (e.g. after it is deleted)."""
+        with self._lock:
+            self._remove(puzzle_id)
+
+    def find_duplicate(self, domain, difficulty, sig):
+        """
+        Returns (puzzle_id, similarity) of the most similar indexed puzzle of the
+        same domain/difficulty at or above the threshold, or None.
+        """
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(domain, difficulty, sig):
+                candidates.update(self._buckets.get(key, ()))
+            for puzzle_id in candidates:
+                score = similarity(sig, self._signatures[puzzle_id][2])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (puzzle_id, score)
+        return best
+
+    def __len__(self):
+        with self._lock:
+            return len(self._signatures)
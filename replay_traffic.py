@@ -0,0 +1,366 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Replays a capture (see traffic_capture.py) against a fresh instance of this build:
+# a new database (empty, or a copy of a given one without players), the captured
+# LLM completions instead of a real provider, and requests re-sent at their
+# original pace (or faster). Player and puzzle IDs the new database hands out are
+# mapped onto the captured ones. Reports each endpoint's latency against the
+# capture and every response that differs from the captured one. Settings are read
+# when app is imported, so the environment is set up first.
+_workdir = tempfile.mkdtemp(prefix="enigma-replay-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/replay.db"
+os.environ.pop("TRAFFIC_CAPTURE_FILE", None)  # Don't capture the replay itself
+os.environ["PUZZLE_PREFETCH"] = "false"  # Background generation isn't replayable
+os.environ.setdefault("COMPACTION_INTERVAL_HOURS", "0")
+os.environ.setdefault("OPENAI_WARMUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app as enigma
+import traffic_capture
+from app import create_app, db, llm_limiter
+
+ID_FIELDS = ("player_id", "puzzle_id")
+ID_PATH_PATTERN = re.compile(r"^(/players/|/api/skipped_puzzles/)(\d+)(?=$|[/?])")
+USERNAME_PATH_PATTERN = re.compile(
+    r"^/(?:api/statistics|player/username)/([^/?]+)(?=$|\?)"
+)
+VOLATILE_FIELD_PATTERN = re.compile(r"(_at|_since)$")  # Timestamps
+MISMATCHES_SHOWN = 20
+
+
+class IdMap:
+    """Captured player/puzzle IDs -> the IDs the replayed requests got for them."""
+
+    def __init__(self):
+        self._ids = {field: {} for field in ID_FIELDS}
+        self._lock = threading.Lock()
+
+    def learn(self, captured, replayed):
+        """Pairs up the IDs in a captured response and the same response on replay."""
+        if isinstance(captured, dict) and isinstance(replayed, dict):
+            for key, value in captured.items():
+                if key in ID_FIELDS and isinstance(value, int):
+                    if isinstance(replayed.get(key), int):
+                        with self._lock:
+                            self._ids[key].setdefault(value, replayed[key])
+                elif key in replayed:
+                    self.learn(value, replayed[key])
+        elif isinstance(captured, list) and isinstance(replayed, list):
+            for captured_item, replayed_item in zip(captured, replayed):
+                self.learn(captured_item, replayed_item)
+
+    def rewrite(self, body):
+        """A captured request or response body with the replay's IDs."""
+        if isinstance(body, dict):
+            return {
+                key: (
+                    self._map(key, value) if key in ID_FIELDS else self.rewrite(value)
+                )
+                for key, value in body.items()
+            }
+        if isinstance(body, list):
+            return [self.rewrite(value) for value in body]
+        return body
+
+    def rewrite_path(self, path):
+        return ID_PATH_PATTERN.sub(
+            lambda m: f"{m.group(1)}{self._map('player_id', int(m.group(2)))}", path
+        )
+
+    def _map(self, field, value):
+        try:
+            captured = int(value)
+        except (TypeError, ValueError):
+            return value
+        with self._lock:
+            mapped = self._ids[field].get(captured, captured)
+        return mapped if isinstance(value, int) else str(mapped)
+
+
+def player_keys(entry):
+    """What identifies the player behind a captured request: IDs and usernames."""
+    keys = []
+    for body in (entry.get("b"), entry.get("r")):
+        if isinstance(body, dict):
+            if isinstance(body.get("player_id"), (int, str)):
+                keys.append(("player", str(body["player_id"])))
+            if isinstance(body.get("username"), str):
+                keys.append(("username", body["username"]))
+    for pattern, kind in (
+        (ID_PATH_PATTERN, "player"),
+        (USERNAME_PATH_PATTERN, "username"),
+    ):
+        match = pattern.match(entry["p"])
+        if match:
+            keys.append((kind, match.group(match.lastindex)))
+    return keys
+
+
+def assign_players(entries):
+    """
+    Gives each entry the key of the player it belongs to, so one player's requests
+    are replayed one after another and in order, whatever the concurrency.
+    """
+    canonical = {}
+    players = []
+    for entry in entries:
+        keys = player_keys(entry)
+        player = next((canonical[key] for key in keys if key in canonical), None)
+        if player is None and keys:
+            player = keys[0]
+        for key in keys:
+            canonical.setdefault(key, player)
+        players.append(player)
+    return players
+
+
+def normalize(body):
+    """A response body without the fields expected to differ on every run."""
+    if isinstance(body, dict):
+        return {
+            key: normalize(value)
+            for key, value in body.items()
+            if not VOLATILE_FIELD_PATTERN.search(key) and key != "request_id"
+        }
+    if isinstance(body, list):
+        return [normalize(value) for value in body]
+    return body
+
+
+def differences(captured, replayed, path=""):
+    """Paths (like "hint" or "puzzles[2].domain") where two bodies differ."""
+    if isinstance(captured, dict) and isinstance(replayed, dict):
+        found = []
+        for key in sorted(set(captured) | set(replayed)):
+            found += differences(
+                captured.get(key), replayed.get(key), f"{path}.{key}" if path else key
+            )
+        return found
+    if (
+        isinstance(captured, list)
+        and isinstance(replayed, list)
+        and len(captured) == len(replayed)
+    ):
+        found = []
+        for i, (a, b) in enumerate(zip(captured, replayed)):
+            found += differences(a, b, f"{path}[{i}]")
+        return found
+    return [] if captured == replayed else [path or "(body)"]
+
+
+class Replayer:
+    def __init__(self, app, id_map, max_body_bytes):
+        self.app = app
+        self.id_map = id_map
+        self.max_body_bytes = max_body_bytes
+        self._clients = threading.local()
+
+    def _client(self):
+        if not hasattr(self._clients, "client"):
+            self._clients.client = self.app.test_client()
+        return self._clients.client
+
+    def replay(self, entry, previous):
+        """Re-sends one captured request once its player's previous one is done."""
+        if previous is not None:
+            previous.exception()  # Waits; its failure is reported on its own
+        path = self.id_map.rewrite_path(entry["p"])
+        body = self.id_map.rewrite(entry.get("b"))
+        started = time.perf_counter()
+        response = self._client().open(
+            path,
+            method=entry["m"],
+            json=body,
+            headers={"X-Request-ID": entry["id"]},
+        )
+        data = response.get_data()
+        response.close()  # Runs the streamed response's call_on_close work
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        replayed = {
+            **{key: entry[key] for key in ("ts", "id", "e", "m", "llm")},
+            "p": path,  # As sent, so the output can be replayed in turn
+            "b": body,
+            "s": response.status_code,
+            "ms": round(elapsed_ms, 2),
+        }
+        if entry.get("r") is None and "h" not in entry:
+            replayed["r"] = None  # Streamed when captured; only the status compares
+        else:
+            replayed.update(
+                traffic_capture.describe_body(
+                    data, response.mimetype == "application/json", self.max_body_bytes
+                )
+            )
+        self.id_map.learn(entry.get("r"), replayed.get("r"))
+        return replayed
+
+
+def replay_all(replayer, entries, speed, concurrency):
+    """
+    Sends the entries at their captured pace divided by speed (0: back to back),
+    at most `concurrency` at a time. Returns the replayed entries in order.
+    """
+    players = assign_players(entries)
+    last_by_player = {}
+    futures = []
+    first_ts = entries[0]["ts"]
+    started = time.monotonic()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for entry, player in zip(entries, players):
+            if speed > 0:
+                delay = started + (entry["ts"] - first_ts) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            future = pool.submit(
+                replayer.replay, entry, last_by_player.get(player) if player else None
+            )
+            if player:
+                last_by_player[player] = future
+            futures.append(future)
+    return [future.result() for future in futures]
+
+
+def compare(entries, replayed, id_map):
+    """The replayed entries whose status or normalized body differs from the capture."""
+    mismatches = []
+    for captured, result in zip(entries, replayed):
+        fields = []
+        if captured["s"] != result["s"]:
+            fields.append("status")
+        if result["r"] is not None or "h" in result:
+            if "h" in captured or "h" in result:
+                if captured.get("h") != result.get("h"):
+                    fields.append("(body)")
+            else:
+                fields += differences(
+                    normalize(id_map.rewrite(captured["r"])), normalize(result["r"])
+                )
+        if fields:
+            mismatches.append((captured, result, fields))
+    return mismatches
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_report(entries, replayed, mismatches):
+    by_endpoint = {}
+    for captured, result in zip(entries, replayed):
+        by_endpoint.setdefault(captured["e"], []).append((captured["ms"], result["ms"]))
+    mismatched = {}
+    for captured, _, _ in mismatches:
+        mismatched[captured["e"]] = mismatched.get(captured["e"], 0) + 1
+
+    print(
+        f"{'endpoint':<36}{'requests':>9}{'mismatch':>9}{'captured p50/p95 ms':>21}"
+        f"{'replayed p50/p95 ms':>21}{'p50 diff':>10}"
+    )
+    for endpoint, timings in sorted(by_endpoint.items()):
+        before = [captured for captured, _ in timings]
+        after = [result for _, result in timings]
+        before_p50, after_p50 = statistics.median(before), statistics.median(after)
+        print(
+            f"{endpoint:<36}{len(timings):>9}{mismatched.get(endpoint, 0):>9}"
+            f"{f'{before_p50:.1f} / {percentile(before, 0.95):.1f}':>21}"
+            f"{f'{after_p50:.1f} / {percentile(after, 0.95):.1f}':>21}"
+            + (
+                f"{(after_p50 - before_p50) / before_p50 * 100:>+9.1f}%"
+                if before_p50
+                else f"{'-':>10}"
+            )
+        )
+    for captured, result, fields in mismatches[:MISMATCHES_SHOWN]:
+        print(
+            f"MISMATCH {captured['id']} {captured['m']} {captured['p']}: "
+            f"status {captured['s']} -> {result['s']}, differs in {', '.join(fields)}"
+        )
+    if len(mismatches) > MISMATCHES_SHOWN:
+        print(f"... and {len(mismatches) - MISMATCHES_SHOWN} more mismatches")
+
+
+def main():
+    """
+    Replays captured traffic against this build, e.g.:
+        python replay_traffic.py capture.jsonl --database start.db --speed 10 \\
+            --output replayed.jsonl
+    The capture comes from a server run with TRAFFIC_CAPTURE_FILE set, and every
+    player in it must have signed up within the capture: start capturing on an
+    empty database. Captured passwords are pseudonyms, so players that were
+    already in the database (e.g. a --database copy of a live one) get 401 on
+    login; --database is for a starting database without players, such as a
+    puzzle bank. --output writes the replay in the capture format, so it
+    can be replayed against the next build in turn. Exits with status 1 when any
+    response differs from the captured one.
+    """
+    parser = argparse.ArgumentParser(description="Replay captured API traffic.")
+    parser.add_argument("capture")
+    parser.add_argument(
+        "--database",
+        help="SQLite file to start from (copied); players in it can't log in",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="1: captured pace, 0: no pauses"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--llm-delay",
+        type=float,
+        default=1.0,
+        help="share of each captured LLM call's duration to wait (0: none)",
+    )
+    parser.add_argument("--output", help="write the replayed requests here")
+    args = parser.parse_args()
+
+    entries = traffic_capture.read_capture(args.capture)
+    if not entries:
+        print(f"No requests in {args.capture}")
+        sys.exit(1)
+    if args.database:
+        shutil.copyfile(args.database, os.path.join(_workdir, "replay.db"))
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    # Captured completions stand in for the LLM; they cost nothing, so the token
+    # budget shouldn't hold them up
+    enigma.puzzle_provider = traffic_capture.CapturedCompletionProvider(
+        entries, args.llm_delay
+    )
+    enigma.puzzle_provider_built = True
+    llm_limiter.tokens_per_minute = llm_limiter._tokens = 1e12
+
+    id_map = IdMap()
+    replayer = Replayer(app, id_map, enigma.TRAFFIC_CAPTURE_MAX_BODY)
+    started = time.perf_counter()
+    replayed = replay_all(replayer, entries, args.speed, args.concurrency)
+    print(
+        f"Replayed {len(replayed)} requests in {time.perf_counter() - started:.1f}s "
+        f"(captured over {entries[-1]['ts'] - entries[0]['ts']:.1f}s); LLM "
+        f"completions matched {enigma.puzzle_provider.stats['matched']}, "
+        f"reused {enigma.puzzle_provider.stats['fallback']}"
+    )
+    mismatches = compare(entries, replayed, id_map)
+    print_report(entries, replayed, mismatches)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for entry in replayed:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
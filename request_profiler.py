@@ -0,0 +1,219 @@
+import cProfile
+import collections
+import io
+import json
+import marshal
+import os
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+# Captures for single requests, switched on per request so unprofiled requests pay
+# nothing: a deterministic CPU profile (cProfile), wall-clock stack samples in the
+# folded format flame graph tools read (flamegraph.pl, speedscope), and the memory
+# allocated while the request ran (tracemalloc). Captures are written to a
+# directory, one subdirectory per profile, and the oldest are deleted past a limit.
+PROFILE_KINDS = ("cpu", "stacks", "alloc")
+ARTIFACTS = {
+    "cpu": ("cpu.pstats", "cpu.txt"),
+    "stacks": ("stacks.folded",),
+    "alloc": ("alloc.txt",),
+}
+SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+ALLOC_FRAMES = 10  # Frames kept per allocation traceback
+TOP_ENTRIES = 40  # Lines in the text summaries
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+
+def parse_kinds(spec):
+    """Parses "cpu,alloc" (or "all") into known kinds, in PROFILE_KINDS order."""
+    requested = {kind.strip().lower() for kind in (spec or "").split(",")}
+    if "all" in requested:
+        return list(PROFILE_KINDS)
+    return [kind for kind in PROFILE_KINDS if kind in requested]
+
+
+def frame_label(code):
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every interval from a helper thread and
+    counts identical stacks. Sampling sees time spent waiting too (database,
+    OpenAI), which cProfile attributes to whatever C call is blocked.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """One "outer;...;inner count" line per distinct stack."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.counts.most_common()
+        )
+
+
+class RequestProfile:
+    """
+    One capture on the calling thread. tracemalloc is process-wide: allocations
+    by other threads while the request runs are counted as well.
+    """
+
+    def __init__(self, kinds, sample_interval=SAMPLE_INTERVAL):
+        self.kinds = list(kinds)
+        self.sample_interval = sample_interval
+        self._cpu = None
+        self._sampler = None
+        self._alloc_before = None
+        self._started_tracing = False
+        self._started = None
+
+    def start(self):
+        if "alloc" in self.kinds:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(ALLOC_FRAMES)
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._alloc_before = tracemalloc.take_snapshot()
+        if "stacks" in self.kinds:
+            self._sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+        if "cpu" in self.kinds:
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Stops every capture and returns ({artifact name: bytes}, seconds)."""
+        seconds = time.perf_counter() - self._started
+        # Everything is stopped before any report is built, so no capture sees the
+        # others' reporting
+        if self._cpu is not None:
+            self._cpu.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._alloc_before is not None:
+            alloc_after = tracemalloc.take_snapshot()
+            traced = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        artifacts = {}
+        if self._cpu is not None:
+            self._cpu.create_stats()
+            artifacts["cpu.pstats"] = marshal.dumps(self._cpu.stats)
+            summary = io.StringIO()
+            pstats.Stats(self._cpu, stream=summary).sort_stats(
+                "cumulative"
+            ).print_stats(TOP_ENTRIES)
+            artifacts["cpu.txt"] = summary.getvalue().encode()
+        if self._sampler is not None:
+            artifacts["stacks.folded"] = self._sampler.folded().encode()
+        if self._alloc_before is not None:
+            artifacts["alloc.txt"] = self._allocation_report(
+                alloc_after, *traced
+            ).encode()
+        return artifacts, seconds
+
+    def _allocation_report(self, after, current, peak):
+        ignored = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+        differences = after.filter_traces(ignored).compare_to(
+            self._alloc_before.filter_traces(ignored), "lineno"
+        )
+        lines = [
+            f"Traced memory: {current / 1024:.1f} KiB at the end, "
+            f"{peak / 1024:.1f} KiB peak during the request",
+            f"Top {TOP_ENTRIES} lines by memory still allocated at the end:",
+        ]
+        lines.extend(str(stat) for stat in differences[:TOP_ENTRIES])
+        return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Profiles on disk: <directory>/<profile id>/meta.json plus its artifacts."""
+
+    def __init__(self, directory, max_profiles):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, meta, artifacts):
+        """Writes a profile and returns its ID, deleting the oldest past max_profiles."""
+        profile_id = uuid.uuid4().hex[:16]
+        path = os.path.join(self.directory, profile_id)
+        os.makedirs(path)
+        for name, content in artifacts.items():
+            with open(os.path.join(path, name), "wb") as f:
+                f.write(content)
+        meta = {"id": profile_id, **meta, "artifacts": sorted(artifacts)}
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with self._lock:
+            for stale in self.list()[self.max_profiles :]:
+                shutil.rmtree(
+                    os.path.join(self.directory, stale["id"]), ignore_errors=True
+                )
+        return profile_id
+
+    def list(self):
+        """Metadata of the stored profiles, newest first."""
+        profiles = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return profiles
+        for name in names:
+            try:
+                with open(
+                    os.path.join(self.directory, name, "meta.json"), encoding="utf-8"
+                ) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Being written or deleted
+        profiles.sort(key=lambda meta: meta["captured_at"], reverse=True)
+        return profiles
+
+    def artifact_directory(self, profile_id, artifact):
+        """The directory holding a stored artifact, or None if there is no such file."""
+        if not PROFILE_ID_PATTERN.match(profile_id) or artifact not in {
+            name for names in ARTIFACTS.values() for name in names
+        }:
+            return None
+        path = os.path.join(self.directory, profile_id)
+        return path if os.path.isfile(os.path.join(path, artifact)) else None
@@ -306,7 +306,7 @@ async function fetchAndDisplayAIPuzzle(domain, difficulty, excludePuzzleId = nul
     }
 
     try {
-        const response = await fetch('http://localhost:8000/generate_puzzle', {
+        const response = await fetch('http://localhost:8000/generate_puzzle/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(payload),
@@ -315,7 +315,20 @@ async function fetchAndDisplayAIPuzzle(domain, difficulty, excludePuzzleId = nul
             const errData = await response.json();
             throw new Error(errData.error || `HTTP error ${response.status}`);
         }
-        currentAIPuzzle = await response.json();
+        // Show the puzzle text as it is generated, then render the finished puzzle
+        const preview = document.createElement('p');
+        preview.classList.add('ai-puzzle-preview');
+        preview.style.whiteSpace = 'pre-wrap';
+        riddleArea?.appendChild(preview);
+        let puzzle = null;
+        await readServerSentEvents(response, (event, data) => {
+            if (event === 'delta') preview.textContent += data.text;
+            else if (event === 'reset') preview.textContent = '';
+            else if (event === 'puzzle') puzzle = data;
+            else if (event === 'error') throw new Error(data.error);
+        });
+        if (!puzzle) throw new Error('Puzzle stream ended unexpectedly');
+        currentAIPuzzle = puzzle;
         currentRiddleIndex++;
         displayAIPuzzle();
     } catch (error) {
@@ -324,6 +337,38 @@ async function fetchAndDisplayAIPuzzle(domain, difficulty, excludePuzzleId = nul
     }
 }
 
+/**
+ * Reads a text/event-stream response, calling onEvent(event, data) for every event.
+ * @param {Response} response - The streaming fetch response.
+ * @param {function(string, object)} onEvent - Receives the event name and its parsed JSON data.
+ */
+async function readServerSentEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let frameEnd;
+            while ((frameEnd = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, frameEnd);
+                buffer = buffer.slice(frameEnd + 2);
+                let event = 'message', data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                }
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    } catch (error) {
+        reader.cancel().catch(() => {}); // Stop the server-side generation stream
+        throw error;
+    }
+}
+
 function displayAIPuzzle() {
     if (!currentAIPuzzle) {
         console.error("No AI puzzle data to display.");
@@ -758,6 +803,14 @@ function displayRiddle() {
     if (!riddleArea) { console.error("Riddle display area not found!"); goBackToLanding(); return; }
     riddleArea.style.display = 'block'; // Ensure container is visible
 
+    // Riddle packs are fetched on demand; wait for this riddle's chunk before rendering
+    if (!isRiddleLoaded(currentDifficulty, currentMode, currentRiddleIndex)) {
+        ensureRiddleLoaded(currentDifficulty, currentMode, currentRiddleIndex)
+            .then(() => displayRiddle())
+            .catch(error => { console.error("Failed to load riddle pack:", error); goBackToLanding(); });
+        return;
+    }
+
     const riddleSet = getCurrentRiddles(); // Assumes this function works correctly and handles errors
 
     if (!riddleSet) { console.error("Failed to get current riddle set. Aborting."); goBackToLanding(); return; }
@@ -919,6 +972,9 @@ function displayRiddle() {
          }
     }
 
+    // Fetch the next stage in the background so advancing doesn't wait on the network
+    prefetchRiddle(currentDifficulty, currentMode, currentRiddleIndex + 1);
+
     console.log("Riddle displayed successfully.");
 }
 
@@ -950,6 +1006,11 @@ async function displayFinalRiddle(difficulty) {
     if (!riddleArea) { console.error("Riddle display area not found!"); return; }
     riddleArea.style.display = 'block';
 
+    try {
+        await ensureRiddleLoaded('final', difficulty);
+    } catch (error) {
+        console.error(`Failed to load final riddle pack for difficulty: ${difficulty}`, error);
+    }
     const riddleData = getFinalRiddleData(difficulty);
 
     if (!riddleData || !riddleData.riddle || !riddleData.answerHashes) {
@@ -293,32 +293,13 @@ function showCollectedLore() {
             addLoreEntry(landingLoreActualText, "System Boot");
         }
 
-        const processRiddleSet = (riddles, sourcePrefix) => {
-            if (Array.isArray(riddles)) {
-                riddles.forEach((riddle, index) => {
-                    if (riddle && riddle.lore && discoveredLore.includes(escapeHtmlAttribute(riddle.lore))) {
-                        addLoreEntry(riddle.lore, `${sourcePrefix} ${index + 1}`);
-                    }
-                });
-            }
-        };
-
-        for (const diff in allRiddles) {
-            if (diff === 'finalRiddles' || !allRiddles[diff] || (diff === 'nightmare' && typeof nightmareRiddles === 'undefined')) continue;
-            for (const mode in allRiddles[diff]) {
-                 if (allRiddles[diff][mode]) {
-                    processRiddleSet(allRiddles[diff][mode], `${diff}/${mode}`);
-                 }
-            }
-        }
-
-        if (allRiddles.finalRiddles) {
-            for (const diff in allRiddles.finalRiddles) {
-                const riddle = allRiddles.finalRiddles[diff];
-                if (riddle && riddle.lore && discoveredLore.includes(escapeHtmlAttribute(riddle.lore))) {
-                    addLoreEntry(riddle.lore, `Final/${diff}`);
+        // riddleLoreIndex (riddle-data.js) lists lore from every pack, loaded or not
+        if (typeof riddleLoreIndex !== 'undefined') {
+            riddleLoreIndex.forEach(entry => {
+                if (entry.lore && discoveredLore.includes(escapeHtmlAttribute(entry.lore))) {
+                    addLoreEntry(entry.lore, entry.source);
                 }
-            }
+            });
         }
 
         discoveredLore.forEach(lore => {
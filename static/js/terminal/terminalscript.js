@@ -47,17 +47,9 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- Credentials ---
-    const credentials = {
-        guest:           { user: 'guest',           pass: 'enigma1',       level: 'guest' },
-        unit734:         { user: 'unit734',         pass: 'titanic',       level: 'unit734' }, // Base level
-        architect:       { user: 'architect_node',  pass: 'chimera_rsa',   level: 'architect' },
-        dr_lena_petrova: { user: 'lpetrova',        pass: 'channel7G',     level: 'dr_lena_petrova' },
-        dr_aris_thorne:  { user: 'athorne',         pass: 'AX4',           level: 'dr_aris_thorne' },
-        masterschool:    { user: 'master_student',  pass: 'egg_hunt',      level: 'masterschool' },
-        gl1tch:          { user: 'gl1tch',          pass: 'cake?',         level: 'gl1tch' }
-    };
-
-    const SPECIAL_ACCOUNTS = new Set(['guest', 'architect', 'lpetrova', 'athorne', 'master_student', 'gl1tch']);
+    // Special accounts and registered players are checked by the server, which grants
+    // the account's access level for this session
+    const SPECIAL_ACCOUNTS = new Set(['guest', 'architect', 'architect_node', 'lpetrova', 'athorne', 'master_student', 'gl1tch']);
 
 
     // --- State Variables ---
@@ -197,23 +189,41 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
 
-    function getAccessiblePaths() {
-        const accessible = new Set();
+    // --- Filesystem Node Loading ---
+    // Directories and files are fetched one at a time from the server and kept for the session.
+    const TERMINAL_FS_API_URL = '/api/terminal/fs';
+    const fsNodeCache = new Map();
 
-        // 1. Always add guest files first
-        if (fileSourceContent.guest) {
-            for (const path in fileSourceContent.guest) {
-                accessible.add(path);
-            }
-        }
+    // Fills the per-session placeholders of a file (timestamps, cycle ids, operative designation)
+    function fillFileTemplate(content) {
+        return content
+            .replace(/\{\{timestamp\}\}/g, () => new Date().toISOString())
+            .replace(/\{\{cycle\}\}/g, () => `${Math.floor(Date.now()/1000000)}.${String.fromCharCode(65 + Math.floor(Math.random() * 26))}`)
+            .replace(/\{\{designation\}\}/g, () => localStorage.getItem('lastDesignation') || '[Not Set]');
+    }
 
-        // 2. Add files specific to the current access level (if not guest)
-        if (currentAccessLevel && currentAccessLevel !== 'guest' && fileSourceContent[currentAccessLevel]) {
-            for (const path in fileSourceContent[currentAccessLevel]) {
-                accessible.add(path);
-            }
+    // Resolves to { type: 'directory', dirs, files } or { type: 'file', content }, or null if not accessible
+    async function fetchFsNode(absolutePath) {
+        const cacheKey = `${currentAccessLevel}:${absolutePath}`;
+        if (!fsNodeCache.has(cacheKey)) {
+            const params = new URLSearchParams({ access_level: currentAccessLevel, path: absolutePath });
+            const nodePromise = fetch(`${TERMINAL_FS_API_URL}?${params}`)
+                .then(response => {
+                    if (response.status === 404 || response.status === 403) return null;
+                    if (!response.ok) throw new Error(`Filesystem request failed: ${response.status}`);
+                    return response.json();
+                })
+                .then(node => {
+                    if (node && node.type === 'file') node.content = fillFileTemplate(node.content);
+                    return node;
+                })
+                .catch(error => {
+                    fsNodeCache.delete(cacheKey); // Allow a retry on the next command
+                    throw error;
+                });
+            fsNodeCache.set(cacheKey, nodePromise);
         }
-        return accessible;
+        return fsNodeCache.get(cacheKey);
     }
 
 
@@ -257,36 +267,24 @@ document.addEventListener('DOMContentLoaded', () => {
         let terminalLevelForUser = null;
         let loggedInUsername = null;
 
-        // Try hardcoded special accounts
-        for (const key in credentials) {
-            if (usernameVal.toLowerCase() === credentials[key].user.toLowerCase() && passwordVal === credentials[key].pass) {
-                terminalLevelForUser = credentials[key].level;
-                loggedInUsername = credentials[key].user; // Use the canonical username from credentials object
+        // Special accounts first, then registered users; either way the server grants the level
+        try {
+            const response = await fetch('/api/terminal/login', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ username: usernameVal, password: passwordVal }),
+            });
+            const data = await response.json();
+            if (response.ok) {
                 loginSuccess = true;
-                break;
-            }
-        }
-
-        // If not a special account, try DB login for registered users
-        if (!loginSuccess) {
-            try {
-                const response = await fetch('/login', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ username: usernameVal, password: passwordVal }),
-                });
-                const data = await response.json();
-                if (response.ok) {
-                    loginSuccess = true;
-                    loggedInUsername = data.username;
-                    terminalLevelForUser = data.terminal_access_level || 'registered_user';
-                } else {
-                    loginFeedback.textContent = `:: Auth Failed: ${data.error || 'Invalid credentials'} ::`;
-                }
-            } catch (error) {
-                console.error("Login API call failed:", error);
-                loginFeedback.textContent = ':: Network Error during login. ::';
+                loggedInUsername = data.username;
+                terminalLevelForUser = data.access_level || 'registered_user';
+            } else {
+                loginFeedback.textContent = `:: Auth Failed: ${data.error || 'Invalid credentials'} ::`;
             }
+        } catch (error) {
+            console.error("Login API call failed:", error);
+            loginFeedback.textContent = ':: Network Error during login. ::';
         }
 
         loginButton.disabled = false;
@@ -555,7 +553,7 @@ document.addEventListener('DOMContentLoaded', () => {
          disableInput(); // Disable input while processing
 
         // Process command after a short delay
-        setTimeout(() => {
+        setTimeout(async () => {
             const parts = commandLine.split(' ').filter(part => part.length > 0);
             const command = parts[0].toLowerCase();
             const arg = parts.slice(1).join(' ');
@@ -576,7 +574,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         break;
                     case 'ls':
                     case 'list':
-                        listFiles(arg); // Pass arg for potential future use
+                        await listFiles(arg); // Pass arg for potential future use
                         break;
                     case 'statistics':
                         if (primaryUser) {
@@ -588,7 +586,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         break;
                     case 'cat':
                     case 'view':
-                        displayFileContent(arg);
+                        await displayFileContent(arg);
                         break;
                     case 'help':
                         showHelp();
@@ -602,7 +600,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         }
                         break;
                     case 'cd':
-                        handleCd(arg);
+                        await handleCd(arg);
                         break;
                     case 'pwd':
                         handlePwd();
@@ -625,33 +623,28 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
     // --- listFiles Function ---
-    function listFiles(targetPathArg = '') {
+    async function listFiles(targetPathArg = '') {
         if (!currentAccessLevel) { appendOutputLine("Error: Access level undefined."); return; }
 
         const listPath = currentPath;
-        const accessiblePaths = getAccessiblePaths();
-        const itemsInPath = { dirs: new Set(), files: new Set() };
         const relativeCurrentPathPrefix = listPath === '/' ? '' : listPath.substring(1);
-
-        accessiblePaths.forEach(path => {
-            if (path.startsWith(relativeCurrentPathPrefix)) {
-                const remainder = path.substring(relativeCurrentPathPrefix.length);
-                if (remainder.includes('/')) {
-                    const dirName = remainder.split('/')[0];
-                    if (dirName) {
-                        itemsInPath.dirs.add(dirName);
-                    }
-                } else if (remainder.length > 0) {
-                    itemsInPath.files.add(remainder);
-                }
-            }
-        });
+        let node;
+        try {
+            node = await fetchFsNode(listPath);
+        } catch (error) {
+            console.error(`Directory listing failed for ${listPath}:`, error);
+            appendOutputLine(":: Error: Filesystem unreachable. Try again. ::");
+            return;
+        }
+        const itemsInPath = node && node.type === 'directory'
+            ? { dirs: node.dirs, files: node.files }
+            : { dirs: [], files: [] };
 
         // Display the results
         appendOutputLine(`Contents of ${listPath}:`); // Use the absolute path for display
 
         // Sort and display directories
-        const sortedDirs = [...itemsInPath.dirs].sort();
+        const sortedDirs = itemsInPath.dirs;
         sortedDirs.forEach(dir => {
             const safeDirName = dir.replace(/</g, "&lt;").replace(/>/g, "&gt;");
             // Use allowHtml=true for directory spans
@@ -659,7 +652,7 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         // Sort and display files
-        const sortedFiles = [...itemsInPath.files].sort();
+        const sortedFiles = itemsInPath.files;
         sortedFiles.forEach(file => {
             const safeFileName = file.replace(/</g, "&lt;").replace(/>/g, "&gt;");
             // Construct full relative path for href if needed
@@ -692,7 +685,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
     // --- displayFileContent Function ---
-    function displayFileContent(filePathArg) {
+    async function displayFileContent(filePathArg) {
         if (!currentAccessLevel) {
             appendOutputLine("Error: Access level undefined.");
             return;
@@ -712,26 +705,19 @@ document.addEventListener('DOMContentLoaded', () => {
              return;
         }
 
-        // Create the key to look up in fileSourceContent (remove leading '/')
+        // Path relative to the filesystem root (remove leading '/'), used for display and audio lookup
         const lookupKey = resolvedPath.startsWith('/') ? resolvedPath.substring(1) : resolvedPath;
 
-        let fileContent = undefined;
-        let found = false;
-
-        // --- Corrected Content Lookup Logic ---
-        // 1. Check the user's specific access level first
-        if (currentAccessLevel && fileSourceContent[currentAccessLevel] && fileSourceContent[currentAccessLevel][lookupKey] !== undefined) {
-            fileContent = fileSourceContent[currentAccessLevel][lookupKey];
-            found = true;
-            // console.log(`Found content for '${lookupKey}' in level '${currentAccessLevel}'`); // Debug log
-        }
-        // 2. If not found in specific level, check the 'guest' level (unless user is guest)
-        else if (currentAccessLevel !== 'guest' && fileSourceContent.guest && fileSourceContent.guest[lookupKey] !== undefined) {
-            fileContent = fileSourceContent.guest[lookupKey];
-            found = true;
-            // console.log(`Found content for '${lookupKey}' in level 'guest'`); // Debug log
+        let node;
+        try {
+            node = await fetchFsNode(resolvedPath);
+        } catch (error) {
+            console.error(`File retrieval failed for ${lookupKey}:`, error);
+            appendOutputLine(":: Error: Filesystem unreachable. Try again. ::");
+            return;
         }
-        // --- End Corrected Logic ---
+        const found = node !== null && node.type === 'file';
+        const fileContent = found ? node.content : undefined;
 
         if (found && fileContent !== undefined) {
             // Existing logic to display content (including audio handling)
@@ -830,14 +816,9 @@ document.addEventListener('DOMContentLoaded', () => {
         } else {
             // File not found in accessible levels
             const safeTargetPath = targetPath.replace(/</g, "&lt;").replace(/>/g, "&gt;");
-            // Check if the path *should* be accessible to differentiate errors
-            const accessiblePaths = getAccessiblePaths();
-            if (accessiblePaths.has(lookupKey)) {
-                 // Path is accessible, but content wasn't found in expected levels (shouldn't happen with correct logic)
-                 appendOutputLine(`Error: Content retrieval failed for accessible file: ${safeTargetPath}. Check fileSourceContent definition.`);
-                 console.error(`Content missing for accessible path: ${lookupKey} for level ${currentAccessLevel}`);
+            if (node && node.type === 'directory') {
+                 appendOutputLine(`Error: '${safeTargetPath}' is likely a directory.`);
             } else {
-                 // Path is genuinely not accessible or doesn't exist
                  appendOutputLine(`Error: File not found or access denied: ${safeTargetPath}`);
             }
         }
@@ -845,8 +826,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
     // --- handleCd Function ---
-    // ... (handleCd function remains the same) ...
-    function handleCd(targetDirArg) {
+    async function handleCd(targetDirArg) {
         if (!currentAccessLevel) {
             appendOutputLine("Error: Access level undefined.");
             return;
@@ -860,37 +840,23 @@ document.addEventListener('DOMContentLoaded', () => {
         const targetDir = targetDirArg.trim();
         let resolvedAbsolutePath = resolvePath(targetDir, currentPath);
 
-        const accessiblePaths = getAccessiblePaths();
-        let dirExists = false;
-        let isFile = false;
-
-        const relativePathCheck = resolvedAbsolutePath.startsWith('/') ? resolvedAbsolutePath.substring(1) : resolvedAbsolutePath;
-        if (accessiblePaths.has(relativePathCheck)) {
-            isFile = true;
-        }
-
         let dirPathCheck = resolvedAbsolutePath;
         if (dirPathCheck !== '/' && !dirPathCheck.endsWith('/')) {
             dirPathCheck += '/';
         }
-        const relativeDirPrefix = dirPathCheck === '/' ? '' : dirPathCheck.substring(1);
-
-        if (!isFile) {
-             if (dirPathCheck === '/') {
-                 dirExists = true;
-             } else {
-                 for (const accessiblePath of accessiblePaths) {
-                     if (accessiblePath.startsWith(relativeDirPrefix)) {
-                         dirExists = true;
-                         break;
-                     }
-                 }
-             }
+
+        let node;
+        try {
+            node = await fetchFsNode(dirPathCheck);
+        } catch (error) {
+            console.error(`Directory lookup failed for ${dirPathCheck}:`, error);
+            appendOutputLine(":: Error: Filesystem unreachable. Try again. ::");
+            return;
         }
 
-        if (dirExists) {
+        if (node && node.type === 'directory') {
             currentPath = dirPathCheck;
-        } else if (isFile) {
+        } else if (node && node.type === 'file') {
             appendOutputLine(`Error: '${targetDir.replace(/</g, "&lt;").replace(/>/g, "&gt;")}' is not a directory.`);
         }
          else {
@@ -969,6 +935,9 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- logout Function ---
     function logout() {
         appendOutputLine("Logging out... Session credentials purged.");
+        fetch('/api/terminal/logout', { method: 'POST' })
+            .catch(error => console.error('Terminal logout failed:', error));
+        fsNodeCache.clear();
         setTimeout(() => {
             currentAccessLevel = null;
             currentUsername = null;
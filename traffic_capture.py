@@ -0,0 +1,234 @@
+import collections
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+import log_pipeline
+from puzzle_providers import make_completion, split_into_chunks
+
+# Recording of live API traffic for deterministic replay (see replay_traffic.py).
+# Each request is one compact JSON line:
+#   ts   wall-clock time it arrived       id   request ID (X-Request-ID)
+#   e    Flask endpoint                   m, p method and path with query string
+#   b    JSON request body                s    status code
+#   r    JSON response body, or null      h, n sha256 and size of other bodies
+#   ms   time to respond (streamed bodies: until the stream closed)
+#   llm  completions the request got from the puzzle provider, in call order
+# Request headers are not kept. Secret and personal fields in request bodies are
+# replaced with keyed hashes (so a replayed sign-up and login still agree with each
+# other); in response bodies, which are only compared, they are blanked.
+SECRET_FIELDS = {"password", "new_password", "current_password", "token", "api_key"}
+PERSONAL_FIELDS = {"email"}
+REDACTED = "[redacted]"
+
+
+class Pseudonymizer:
+    """
+    Replaces values with keyed hashes. Without a key one is drawn for the process,
+    so its pseudonyms don't match another process's or survive a restart.
+    """
+
+    def __init__(self, key=None):
+        self._key = key or secrets.token_bytes(32)
+
+    def pseudonym(self, field, value):
+        digest = hmac.new(
+            self._key, str(value).encode("utf-8"), hashlib.sha256
+        ).hexdigest()[:16]
+        return f"anon-{digest}@example.invalid" if field in PERSONAL_FIELDS else digest
+
+    def sanitize_request(self, body):
+        if isinstance(body, dict):
+            return {
+                key: (
+                    self.pseudonym(key, value)
+                    if key in SECRET_FIELDS | PERSONAL_FIELDS and value is not None
+                    else self.sanitize_request(value)
+                )
+                for key, value in body.items()
+            }
+        if isinstance(body, list):
+            return [self.sanitize_request(value) for value in body]
+        return body
+
+
+def sanitize_response(body):
+    if isinstance(body, dict):
+        return {
+            key: (
+                REDACTED
+                if key in SECRET_FIELDS | PERSONAL_FIELDS
+                else sanitize_response(value)
+            )
+            for key, value in body.items()
+        }
+    if isinstance(body, list):
+        return [sanitize_response(value) for value in body]
+    return body
+
+
+def describe_body(data, is_json, max_body_bytes):
+    """The "r", "h" and "n" fields for a response body."""
+    if is_json and len(data) <= max_body_bytes:
+        try:
+            return {"r": sanitize_response(json.loads(data))}
+        except ValueError:
+            pass
+    return {"r": None, "h": hashlib.sha256(data).hexdigest(), "n": len(data)}
+
+
+class TrafficRecorder:
+    """
+    Appends captured requests to a file. Every line is a single write to a file
+    opened for appending, so worker processes can share one capture file.
+    """
+
+    def __init__(self, path, max_body_bytes, key=None):
+        self.path = path
+        self.max_body_bytes = max_body_bytes
+        self.pseudonymizer = Pseudonymizer(key.encode("utf-8") if key else None)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._lock = threading.Lock()
+        self._llm_calls = {}  # Request ID -> completions, while the request runs
+        self.stats = {"recorded": 0, "llm_calls": 0}
+
+    def begin(self, request_id):
+        with self._lock:
+            self._llm_calls[request_id] = []
+
+    def add_llm_call(self, request_id, kind, completion, seconds):
+        """Keeps a completion for the request that asked for it, if it is captured."""
+        call = {"kind": kind, "seconds": round(seconds, 4)}
+        call.update({k: v for k, v in completion.items() if v is not None})
+        with self._lock:
+            calls = self._llm_calls.get(request_id)
+            if calls is not None:
+                calls.append(call)
+
+    def discard(self, request_id):
+        with self._lock:
+            self._llm_calls.pop(request_id, None)
+
+    def finish(self, entry, started):
+        """Completes a request's entry with its duration and LLM calls and writes it."""
+        entry["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            entry["llm"] = self._llm_calls.pop(entry["id"], [])
+            self.stats["recorded"] += 1
+            self.stats["llm_calls"] += len(entry["llm"])
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        os.write(self._fd, line.encode("utf-8"))
+
+    def close(self):
+        os.close(self._fd)
+
+
+class CapturingProvider:
+    """Passes calls to another provider and records each completion it returns."""
+
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+        self.name = f"capture:{inner.name}"
+
+    def complete(self, kind, messages, temperature, timeout):
+        started = time.perf_counter()
+        completion = self.inner.complete(kind, messages, temperature, timeout)
+        self.recorder.add_llm_call(
+            log_pipeline.get_request_id(),
+            kind,
+            completion,
+            time.perf_counter() - started,
+        )
+        return completion
+
+    def stream(self, kind, messages, temperature, timeout):
+        started = time.perf_counter()
+        completion = yield from self.inner.stream(kind, messages, temperature, timeout)
+        self.recorder.add_llm_call(
+            log_pipeline.get_request_id(),
+            kind,
+            completion,
+            time.perf_counter() - started,
+        )
+        return completion
+
+    def warm_up(self):
+        self.inner.warm_up()
+
+
+def read_capture(path):
+    """The entries of a capture file, in the order the requests arrived."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+class CapturedCompletionProvider:
+    """
+    Stands in for the LLM on replay: a request gets the completions its original
+    got, in the same order, after the same delay (scaled by delay_factor). A
+    request with none left (e.g. one the new build makes an extra call for) gets
+    the recorded completions of the same kind in turn.
+    """
+
+    name = "captured"
+
+    def __init__(self, entries, delay_factor=1.0):
+        self.delay_factor = delay_factor
+        self._lock = threading.Lock()
+        self._by_request = {}
+        self._by_kind = collections.defaultdict(list)
+        self._positions = collections.Counter()
+        self.stats = {"matched": 0, "fallback": 0}
+        for entry in entries:
+            calls = entry.get("llm") or []
+            self._by_request[entry["id"]] = collections.deque(calls)
+            for call in calls:
+                self._by_kind[call["kind"]].append(call)
+
+    def _next_call(self, kind):
+        request_id = log_pipeline.get_request_id()
+        with self._lock:
+            calls = self._by_request.get(request_id)
+            if calls and calls[0]["kind"] == kind:
+                self.stats["matched"] += 1
+                return calls.popleft()
+            candidates = self._by_kind.get(kind)
+            if not candidates:
+                raise LookupError(f"No captured '{kind}' completion to replay")
+            self.stats["fallback"] += 1
+            position = self._positions[kind]
+            self._positions[kind] += 1
+            return candidates[position % len(candidates)]
+
+    def _completion(self, call):
+        time.sleep(call.get("seconds", 0) * self.delay_factor)
+        return make_completion(
+            call.get("content", ""),
+            call.get("finish_reason", "stop"),
+            prompt_tokens=call.get("prompt_tokens"),
+            cached_tokens=call.get("cached_tokens"),
+            completion_tokens=call.get("completion_tokens"),
+        )
+
+    def complete(self, kind, messages, temperature, timeout):
+        return self._completion(self._next_call(kind))
+
+    def stream(self, kind, messages, temperature, timeout):
+        completion = self._completion(self._next_call(kind))
+        yield from split_into_chunks(completion["content"])
+        return completion
+
+    def warm_up(self):
+        pass
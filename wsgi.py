@@ -0,0 +1,7 @@
+from app import create_app, prepare_app
+
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# With preload_app (see gunicorn.conf.py) this runs once, in the master process, and
+# the workers are forked from it with the app and its prepared assets in place.
+app = create_app()
+prepare_app(app)